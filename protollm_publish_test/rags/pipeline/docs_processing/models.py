@@ -6,6 +6,7 @@ from pydantic import BaseModel
 class ConfigLoader(BaseModel):
     file_path: str = ''
     save_path: str = ''
+    manifest_path: str = ''  # the directory is loaded incrementally with the manifest, if it is set
     loader_name: str
     parsing_params: dict[str, Any] = dict()
 
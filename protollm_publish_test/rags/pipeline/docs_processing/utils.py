@@ -1,16 +1,18 @@
 import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 from protollm.raw_data_processing.docs_parsers.loaders import PDFLoader, WordDocumentLoader, ZipLoader, \
     RecursiveDirectoryLoader
+from protollm.raw_data_processing.docs_parsers.loaders.manifest import IngestionManifest
 from langchain_core.document_loaders import BaseLoader
 
 from protollm.rags.pipeline.docs_processing.entities import LoaderType, LangChainDocumentLoader
 from protollm.rags.pipeline.docs_processing.exceptions import FileExtensionError, PathIsNotAssigned
 
 
-def get_loader(**loader_params) -> BaseLoader:
+def get_loader(manifest: Optional[IngestionManifest] = None, **loader_params) -> BaseLoader:
+    # only a directory is loaded incrementally with the manifest
     document_path = loader_params.get('file_path', '')
     if not isinstance(document_path, (str, Path)) or document_path == '':
         raise PathIsNotAssigned('Input file (directory) path is not assigned')
@@ -47,6 +49,7 @@ def get_loader(**loader_params) -> BaseLoader:
         case LoaderType.zip:
             return ZipLoader(**loader_params)
         case LoaderType.directory:
-            return RecursiveDirectoryLoader(**loader_params)
+            # the files are recorded in the manifest by DocsLoadPipeline after their documents are stored
+            return RecursiveDirectoryLoader(manifest=manifest, defer_manifest=True, **loader_params)
         case _:
             raise FileExtensionError(f'File with extension {doc_extension} has not been implemented yet.')
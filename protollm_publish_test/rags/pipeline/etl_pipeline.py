@@ -1,22 +1,33 @@
 import logging
 from itertools import islice
 from pathlib import Path
-from typing import Iterable, Optional, Union
+from typing import Callable, Iterable, Optional, Union
 
-from langchain_community.vectorstores import utils
+from langchain_community.vectorstores import Chroma, utils
+from langchain_core.document_loaders import BaseLoader
 from langchain_core.documents import Document
 from langchain_core.vectorstores import VectorStore
 
 from protollm.rags.pipeline.docs_processing.utils import get_loader
+from protollm.raw_data_processing.docs_parsers.loaders import RecursiveDirectoryLoader
+from protollm.raw_data_processing.docs_parsers.loaders.manifest import IngestionManifest
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.StreamHandler())
 logger.setLevel(logging.INFO)
 
+# Number of the sources, which documents are deleted from the store at once
+DELETION_BATCH_SIZE = 500
+
+
+def _delete_by_sources(store: VectorStore, sources: list[str]) -> None:
+    store.delete(where={'source': {'$in': sources}})
+
 
 class DocsExtractPipeline:
     def __init__(self, pipeline_settings: 'PipelineSettings'):
         self._pipeline_settings = pipeline_settings
+        self._loader: Optional[BaseLoader] = None
 
     def update_loader(self, **kwargs) -> 'DocsExtractPipeline':
         self._pipeline_settings.update_loader_params(kwargs)
@@ -28,18 +39,22 @@ class DocsExtractPipeline:
         if docs_collection_path is not None:
             self.update_loader(file_path=docs_collection_path)
 
-        loader = get_loader(byte_content=byte_content, **self._pipeline_settings.loader_params)
-        return loader.lazy_load()
+        self._loader = get_loader(byte_content=byte_content, manifest=self._pipeline_settings.manifest,
+                                  **self._pipeline_settings.loader_params)
+        return self._loader.lazy_load()
 
     def go_to_next_step(self, docs_collection_path: Optional[Union[str, Path]] = None,
                         byte_content: Optional[bytes] = None) -> 'DocsTransformPipeline':
-        return DocsTransformPipeline(self._pipeline_settings, self.load_docs(docs_collection_path, byte_content))
+        docs_generator = self.load_docs(docs_collection_path, byte_content)
+        return DocsTransformPipeline(self._pipeline_settings, docs_generator, self._loader)
 
 
 class DocsTransformPipeline:
-    def __init__(self, pipeline_settings: 'PipelineSettings', docs_generator: Iterable[Document]):
+    def __init__(self, pipeline_settings: 'PipelineSettings', docs_generator: Iterable[Document],
+                 loader: Optional[BaseLoader] = None):
         self._pipeline_settings = pipeline_settings
         self._docs_generator = docs_generator
+        self._loader = loader
 
     def update_docs_transformers(self, **kwargs) -> 'DocsTransformPipeline':
         self._pipeline_settings.update_transformer_params(kwargs)
@@ -55,19 +70,52 @@ class DocsTransformPipeline:
             yield from docs_batch
 
     def go_to_next_step(self, batch_size: int = 100) -> 'DocsLoadPipeline':
-        return DocsLoadPipeline(self.transform(batch_size))
+        return DocsLoadPipeline(self.transform(batch_size), self._pipeline_settings.manifest, self._loader)
 
 
 class DocsLoadPipeline:
-    def __init__(self, docs_generator: Iterable[Document]):
+    def __init__(self, docs_generator: Iterable[Document], manifest: Optional[IngestionManifest] = None,
+                 loader: Optional[BaseLoader] = None):
         self._docs_generator = docs_generator
+        self._manifest = manifest
+        self._loader = loader
 
-    def load(self, store: VectorStore, loading_batch_size: int = 32) -> None:
+    def load(self, store: VectorStore, loading_batch_size: int = 32,
+             delete_documents: Optional[Callable[[VectorStore, list[str]], None]] = None) -> None:
         logger.info('Initialize loading process')
+        if self._manifest is not None and delete_documents is None:
+            # Other stores can't delete by metadata or delete everything without ids
+            if not isinstance(store, Chroma):
+                raise NotImplementedError(f'Deleting the stale documents from {type(store).__name__} '
+                                          f'is not implemented, pass delete_documents')
+            delete_documents = _delete_by_sources
 
         # Add processed documents to the store
         loading_batch_size = max(loading_batch_size, 1)
         while docs_batch := list(islice(self._docs_generator, loading_batch_size)):
+            # The stale documents of the batch's files are deleted before their new documents are added
+            self._delete_stale_documents(store, delete_documents)
             # TODO: replace filtering. It loses important metadatas. Use DocsTransformer to transform metadata
             store.add_documents(utils.filter_complex_metadata(docs_batch))
+            # The files are recorded in the manifest, when all their documents are stored
+            self._commit_loaded(docs_batch[-1])
+        # The deleted files are known after all files are loaded
+        self._delete_stale_documents(store, delete_documents)
+        self._commit_loaded()
+
+    def _commit_loaded(self, last_stored: Optional[Document] = None) -> None:
+        if self._manifest is not None and isinstance(self._loader, RecursiveDirectoryLoader):
+            self._loader.commit_loaded(last_stored)
+
+    def _delete_stale_documents(self, store: VectorStore,
+                                delete_documents: Optional[Callable[[VectorStore, list[str]], None]]) -> None:
+        if self._manifest is None:
+            return
+        sources = self._manifest.get_tombstones()
+        for i in range(0, len(sources), DELETION_BATCH_SIZE):
+            sources_batch = sources[i:i + DELETION_BATCH_SIZE]
+            delete_documents(store, sources_batch)
+            self._manifest.remove_tombstones(sources_batch)
+        if sources:
+            logger.info(f'Deleted the stale documents of {len(sources)} sources')
 
@@ -12,6 +12,7 @@ from transformers import AutoTokenizer, logging
 from protollm.rags.pipeline.docs_processing.entities import transformer_object_dict
 from protollm.rags.pipeline.docs_processing.exceptions import TransformerNameError
 from protollm.rags.pipeline.docs_processing.models import ConfigFile
+from protollm.raw_data_processing.docs_parsers.loaders.manifest import IngestionManifest
 
 
 def _get_params_for_transformer(params: dict[str, Any],
@@ -24,10 +25,13 @@ def _get_params_for_transformer(params: dict[str, Any],
 
 
 class PipelineSettings:
-    def __init__(self, config: Optional[ConfigFile] = None):
+    def __init__(self, config: Optional[ConfigFile] = None, manifest: Optional[IngestionManifest] = None):
         self.config = config
         self.loader_params = config
         self.transformers = config
+        if manifest is None and config is not None and config.loader.manifest_path:
+            manifest = IngestionManifest(config.loader.manifest_path)
+        self.manifest = manifest
 
     @classmethod
     def config_from_file(cls, config_file: str):
@@ -1,22 +1,112 @@
+import os
 from pathlib import Path
-from typing import Iterator, Union, Any, Optional, Sequence
+from typing import Callable, Container, Iterable, Iterator, Union, Any, Optional, Sequence
 
-from langchain_community.document_loaders.directory import _is_visible
 from langchain_core.document_loaders import BaseLoader
 from langchain_core.documents import Document
 from tqdm import tqdm
 
-from protollm.raw_data_processing.docs_parsers.parsers import ParsingScheme, DocType, BaseParser
+from protollm.raw_data_processing.docs_parsers.parsers import (
+    ParsingScheme,
+    DocType,
+    BaseParser,
+    ParsingBudget,
+    QualityGate,
+)
+from protollm.raw_data_processing.docs_parsers.parsers.isolation import _to_picklable
 from protollm.raw_data_processing.docs_parsers.utils.logger import ParsingLogger
+from protollm.raw_data_processing.docs_parsers.utils.metrics import ParsingRecord
 from protollm.raw_data_processing.docs_parsers.loaders.pdf_loader import PDFLoader
 from protollm.raw_data_processing.docs_parsers.utils.utilities import correct_path_encoding
 from protollm.raw_data_processing.docs_parsers.loaders.doc_loader import WordDocumentLoader
 from protollm.raw_data_processing.docs_parsers.loaders.zip_loader import ZipLoader
+from protollm.raw_data_processing.docs_parsers.loaders.parallel import parallel_load
+from protollm.raw_data_processing.docs_parsers.loaders.manifest import IngestionManifest
+
+# Suffixes of the files, which have a suitable loader
+SUPPORTED_SUFFIXES = frozenset(
+    f".{doc_type.value}" for doc_type in DocType if doc_type is not DocType.unsupported
+)
+
+
+def _iter_files(
+    directory: Path,
+    exclude_names: Sequence[str] = (),
+    suffixes: Optional[Container[str]] = None,
+    on_skipped: Optional[Callable[[Path], None]] = None,
+) -> Iterator[Path]:
+    """
+    Walks the directory lazily, the files of a directory are yielded before the files of its
+    subdirectories. Hidden files and directories are skipped, the latter are not walked at all
+    :param directory: path to the directory
+    :param exclude_names: names of the skipped files, they are compared with the names as is
+    and with the names with corrected encoding
+    :param suffixes: lowercase suffixes of the yielded files, all files are yielded if None
+    :param on_skipped: called with the path to each file skipped by its suffix
+    :return: paths to the files
+    """
+    exclude_names = set(exclude_names)
+    directories = [directory]
+    while directories:
+        subdirectories = []
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                    continue
+                if suffixes is not None and os.path.splitext(name)[1].lower() not in suffixes:
+                    if on_skipped is not None and entry.is_file():
+                        on_skipped(Path(entry.path))
+                    continue
+                if not entry.is_file():
+                    continue
+                if exclude_names and (
+                    name in exclude_names
+                    # the encoding of ASCII names is always correct
+                    or not name.isascii()
+                    and correct_path_encoding(name) in exclude_names
+                ):
+                    continue
+                yield Path(entry.path)
+        directories.extend(reversed(subdirectories))
+
+
+def _load_in_worker(
+    loader_class: type, path: Path, kwargs: dict, logger_options: dict
+) -> tuple[
+    list[Document], dict[str, list[str]], list[ParsingRecord], Optional[BaseException]
+]:
+    """
+    Loads the file in a worker process with its own logger
+    :return: documents, errors and records logged by the loader and the raised error if any
+    """
+    logger = ParsingLogger(**logger_options)
+    documents = []
+    try:
+        loader = loader_class(path, **kwargs, parsing_logger=logger)
+        documents.extend(loader.lazy_load())
+    except BaseException as error:
+        return documents, logger.logs, logger.records, _to_picklable(error)
+    return documents, logger.logs, logger.records, None
 
 
 class RecursiveDirectoryLoader(BaseLoader):
     """
     Load files from directory into list of documents.
+
+    With n_jobs > 1 the files are parsed in a pool of processes, at most max_in_flight files are
+    submitted at once. The documents of each file are yielded as soon as the file is parsed, in the order
+    of the files if ordered is True, otherwise in the order of completion.
+
+    With a manifest only the files, which are new or have changed since they were loaded with the same
+    manifest, are loaded. The sources of a file's documents are recorded in the manifest before the documents
+    are yielded and the file is marked as loaded after all of them are yielded without errors, or, if
+    defer_manifest is True, when commit_loaded is called after the documents are stored. The documents
+    of a file, which isn't marked, become tombstones on the next run. The documents of the changed
+    and deleted files are kept as tombstones, see IngestionManifest.
     """
 
     def __init__(
@@ -27,14 +117,24 @@ class RecursiveDirectoryLoader(BaseLoader):
         pdf_extract_tables: bool = False,
         pdf_extract_formulas: bool = False,
         pdf_remove_service_info: bool = False,
+        pdf_page_range: Optional[tuple[int, int]] = None,
+        pdf_max_pages: Optional[int] = None,
         word_doc_parsing_scheme: Union[ParsingScheme, str] = ParsingScheme.lines,
         word_doc_extract_images: bool = False,
         word_doc_extract_tables: bool = False,
         word_doc_extract_formulas: bool = False,
+        word_doc_incremental: bool = False,
         timeout_for_converting: Optional[int] = None,
         exclude_files: Sequence[Union[Path, str]] = (),
+        parsing_budget: Optional[ParsingBudget] = None,
         parsing_logger: Optional[ParsingLogger] = None,
         silent_errors: bool = False,
+        quality_gate: Optional[QualityGate] = None,
+        n_jobs: int = 1,
+        ordered: bool = True,
+        max_in_flight: Optional[int] = None,
+        manifest: Optional[IngestionManifest] = None,
+        defer_manifest: bool = False,
         **kwargs: Any,
     ) -> None:
         """Initialize with a directory path."""
@@ -43,10 +143,22 @@ class RecursiveDirectoryLoader(BaseLoader):
             raise FileNotFoundError(f"Directory not found: '{self.file_path}'")
         if not self.file_path.is_dir():
             raise ValueError(f"Expected directory, got file: '{self.file_path}'")
+        if n_jobs < 1:
+            raise ValueError("The number of jobs should be positive")
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("The number of files in flight should be positive")
 
         self._logger = parsing_logger or ParsingLogger(
             silent_errors=silent_errors, name=__name__
         )
+        self.n_jobs = n_jobs
+        self.ordered = ordered
+        self.max_in_flight = max_in_flight
+        self.manifest = manifest
+        self.defer_manifest = defer_manifest
+        # paths to the yielded files, the sources of their documents and whether they are loaded
+        # without errors, in the order of yielding, until they are recorded in the manifest
+        self._finished_files: list[tuple[Path, set[str], bool]] = []
 
         self._pdf_kwargs = {
             "parsing_scheme": pdf_parsing_scheme,
@@ -54,15 +166,19 @@ class RecursiveDirectoryLoader(BaseLoader):
             "extract_tables": pdf_extract_tables,
             "extract_formulas": pdf_extract_formulas,
             "remove_headers": pdf_remove_service_info,
-            "parsing_logger": self._logger,
+            "page_range": pdf_page_range,
+            "max_pages": pdf_max_pages,
+            "parsing_budget": parsing_budget,
+            "quality_gate": quality_gate,
         }
         self._word_doc_kwargs = {
             "parsing_scheme": word_doc_parsing_scheme,
             "extract_images": word_doc_extract_images,
             "extract_tables": word_doc_extract_tables,
             "extract_formulas": word_doc_extract_formulas,
+            "incremental": word_doc_incremental,
             "timeout_for_converting": timeout_for_converting,
-            "parsing_logger": self._logger,
+            "parsing_budget": parsing_budget,
         }
         self._zip_kwargs = {
             "pdf_parsing_scheme": pdf_parsing_scheme,
@@ -70,46 +186,182 @@ class RecursiveDirectoryLoader(BaseLoader):
             "pdf_extract_tables": pdf_extract_tables,
             "pdf_extract_formulas": pdf_extract_formulas,
             "pdf_remove_service_info": pdf_remove_service_info,
+            "pdf_page_range": pdf_page_range,
+            "pdf_max_pages": pdf_max_pages,
             "word_doc_parsing_scheme": word_doc_parsing_scheme,
             "word_doc_extract_images": word_doc_extract_images,
             "word_doc_extract_tables": word_doc_extract_tables,
             "word_doc_extract_formulas": word_doc_extract_formulas,
+            "word_doc_incremental": word_doc_incremental,
             "timeout_for_converting": timeout_for_converting,
             "exclude_files": exclude_files,
-            "parsing_logger": self._logger,
+            "parsing_budget": parsing_budget,
+            "quality_gate": quality_gate,
         }
+        # Word documents are filtered with the loader's default gate, unless the gate is given
+        if quality_gate is not None:
+            self._word_doc_kwargs["quality_gate"] = quality_gate
         self._exclude_names = [Path(file).name for file in exclude_files]
 
     @property
     def logs(self):
         return self._logger.logs
 
+    @property
+    def records(self):
+        return self._logger.records
+
     def lazy_load(
         self,
     ) -> Iterator[Document]:
         """Lazy load given path"""
-        paths = [
-            path
-            for path in self.file_path.rglob("**/[!.]*")
-            if path.is_file()
-            and _is_visible(path)
-            and path.name not in self._exclude_names
-            and correct_path_encoding(path.name) not in self._exclude_names
-        ]
+        paths = _iter_files(
+            self.file_path,
+            self._exclude_names,
+            SUPPORTED_SUFFIXES,
+            on_skipped=lambda path: self._logger.info(
+                f"Skip file processing, no suitable loader for {path}"
+            ),
+        )
+        if self.manifest is not None:
+            paths = self.manifest.update(self.file_path, paths)
+        # sources of the documents of the file being yielded
+        sources = set()
+        if self.n_jobs > 1:
+            submitted_paths = {}
+            loaded_path = None
+
+            def on_task_started(index: int):
+                nonlocal loaded_path
+                loaded_path = submitted_paths.pop(index)
+                sources.clear()
+
+            def on_task_loaded(index: int):
+                self._finish_file(loaded_path, sources)
+
+            # the documents of a task are yielded together between the task's callbacks
+            for document in parallel_load(
+                self._iter_tasks(paths, submitted_paths),
+                self._logger,
+                self.n_jobs,
+                self.ordered,
+                self.max_in_flight,
+                on_task_started=on_task_started,
+                on_task_loaded=on_task_loaded,
+            ):
+                self._add_source(loaded_path, document, sources)
+                yield document
+            return
+
         for path in tqdm(paths, desc="Directory processing", ncols=80):
-            doc_type = BaseParser.get_doc_type(path)
-            match doc_type:
-                case DocType.pdf:
-                    _loader = PDFLoader(path, **self._pdf_kwargs)
-                case DocType.docx | DocType.doc | DocType.odt | DocType.rtf:
-                    _loader = WordDocumentLoader(path, **self._word_doc_kwargs)
-                case DocType.zip:
-                    _loader = ZipLoader(path, **self._zip_kwargs)
-                case _:
-                    self._logger.info(
-                        f"Skip file processing, no suitable loader for {path}"
-                    )
-                    continue
+            loader_args = self._get_loader_args(path)
+            if loader_args is None:
+                continue
+            loader_class, kwargs = loader_args
+            _loader = loader_class(path, **kwargs, parsing_logger=self._logger)
+
+            self._logger.info(f"Processing file: {path}")
+            sources.clear()
+            try:
+                for document in _loader.lazy_load():
+                    self._add_source(path, document, sources)
+                    yield document
+            except Exception:
+                if self.manifest is not None:
+                    self.manifest.mark_failed(path)
+                raise
+            self._finish_file(path, sources)
+
+    def commit_loaded(self, last_stored: Optional[Document] = None):
+        """
+        Marks the loaded files as loaded in the manifest, if it's deferred until their documents are stored.
+        The documents should be stored in the order they are yielded
+        :param last_stored: the last stored document, the files yielded before its file are marked,
+        all yielded files are marked if None
+        """
+        if last_stored is None:
+            count = len(self._finished_files)
+        else:
+            source = last_stored.metadata.get("source")
+            if source is None:
+                return
+            # the documents of the document's file and of the following files may not be stored yet,
+            # if the document's file isn't finished, all finished files precede it
+            count = next(
+                (
+                    i
+                    for i, (_, sources, _) in enumerate(self._finished_files)
+                    if source in sources
+                ),
+                len(self._finished_files),
+            )
+        for path, _, is_loaded in self._finished_files[:count]:
+            if is_loaded:
+                self.manifest.mark_loaded(path)
+            else:
+                self.manifest.mark_failed(path)
+        del self._finished_files[:count]
+
+    def _get_loader_args(self, path: Path) -> Optional[tuple[type, dict]]:
+        """
+        Chooses the loader of the file
+        :param path: path to the file
+        :return: loader's class and arguments or None if the file type is unsupported
+        """
+        doc_type = BaseParser.get_doc_type(path)
+        match doc_type:
+            case DocType.pdf:
+                return PDFLoader, self._pdf_kwargs
+            case DocType.docx | DocType.doc | DocType.odt | DocType.rtf:
+                return WordDocumentLoader, self._word_doc_kwargs
+            case DocType.zip:
+                return ZipLoader, self._zip_kwargs
+            case _:
+                self._logger.info(f"Skip file processing, no suitable loader for {path}")
+                return None
+
+    def _add_source(self, path: Path, document: Document, sources: set[str]):
+        source = document.metadata.get("source")
+        if source is None or source in sources:
+            return
+        sources.add(source)
+        if self.manifest is not None:
+            self.manifest.add_sources(path, [source])
+
+    def _finish_file(self, path: Path, sources: set[str]):
+        if self.manifest is None:
+            return
+        # the file is loaded again next time, if any of its parts has failed
+        prefix = os.path.join(str(path), "")
+        is_loaded = not any(
+            str(file_name) == str(path) or str(file_name).startswith(prefix)
+            for file_name in self._logger.logs
+        )
+        self._finished_files.append((path, set(sources), is_loaded))
+        if not self.defer_manifest:
+            self.commit_loaded()
+
+    def _iter_tasks(
+        self, paths: Iterable[Path], submitted_paths: dict[int, Path]
+    ) -> Iterator[tuple[Callable, tuple, int]]:
+        """
+        :param submitted_paths: paths to the submitted files by the indexes of their tasks,
+        they are removed when the tasks are loaded
+        """
+        task_index = 0
+        for path in tqdm(paths, desc="Directory processing", ncols=80):
+            loader_args = self._get_loader_args(path)
+            if loader_args is None:
+                continue
+            loader_class, kwargs = loader_args
 
             self._logger.info(f"Processing file: {path}")
-            yield from _loader.lazy_load()
+            submitted_paths[task_index] = path
+            task_index += 1
+            args = (
+                loader_class,
+                path,
+                kwargs,
+                self._logger.get_options(),
+            )
+            yield _load_in_worker, args, 0
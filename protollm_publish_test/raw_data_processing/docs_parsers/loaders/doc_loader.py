@@ -4,21 +4,21 @@ from typing import Iterator, Union, Any, Optional
 from langchain_core.document_loaders import BaseLoader, Blob
 from langchain_core.documents import Document
 
-from protollm.raw_data_processing.docs_parsers.parsers import WordDocumentParser, ParsingScheme, DocType
+from protollm.raw_data_processing.docs_parsers.parsers import (
+    WordDocumentParser,
+    ParsingScheme,
+    DocType,
+    ParsingBudget,
+    QualityGate,
+    lazy_parse_with_budget,
+)
+from protollm.raw_data_processing.docs_parsers.parsers.word_doc.word_doc_parser import PERSISTENT_PATH_KEY
 from protollm.raw_data_processing.docs_parsers.utils.logger import ParsingLogger
+from protollm.raw_data_processing.docs_parsers.utils.metrics import get_blob_size
 
 
-def preprocess_documents(func):
-    def wrapper(self, *args, **kwargs):
-        documents = func(self, *args, **kwargs)
-        for doc in documents:
-            if len(doc.page_content) < 15:
-                continue
-            if sum(c.isdigit() for c in doc.page_content) / len(doc.page_content) > 0.2:
-                continue
-            yield doc
-
-    return wrapper
+# Short documents and documents of mostly digits are dropped by default
+DEFAULT_QUALITY_GATE = QualityGate(min_content_length=15, max_digits_proportion=0.2)
 
 
 class WordDocumentLoader(BaseLoader):
@@ -35,7 +35,10 @@ class WordDocumentLoader(BaseLoader):
         extract_tables: bool = False,
         extract_formulas: bool = False,
         timeout_for_converting: Optional[int] = None,
+        incremental: bool = False,
+        parsing_budget: Optional[ParsingBudget] = None,
         parsing_logger: Optional[ParsingLogger] = None,
+        quality_gate: Optional[QualityGate] = DEFAULT_QUALITY_GATE,
         **kwargs: Any,
     ) -> None:
         """Initialize with a file path."""
@@ -49,6 +52,8 @@ class WordDocumentLoader(BaseLoader):
                     f"The {doc_type} file type does not match the Loader! Use a suitable one."
                 )
         self.byte_content = byte_content
+        self.parsing_budget = parsing_budget
+        self.quality_gate = quality_gate
         self._doc_type = doc_type.value
         self._logger = parsing_logger or ParsingLogger(name=__name__)
         self.parser = WordDocumentParser(
@@ -57,22 +62,40 @@ class WordDocumentLoader(BaseLoader):
             extract_tables,
             extract_formulas,
             timeout_for_converting,
+            incremental,
         )
 
     @property
     def logs(self):
         return self._logger.logs
 
-    @preprocess_documents
+    @property
+    def records(self):
+        return self._logger.records
+
     def lazy_load(
         self,
     ) -> Iterator[Document]:
         """Lazy load given path"""
         if self.byte_content is None:
-            blob = Blob.from_path(self.file_path, mime_type=self._doc_type)
+            # the file is given by the user, so the images can be read from it after the parsing
+            blob = Blob.from_path(
+                self.file_path,
+                mime_type=self._doc_type,
+                metadata={PERSISTENT_PATH_KEY: True},
+            )
         else:
             blob = Blob.from_data(
                 self.byte_content, path=self.file_path, mime_type=self._doc_type
             )
-        with self._logger.parsing_info_handler(self.file_path):
-            yield from self.parser.lazy_parse(blob)
+        with self._logger.parsing_info_handler(
+            self.file_path, type(self.parser).__name__, get_blob_size(blob), blob
+        ) as parsing_record:
+            if self.quality_gate is not None:
+                self.quality_gate.probe(blob)
+            documents = parsing_record.track(
+                lazy_parse_with_budget(self.parser, blob, self.parsing_budget, parsing_record)
+            )
+            if self.quality_gate is not None:
+                documents = self.quality_gate.filter(documents)
+            yield from documents
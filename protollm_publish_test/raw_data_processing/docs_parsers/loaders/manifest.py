@@ -0,0 +1,185 @@
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+# Size of the chunks, in which the files are hashed
+HASH_BUFFER_SIZE = 2**20
+
+
+class IngestionManifest:
+    """
+    Persistent record of the ingested files, which makes loading of a directory incremental.
+
+    The manifest stores the size, the modification time and the content hash of each loaded file
+    and the sources of the documents produced from it. `update` selects the new and changed files
+    of a directory, so only they are loaded again. A file is hashed only if its size or modification
+    time has changed, so unchanged files cost a stat call.
+
+    The documents of the files, which have been changed or deleted since they were loaded, are stale.
+    Their sources, as they are in the documents' metadata, are kept as tombstones until they are
+    acknowledged with `remove_tombstones`, so the stale documents can be removed from the storage
+    before the new ones are added. A file becomes a tombstone when `update` reaches it, before it
+    is selected, so the tombstones of a file always precede its new documents.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        """
+        :param db_path: path to the SQLite database of the manifest, it is created if it doesn't exist
+        """
+        self.db_path = Path(db_path).expanduser()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.db_path)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, content_hash TEXT)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sources ("
+                "path TEXT, source TEXT, PRIMARY KEY (path, source))"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS tombstones (source TEXT PRIMARY KEY)"
+            )
+        # stats and hashes of the files selected by update, which are not loaded yet
+        self._pending: dict[str, tuple[int, int, str]] = {}
+
+    def __enter__(self) -> "IngestionManifest":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def update(self, directory: Union[str, Path], paths: Iterable[Path]) -> Iterator[Path]:
+        """
+        Compares the files of the directory with the manifest as they are walked. The documents
+        of the changed files and of the files recorded in the manifest, which are not in the directory
+        anymore, become tombstones. The deleted files are found after all paths are walked
+        :param directory: directory, which content is compared
+        :param paths: paths to all files of the directory, which should be loaded
+        :return: paths to the new and changed files
+        """
+        walked = set()
+        for path in paths:
+            key = self._get_key(path)
+            walked.add(key)
+            stat = path.stat()
+            entry = self._connection.execute(
+                "SELECT size, mtime_ns, content_hash FROM files WHERE path = ?", (key,)
+            ).fetchone()
+            if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+                continue
+            content_hash = self._hash_file(path)
+            if entry is not None and entry[2] == content_hash:
+                with self._connection:
+                    self._connection.execute(
+                        "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                        (stat.st_size, stat.st_mtime_ns, key),
+                    )
+                continue
+            self._bury(key)
+            self._pending[key] = (stat.st_size, stat.st_mtime_ns, content_hash)
+            yield path
+
+        prefix = os.path.join(self._get_key(directory), "")
+        # the keys under the directory lie in the range between the prefix and the next string
+        upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        recorded = self._connection.execute(
+            "SELECT path FROM files WHERE path >= ? AND path < ? "
+            "UNION SELECT path FROM sources WHERE path >= ? AND path < ?",
+            (prefix, upper_bound, prefix, upper_bound),
+        ).fetchall()
+        for key, in recorded:
+            if key not in walked:
+                self._bury(key)
+
+    def add_sources(self, path: Union[str, Path], sources: Iterable[str]):
+        """
+        Records the sources of the documents produced from the file selected by `update`. They are
+        recorded before the documents are stored, so the documents become tombstones, when the file
+        is loaded again, even if it hasn't been marked as loaded
+        :param path: path to the file
+        :param sources: sources of the documents
+        """
+        with self._connection:
+            self._add_sources(self._get_key(path), sources)
+
+    def mark_loaded(self, path: Union[str, Path], sources: Iterable[str] = ()):
+        """
+        Records the file selected by `update` as loaded, so it isn't loaded again until it changes.
+        The file should be marked after its documents are stored
+        :param path: path to the file
+        :param sources: sources of the documents produced from the file, which are not added yet
+        """
+        key = self._get_key(path)
+        size, mtime_ns, content_hash = self._pending.pop(key)
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+                (key, size, mtime_ns, content_hash),
+            )
+            self._add_sources(key, sources)
+
+    def mark_failed(self, path: Union[str, Path], sources: Iterable[str] = ()):
+        """
+        Records the documents produced from the file selected by `update` before it has failed,
+        the file is loaded again next time and the documents become tombstones then
+        :param path: path to the file
+        :param sources: sources of the documents produced from the file, which are not added yet
+        """
+        key = self._get_key(path)
+        self._pending.pop(key, None)
+        with self._connection:
+            self._add_sources(key, sources)
+
+    def get_tombstones(self) -> list[str]:
+        """
+        Gets the sources of the stale documents of the changed and deleted files
+        :return:
+        """
+        return [source for source, in self._connection.execute("SELECT source FROM tombstones")]
+
+    def remove_tombstones(self, sources: Iterable[str]):
+        """
+        Acknowledges that the stale documents are removed
+        :param sources: sources of the documents
+        """
+        with self._connection:
+            self._connection.executemany(
+                "DELETE FROM tombstones WHERE source = ?", ((source,) for source in sources)
+            )
+
+    def _bury(self, key: str):
+        """
+        Turns the documents of the file into tombstones and forgets the file
+        """
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO tombstones (source) SELECT source FROM sources WHERE path = ?",
+                (key,),
+            )
+            self._connection.execute("DELETE FROM sources WHERE path = ?", (key,))
+            self._connection.execute("DELETE FROM files WHERE path = ?", (key,))
+
+    def _add_sources(self, key: str, sources: Iterable[str]):
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO sources (path, source) VALUES (?, ?)",
+            ((key, str(source)) for source in sources),
+        )
+
+    @staticmethod
+    def _get_key(path: Union[str, Path]) -> str:
+        return str(Path(path).absolute())
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        content_hash = hashlib.sha256()
+        with open(path, "rb") as file_obj:
+            for chunk in iter(lambda: file_obj.read(HASH_BUFFER_SIZE), b""):
+                content_hash.update(chunk)
+        return content_hash.hexdigest()
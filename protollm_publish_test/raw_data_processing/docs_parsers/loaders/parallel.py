@@ -0,0 +1,84 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Optional
+
+from langchain_core.documents import Document
+
+from protollm.raw_data_processing.docs_parsers.parsers.isolation import _get_context
+from protollm.raw_data_processing.docs_parsers.utils.logger import ParsingLogger
+
+
+def parallel_load(
+    tasks: Iterable[tuple[Callable, tuple, int]],
+    parsing_logger: ParsingLogger,
+    n_jobs: int,
+    ordered: bool = True,
+    max_in_flight: Optional[int] = None,
+    max_in_flight_size: Optional[int] = None,
+    on_task_started: Optional[Callable[[int], None]] = None,
+    on_task_loaded: Optional[Callable[[int], None]] = None,
+) -> Iterator[Document]:
+    """
+    Runs the loading tasks in a pool of processes and yields their documents as the tasks finish.
+    Each task returns its documents, the errors and the records logged by its own logger and the error
+    it has raised. The logged errors and records are added to the loader's logger and the raised error
+    is re-raised, as if the task was run in the current process
+    :param tasks: functions, their arguments and the sizes of their inputs in bytes
+    :param parsing_logger: logger of the loader
+    :param n_jobs: number of processes
+    :param ordered: whether the documents are yielded in the order of the tasks or of their completion
+    :param max_in_flight: maximum number of the submitted tasks, which documents are not yielded yet,
+    2 * n_jobs by default
+    :param max_in_flight_size: maximum total size of the submitted tasks' inputs, a task is submitted
+    regardless of its size if no other task is in flight
+    :param on_task_started: called with the index of the task before its documents are yielded
+    :param on_task_loaded: called with the index of the task after all its documents are yielded
+    :return:
+    """
+    max_in_flight = max_in_flight or 2 * n_jobs
+    in_flight: deque[tuple[Future, int, int]] = deque()
+    in_flight_size = 0
+
+    def is_full(size: int) -> bool:
+        return bool(in_flight) and (
+            len(in_flight) >= max_in_flight
+            or (
+                max_in_flight_size is not None
+                and in_flight_size + size > max_in_flight_size
+            )
+        )
+
+    def pop_finished() -> tuple[Future, int]:
+        nonlocal in_flight_size
+        position = 0
+        if not ordered:
+            done, _ = wait([future for future, _, _ in in_flight], return_when=FIRST_COMPLETED)
+            position = next(i for i, (future, _, _) in enumerate(in_flight) if future in done)
+        future, size, task_index = in_flight[position]
+        del in_flight[position]
+        in_flight_size -= size
+        return future, task_index
+
+    def get_documents(finished: tuple[Future, int]) -> Iterator[Document]:
+        future, task_index = finished
+        documents, logs, records, error = future.result()
+        parsing_logger.extend(logs, records)
+        if error is not None:
+            raise error
+        if on_task_started is not None:
+            on_task_started(task_index)
+        yield from documents
+        if on_task_loaded is not None:
+            on_task_loaded(task_index)
+
+    executor = ProcessPoolExecutor(max_workers=n_jobs, mp_context=_get_context())
+    try:
+        for task_index, (function, args, size) in enumerate(tasks):
+            while is_full(size):
+                yield from get_documents(pop_finished())
+            in_flight.append((executor.submit(function, *args), size, task_index))
+            in_flight_size += size
+        while in_flight:
+            yield from get_documents(pop_finished())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -4,8 +4,17 @@ from typing import Iterator, Union, Any, Optional
 from langchain_core.document_loaders import BaseLoader, Blob
 from langchain_core.documents import Document
 
-from protollm.raw_data_processing.docs_parsers.parsers import PDFParser, ParsingScheme, DocType
+from protollm.raw_data_processing.docs_parsers.parsers import (
+    PDFParser,
+    ParsingScheme,
+    DocType,
+    PDFBackend,
+    ParsingBudget,
+    QualityGate,
+    lazy_parse_with_budget,
+)
 from protollm.raw_data_processing.docs_parsers.utils.logger import ParsingLogger
+from protollm.raw_data_processing.docs_parsers.utils.metrics import get_blob_size
 
 
 class PDFLoader(BaseLoader):
@@ -22,7 +31,14 @@ class PDFLoader(BaseLoader):
         extract_tables: bool = False,
         extract_formulas: bool = False,
         remove_headers: bool = False,
+        n_jobs: int = 1,
+        incremental: bool = False,
+        backend: Union[PDFBackend, str] = PDFBackend.auto,
+        page_range: Optional[tuple[int, int]] = None,
+        max_pages: Optional[int] = None,
+        parsing_budget: Optional[ParsingBudget] = None,
         parsing_logger: Optional[ParsingLogger] = None,
+        quality_gate: Optional[QualityGate] = None,
         **kwargs: Any,
     ) -> None:
         """Initialize with a file path."""
@@ -36,6 +52,8 @@ class PDFLoader(BaseLoader):
                     f"The {doc_type} file type does not match the Loader! Use a suitable one."
                 )
         self.byte_content = byte_content
+        self.parsing_budget = parsing_budget
+        self.quality_gate = quality_gate
         self._logger = parsing_logger or ParsingLogger(name=__name__)
         self.parser = PDFParser(
             parsing_scheme,
@@ -43,12 +61,21 @@ class PDFLoader(BaseLoader):
             extract_tables,
             extract_formulas,
             remove_headers,
+            n_jobs,
+            incremental,
+            backend,
+            page_range,
+            max_pages,
         )
 
     @property
     def logs(self):
         return self._logger.logs
 
+    @property
+    def records(self):
+        return self._logger.records
+
     def lazy_load(
         self,
     ) -> Iterator[Document]:
@@ -59,5 +86,14 @@ class PDFLoader(BaseLoader):
             blob = Blob.from_data(
                 self.byte_content, path=self.file_path, mime_type=DocType.pdf.value
             )
-        with self._logger.parsing_info_handler(self.file_path):
-            yield from self.parser.lazy_parse(blob)
+        with self._logger.parsing_info_handler(
+            self.file_path, type(self.parser).__name__, get_blob_size(blob), blob
+        ) as parsing_record:
+            if self.quality_gate is not None:
+                self.quality_gate.probe(blob)
+            documents = parsing_record.track(
+                lazy_parse_with_budget(self.parser, blob, self.parsing_budget, parsing_record)
+            )
+            if self.quality_gate is not None:
+                documents = self.quality_gate.filter(documents)
+            yield from documents
@@ -1,6 +1,10 @@
+import io
+import os
+import shutil
+import tempfile
 import zipfile
 from pathlib import Path
-from typing import Iterator, Union, Any, Optional, Sequence
+from typing import Callable, Iterable, Iterator, Union, Any, Optional, Sequence
 
 from langchain_core.document_loaders import BaseLoader, Blob
 from langchain_core.documents import Document
@@ -12,14 +16,75 @@ from protollm.raw_data_processing.docs_parsers.parsers import (
     BaseParser,
     PDFParser,
     WordDocumentParser,
+    ParsingBudget,
+    QualityGate,
+    lazy_parse_with_budget,
 )
+from protollm.raw_data_processing.docs_parsers.parsers.isolation import _to_picklable
 from protollm.raw_data_processing.docs_parsers.utils.logger import ParsingLogger
+from protollm.raw_data_processing.docs_parsers.utils.metrics import ParsingRecord
 from protollm.raw_data_processing.docs_parsers.utils.utilities import correct_path_encoding
+from protollm.raw_data_processing.docs_parsers.loaders.parallel import parallel_load
+
+# Size of the chunks, in which the members are extracted
+COPY_BUFFER_SIZE = 2**20
+
+
+def _parse_member(
+    parser: BaseParser,
+    blob: Blob,
+    parsing_budget: Optional[ParsingBudget],
+    quality_gate: Optional[QualityGate],
+    parsing_record: ParsingRecord,
+) -> Iterable[Document]:
+    if quality_gate is not None:
+        quality_gate.probe(blob)
+    documents = parsing_record.track(
+        lazy_parse_with_budget(parser, blob, parsing_budget, parsing_record)
+    )
+    if quality_gate is not None:
+        documents = quality_gate.filter(documents)
+    return documents
+
+
+def _parse_in_worker(
+    parser: BaseParser,
+    blob: Blob,
+    parsing_budget: Optional[ParsingBudget],
+    quality_gate: Optional[QualityGate],
+    size: int,
+    logger_options: dict,
+) -> tuple[
+    list[Document], dict[str, list[str]], list[ParsingRecord], Optional[BaseException]
+]:
+    """
+    Parses the extracted member in a worker process with its own logger and removes it
+    :return: documents, errors and records logged for the member and the raised error if any
+    """
+    logger = ParsingLogger(**logger_options)
+    documents = []
+    try:
+        with logger.parsing_info_handler(
+            blob.source, type(parser).__name__, size, blob
+        ) as parsing_record:
+            documents.extend(
+                _parse_member(parser, blob, parsing_budget, quality_gate, parsing_record)
+            )
+    except BaseException as error:
+        return documents, logger.logs, logger.records, _to_picklable(error)
+    finally:
+        Path(blob.path).unlink(missing_ok=True)
+    return documents, logger.logs, logger.records, None
 
 
 class ZipLoader(BaseLoader):
     """
     Load files from zip archive into list of documents.
+
+    Members are extracted one by one to temporary files and parsed from them, so the archive's content
+    is never kept in memory. Archives nested in the archive are loaded up to max_nesting_depth levels.
+    With n_jobs > 1 the members are parsed in a pool of processes, the total uncompressed size of the
+    members being parsed at once is limited by max_in_flight_size.
     """
 
     def __init__(
@@ -31,14 +96,23 @@ class ZipLoader(BaseLoader):
         pdf_extract_tables: bool = False,
         pdf_extract_formulas: bool = False,
         pdf_remove_service_info: bool = False,
+        pdf_page_range: Optional[tuple[int, int]] = None,
+        pdf_max_pages: Optional[int] = None,
         word_doc_parsing_scheme: Union[ParsingScheme, str] = ParsingScheme.lines,
         word_doc_extract_images: bool = False,
         word_doc_extract_tables: bool = False,
         word_doc_extract_formulas: bool = False,
+        word_doc_incremental: bool = False,
         timeout_for_converting: Optional[int] = None,
         exclude_files: Sequence[Union[Path, str]] = (),
+        parsing_budget: Optional[ParsingBudget] = None,
         parsing_logger: Optional[ParsingLogger] = None,
         silent_errors: bool = False,
+        quality_gate: Optional[QualityGate] = None,
+        max_nesting_depth: int = 3,
+        n_jobs: int = 1,
+        ordered: bool = True,
+        max_in_flight_size: Optional[int] = 2**30,
         **kwargs: Any,
     ) -> None:
         """Initialize with a file path."""
@@ -51,7 +125,15 @@ class ZipLoader(BaseLoader):
                 raise ValueError(
                     f"The {doc_type} file type does not match the Loader! Use a suitable one."
                 )
+        if n_jobs < 1:
+            raise ValueError("The number of jobs should be positive")
         self.byte_content = byte_content
+        self.parsing_budget = parsing_budget
+        self.quality_gate = quality_gate
+        self.max_nesting_depth = max_nesting_depth
+        self.n_jobs = n_jobs
+        self.ordered = ordered
+        self.max_in_flight_size = max_in_flight_size
         self._logger = parsing_logger or ParsingLogger(
             silent_errors=silent_errors, name=__name__
         )
@@ -61,6 +143,8 @@ class ZipLoader(BaseLoader):
             pdf_extract_tables,
             pdf_extract_formulas,
             pdf_remove_service_info,
+            page_range=pdf_page_range,
+            max_pages=pdf_max_pages,
         )
         self.word_doc_parser = WordDocumentParser(
             word_doc_parsing_scheme,
@@ -68,6 +152,7 @@ class ZipLoader(BaseLoader):
             word_doc_extract_tables,
             word_doc_extract_formulas,
             timeout_for_converting,
+            incremental=word_doc_incremental,
         )
         self._exclude_names = [Path(file).name for file in exclude_files]
 
@@ -75,33 +160,127 @@ class ZipLoader(BaseLoader):
     def logs(self):
         return self._logger.logs
 
+    @property
+    def records(self):
+        return self._logger.records
+
     def lazy_load(
         self,
     ) -> Iterator[Document]:
         """Lazy load given path"""
-        content = self.byte_content or self.file_path
-        with zipfile.ZipFile(content) as z:
-            for info in tqdm(z.infolist(), desc="Zip processing", ncols=80):
-                file_name = Path(correct_path_encoding(info.filename))
-                if file_name.name in self._exclude_names:
-                    continue
-                path = str(Path(self.file_path, file_name))
-                doc_type = BaseParser.get_doc_type(file_name)
-                match doc_type:
-                    case DocType.pdf:
-                        _parser = self.pdf_parser
-                    case DocType.docx | DocType.doc | DocType.odt | DocType.rtf:
-                        _parser = self.word_doc_parser
-                    case _:
-                        if Path(file_name).suffix:
-                            self._logger.info(
-                                f"Skip file processing in zip, no suitable parser for {path}"
+        content = (
+            io.BytesIO(self.byte_content) if self.byte_content is not None else self.file_path
+        )
+        with tempfile.TemporaryDirectory(prefix="zip_loader_") as tmp_dir:
+            with zipfile.ZipFile(content) as z:
+                members = self._iter_members(z, Path(self.file_path), tmp_dir)
+                if self.n_jobs > 1:
+                    yield from parallel_load(
+                        self._iter_tasks(members),
+                        self._logger,
+                        self.n_jobs,
+                        self.ordered,
+                        max_in_flight_size=self.max_in_flight_size,
+                    )
+                    return
+
+                for _parser, blob, size in members:
+                    try:
+                        with self._logger.parsing_info_handler(
+                            blob.source, type(_parser).__name__, size, blob
+                        ) as parsing_record:
+                            yield from _parse_member(
+                                _parser,
+                                blob,
+                                self.parsing_budget,
+                                self.quality_gate,
+                                parsing_record,
                             )
-                        continue
+                    finally:
+                        Path(blob.path).unlink(missing_ok=True)
 
-                self._logger.info(f"Processing file in zip: {path}")
-                blob = Blob.from_data(
-                    z.open(info).read(), path=path, mime_type=doc_type.value
-                )
-                with self._logger.parsing_info_handler(path):
-                    yield from _parser.lazy_parse(blob)
+    def _iter_members(
+        self, z: zipfile.ZipFile, archive_path: Path, tmp_dir: str, depth: int = 0
+    ) -> Iterator[tuple[BaseParser, Blob, int]]:
+        """
+        Extracts the supported members of the archive and of the nested archives one by one
+        :param z: opened archive
+        :param archive_path: path to the archive, the members' sources are relative to it
+        :param tmp_dir: directory for the extracted members
+        :param depth: nesting depth of the archive
+        :return: parser, blob of the extracted member and its uncompressed size
+        """
+        infos = z.infolist()
+        if depth == 0:
+            infos = tqdm(infos, desc="Zip processing", ncols=80)
+        for info in infos:
+            if info.is_dir():
+                continue
+            file_name = Path(correct_path_encoding(info.filename))
+            if file_name.name in self._exclude_names:
+                continue
+            path = str(Path(archive_path, file_name))
+            doc_type = BaseParser.get_doc_type(file_name)
+            match doc_type:
+                case DocType.pdf:
+                    _parser = self.pdf_parser
+                case DocType.docx | DocType.doc | DocType.odt | DocType.rtf:
+                    _parser = self.word_doc_parser
+                case DocType.zip if depth < self.max_nesting_depth:
+                    self._logger.info(f"Processing nested zip: {path}")
+                    yield from self._iter_nested_members(z, info, path, tmp_dir, depth)
+                    continue
+                case _:
+                    if Path(file_name).suffix:
+                        self._logger.info(
+                            f"Skip file processing in zip, no suitable parser for {path}"
+                        )
+                    continue
+
+            self._logger.info(f"Processing file in zip: {path}")
+            member_path = self._extract(z, info, tmp_dir)
+            blob = Blob.from_path(
+                member_path, mime_type=doc_type.value, metadata={"source": path}
+            )
+            yield _parser, blob, info.file_size
+
+    def _iter_nested_members(
+        self,
+        z: zipfile.ZipFile,
+        info: zipfile.ZipInfo,
+        path: str,
+        tmp_dir: str,
+        depth: int,
+    ) -> Iterator[tuple[BaseParser, Blob, int]]:
+        member_path = self._extract(z, info, tmp_dir)
+        try:
+            nested_zip = None
+            with self._logger.parsing_info_handler(path):
+                nested_zip = zipfile.ZipFile(member_path)
+            if nested_zip is None:
+                return
+            with nested_zip:
+                yield from self._iter_members(nested_zip, Path(path), tmp_dir, depth + 1)
+        finally:
+            os.remove(member_path)
+
+    def _iter_tasks(
+        self, members: Iterator[tuple[BaseParser, Blob, int]]
+    ) -> Iterator[tuple[Callable, tuple, int]]:
+        for _parser, blob, size in members:
+            args = (
+                _parser,
+                blob,
+                self.parsing_budget,
+                self.quality_gate,
+                size,
+                self._logger.get_options(),
+            )
+            yield _parse_in_worker, args, size
+
+    @staticmethod
+    def _extract(z: zipfile.ZipFile, info: zipfile.ZipInfo, tmp_dir: str) -> str:
+        fd, member_path = tempfile.mkstemp(dir=tmp_dir, suffix=Path(info.filename).suffix)
+        with os.fdopen(fd, "wb") as file_obj, z.open(info) as member:
+            shutil.copyfileobj(member, file_obj, COPY_BUFFER_SIZE)
+        return member_path
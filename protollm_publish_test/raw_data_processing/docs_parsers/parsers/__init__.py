@@ -1,4 +1,6 @@
 from protollm.raw_data_processing.docs_parsers.parsers.base import BaseParser
-from protollm.raw_data_processing.docs_parsers.parsers.entities import DocType, ParsingScheme
+from protollm.raw_data_processing.docs_parsers.parsers.entities import DocType, ParsingScheme, PDFBackend
 from protollm.raw_data_processing.docs_parsers.parsers.pdf import PDFParser
 from protollm.raw_data_processing.docs_parsers.parsers.word_doc import WordDocumentParser
+from protollm.raw_data_processing.docs_parsers.parsers.isolation import ParsingBudget, lazy_parse_with_budget
+from protollm.raw_data_processing.docs_parsers.parsers.quality import QualityGate
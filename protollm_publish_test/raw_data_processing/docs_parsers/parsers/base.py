@@ -1,21 +1,32 @@
 import mimetypes
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Iterator, List, Union
+from typing import Iterator, List, Optional, Union
 
 from langchain_core.document_loaders import Blob
 from langchain_core.documents import Document
 
+from protollm.raw_data_processing.docs_parsers.parsers.cache import ParsingCache
 from protollm.raw_data_processing.docs_parsers.parsers.entities import DocType
 
+# Key of the blob's metadata, in which the number of the document's pages is noted by the parser
+# or the quality gate, if they have read it
+PAGES_NUMBER_KEY = "pages_number"
+
 
 class BaseParser(ABC):
     """
     Abstract interface for parsers.
 
     A parser provides a way to parse raw data into one or more documents.
+
+    Parsed documents are cached, if the cache is set. Implementations should decorate lazy_parse
+    with cached_parsing and list the options which don't affect the result in runtime_options.
     """
 
+    cache: Optional[ParsingCache] = None
+    runtime_options: tuple[str, ...] = ()
+
     @abstractmethod
     def lazy_parse(self, blob: Blob) -> Iterator[Document]:
         """Lazy parsing interface.
@@ -46,6 +57,24 @@ class BaseParser(ABC):
         """
         return list(self.lazy_parse(blob))
 
+    def restore_cached(self, document: Document, blob: Blob) -> Document:
+        """
+        Adapts the cached document to the blob, which content is the same as the cached one's
+        """
+        return document
+
+    def get_options(self) -> dict:
+        """
+        Gets the parser's options, which affect the parsing result
+        """
+        return {
+            name: value
+            for name, value in vars(self).items()
+            if not name.startswith("_")
+            and name != "cache"
+            and name not in self.runtime_options
+        }
+
     @staticmethod
     def get_doc_type(file: Union[str, Path]) -> DocType:
         mimetype = mimetypes.guess_type(file)[0]
@@ -75,3 +104,14 @@ class BaseParser(ABC):
                 return DocType.zip
             case _:  # TODO: add txt, xlsx, pptx support
                 return DocType.unsupported
+
+    @staticmethod
+    def get_blob_doc_type(blob: Blob) -> DocType:
+        """
+        Gets the type of the blob's document by its source or, if the source is unknown, by its mimetype,
+        the loaders set the latter to the DocType's value
+        """
+        doc_type = BaseParser.get_doc_type(blob.source or "")
+        if doc_type is DocType.unsupported and blob.mimetype is not None:
+            doc_type = BaseParser.get_doc_type(f".{blob.mimetype}")
+        return doc_type
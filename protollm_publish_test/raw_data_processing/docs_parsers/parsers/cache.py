@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from functools import wraps
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from langchain_core.document_loaders import Blob
+from langchain_core.documents import Document
+
+from protollm.raw_data_processing.docs_parsers.utils.utilities import correct_path_encoding
+
+# Version of the stored documents, it should be changed if parsing results of the same options change
+CACHE_VERSION = 7
+CACHE_FILE_SUFFIX = ".pkl"
+
+
+class ParsingCache:
+    """
+    On-disk cache of the parsed documents.
+
+    Documents are stored by the hash of the blob's content and the parser's options, so unchanged files
+    are not parsed again, wherever they are. The least recently used entries are removed when the total
+    size of the cache exceeds the limit.
+
+    The cache is enabled for all parsers with `BaseParser.cache = ParsingCache(cache_dir)`
+    or for a single parser with `parser.cache = ParsingCache(cache_dir)`.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_size: int = 2**30):
+        """
+        :param cache_dir: directory for the cached documents
+        :param max_size: maximum total size of the cached documents in bytes
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.max_size = max_size
+        self._size: Optional[int] = None
+
+    def get_key(self, blob: Blob, parser_name: str, options: dict) -> str:
+        key = hashlib.sha256()
+        with blob.as_bytes_io() as file_obj:
+            for chunk in iter(lambda: file_obj.read(1 << 20), b""):
+                key.update(chunk)
+        key.update(
+            json.dumps(
+                [CACHE_VERSION, parser_name, blob.mimetype, options],
+                sort_keys=True,
+                default=str,
+            ).encode()
+        )
+        return key.hexdigest()
+
+    def load(self, key: str) -> Optional[Iterator[Document]]:
+        """
+        Gets the cached documents
+        :param key: key of the documents
+        :return: documents or None if they are not cached
+        """
+        path = self._get_path(key)
+        try:
+            os.utime(path)  # the entry is recently used now
+            file_obj = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        return self._read_documents(file_obj)
+
+    def store(self, key: str, documents: Iterator[Document]) -> Iterator[Document]:
+        """
+        Passes the documents through and stores them. The entry is saved only if all documents
+        are parsed successfully
+        :param key: key of the documents
+        :param documents: parsed documents
+        :return:
+        """
+        path = self._get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file_obj:
+                for document in documents:
+                    pickle.dump(
+                        (document.page_content, document.metadata),
+                        file_obj,
+                        protocol=pickle.HIGHEST_PROTOCOL,
+                    )
+                    yield document
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._add_size(path.stat().st_size)
+
+    def clear(self):
+        for path in self._iter_entries():
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+    def _get_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{CACHE_FILE_SUFFIX}"
+
+    def _iter_entries(self) -> Iterator[Path]:
+        if self.cache_dir.is_dir():
+            yield from self.cache_dir.glob(f"*/*{CACHE_FILE_SUFFIX}")
+
+    def _add_size(self, size: int):
+        if self._size is None:
+            self._size = sum(path.stat().st_size for path in self._iter_entries())
+        else:
+            self._size += size
+        if self._size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        """
+        Removes the least recently used entries until the cache fits in the size limit
+        """
+        entries = []
+        for path in self._iter_entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # removed by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+
+    @staticmethod
+    def _read_documents(file_obj) -> Iterator[Document]:
+        with file_obj:
+            while True:
+                try:
+                    page_content, metadata = pickle.load(file_obj)
+                except EOFError:
+                    return
+                yield Document(page_content=page_content, metadata=metadata)
+
+
+def cached_parsing(lazy_parse):
+    """
+    Makes the parser's lazy_parse use the parser's cache, if it is set
+    """
+
+    @wraps(lazy_parse)
+    def wrapper(self, blob: Blob) -> Iterator[Document]:
+        if self.cache is None:
+            yield from lazy_parse(self, blob)
+            return
+
+        key = self.cache.get_key(blob, type(self).__name__, self.get_options())
+        documents = self.cache.load(key)
+        if documents is None:
+            yield from self.cache.store(key, lazy_parse(self, blob))
+            return
+
+        # The same content can be cached for another file, so the source is updated
+        source = blob.source
+        source = correct_path_encoding(source) if source is not None else ""
+        file_name = Path(source).name
+        for document in documents:
+            if "source" in document.metadata:
+                document.metadata["source"] = source
+            if "file_name" in document.metadata:
+                document.metadata["file_name"] = file_name
+            yield self.restore_cached(document, blob)
+
+    return wrapper
@@ -3,6 +3,11 @@ from functools import partial
 from protollm.raw_data_processing.docs_parsers.parsers.converting.converted_file import (
     converted_file as __converted_file,
 )
+from protollm.raw_data_processing.docs_parsers.parsers.converting.pool import (
+    ConversionPool,
+    get_conversion_pool,
+    set_conversion_pool,
+)
 from protollm.raw_data_processing.docs_parsers.parsers.entities import ConvertingDocType
 
 converted_file_to_docx = partial(
@@ -3,6 +3,7 @@ from tempfile import TemporaryDirectory, NamedTemporaryFile
 from typing import BinaryIO, Generator, Union, Optional
 
 from protollm.raw_data_processing.docs_parsers.parsers.converting.converting import _convert_with_soffice
+from protollm.raw_data_processing.docs_parsers.parsers.converting.pool import get_conversion_pool
 from protollm.raw_data_processing.docs_parsers.parsers.entities import ConvertingDocType
 
 
@@ -22,7 +23,10 @@ def converted_file(
         tmp_file.close()
         tmp_file_path = tmp_file.name
 
-        _convert_with_soffice(
+        # warm LibreOffice instances are used if they are available, otherwise soffice is started
+        pool = get_conversion_pool()
+        convert = pool.convert if pool is not None else _convert_with_soffice
+        convert(
             filename=tmp_file_path,
             output_directory=tmp_dir,
             target_doc_type=target_doc_type,
@@ -0,0 +1,261 @@
+import atexit
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from protollm.raw_data_processing.docs_parsers.utils.exceptions import ConvertingError
+
+DEFAULT_POOL_SIZE = 2
+# Time in seconds for a LibreOffice instance to start accepting connections
+START_TIMEOUT = 60
+CONNECT_INTERVAL = 0.25
+# Export filters of the target document types
+FILTER_NAMES = {"docx": "MS Word 2007 XML"}
+
+
+class SofficeInstance:
+    """
+    LibreOffice process running in the background, which converts documents through UNO.
+
+    The instance has its own user profile, so several instances run concurrently. It is started
+    on the first conversion and restarted if it has crashed or has been killed on timeout.
+    """
+
+    def __init__(self, soffice_path: str, start_timeout: float = START_TIMEOUT):
+        self.soffice_path = soffice_path
+        self.start_timeout = start_timeout
+        self._process: Optional[subprocess.Popen] = None
+        self._profile_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._desktop = None
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self):
+        import uno
+
+        self.stop()
+        self._profile_dir = tempfile.TemporaryDirectory(prefix="soffice_profile_")
+        pipe_name = f"protollm_soffice_{os.getpid()}_{uuid.uuid4().hex}"
+        self._process = subprocess.Popen(
+            [
+                self.soffice_path,
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--norestore",
+                "--nolockcheck",
+                f"--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext",
+                f"-env:UserInstallation={Path(self._profile_dir.name).as_uri()}",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + self.start_timeout
+        while True:
+            try:
+                context = resolver.resolve(
+                    f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext"
+                )
+                break
+            except Exception:  # the instance doesn't accept connections yet
+                if not self.is_alive() or time.monotonic() > deadline:
+                    self.stop()
+                    raise ConvertingError("LibreOffice instance could not be started") from None
+                time.sleep(CONNECT_INTERVAL)
+        self._desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def stop(self):
+        if self.is_alive():
+            try:
+                self._desktop.terminate()
+                self._process.wait(timeout=5)
+            except Exception:
+                self._process.kill()
+                self._process.wait()
+        self._process = None
+        self._desktop = None
+        if self._profile_dir is not None:
+            self._profile_dir.cleanup()
+            self._profile_dir = None
+
+    def kill(self):
+        if self.is_alive():
+            self._process.kill()
+
+    def convert(
+        self,
+        filename: Union[Path, str],
+        output_path: Union[Path, str],
+        target_doc_type: str = "docx",
+        timeout: Optional[float] = None,
+    ):
+        """
+        Converts a file to a target format, the instance is killed if the conversion takes longer
+        than the timeout
+        """
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def properties(**kwargs):
+            return tuple(PropertyValue(Name=name, Value=value) for name, value in kwargs.items())
+
+        if not self.is_alive():
+            self.start()
+        timer = threading.Timer(timeout, self.kill) if timeout is not None else None
+        if timer is not None:
+            timer.start()
+        try:
+            document = self._desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(str(Path(filename).absolute())),
+                "_blank",
+                0,
+                properties(Hidden=True, ReadOnly=True),
+            )
+            if document is None:
+                raise ConvertingError(f"Could not convert file to {target_doc_type}")
+            try:
+                document.storeToURL(
+                    uno.systemPathToFileUrl(str(Path(output_path).absolute())),
+                    properties(FilterName=FILTER_NAMES[target_doc_type]),
+                )
+            finally:
+                document.close(True)
+        except ConvertingError:
+            raise
+        except Exception as error:
+            if timer is not None and timer.finished.is_set():
+                raise ConvertingError(
+                    f"Converting file to {target_doc_type} hadn't terminated after {timeout} seconds"
+                ) from None
+            raise ConvertingError(
+                f"Could not convert file to {target_doc_type}\n{error}"
+            ) from None
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+
+class ConversionPool:
+    """
+    Pool of warm LibreOffice instances. Starting LibreOffice takes several seconds, so the instances
+    are kept running between the conversions, each one converts a single document at a time.
+
+    The pool is used by `converted_file` for all documents converted in the process, it is configured
+    with `set_conversion_pool(ConversionPool(size))` or disabled with `set_conversion_pool(None)`.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, start_timeout: float = START_TIMEOUT):
+        """
+        :param size: number of LibreOffice instances, which convert documents concurrently
+        :param start_timeout: time in seconds for an instance to start accepting connections
+        """
+        if size < 1:
+            raise ValueError("The pool size should be positive")
+        soffice_path = shutil.which("soffice")
+        if soffice_path is None:
+            raise ConvertingError(
+                "soffice command was not found. Please install libreoffice on your system and try again."
+            )
+        self.size = size
+        self._owner_pid = os.getpid()
+        self._instances = [SofficeInstance(soffice_path, start_timeout) for _ in range(size)]
+        self._idle_instances = queue.SimpleQueue()
+        for instance in self._instances:
+            self._idle_instances.put(instance)
+
+    @property
+    def is_usable(self) -> bool:
+        # instances belong to the process, which has created the pool, but not to its forks
+        return os.getpid() == self._owner_pid
+
+    @contextmanager
+    def _acquired_instance(self) -> Iterator[SofficeInstance]:
+        instance = self._idle_instances.get()
+        try:
+            yield instance
+        finally:
+            self._idle_instances.put(instance)
+
+    def convert(
+        self,
+        filename: Union[Path, str],
+        output_directory: Union[Path, str],
+        target_doc_type: str = "docx",
+        timeout: Optional[float] = None,
+    ):
+        """
+        Converts a file to a target format with the first idle instance. The result is saved in the
+        output directory under the same name as the file with the target format's extension
+        """
+        if target_doc_type not in FILTER_NAMES:
+            raise ValueError("Invalid target document type")
+        output_path = Path(output_directory, ".".join((Path(filename).stem, target_doc_type)))
+        with self._acquired_instance() as instance:
+            instance.convert(filename, output_path, target_doc_type, timeout)
+
+    def close(self):
+        if not self.is_usable:
+            return
+        for instance in self._instances:
+            instance.stop()
+
+
+_conversion_pool: Optional[ConversionPool] = None
+_conversion_pool_lock = threading.Lock()
+_is_pool_configured = False
+
+
+def set_conversion_pool(pool: Optional[ConversionPool]):
+    """
+    Sets the pool used for the conversions in the process, None disables the pool
+    """
+    global _conversion_pool, _is_pool_configured
+    with _conversion_pool_lock:
+        if _conversion_pool is not None and _conversion_pool is not pool:
+            _conversion_pool.close()
+        _conversion_pool = pool
+        _is_pool_configured = True
+
+
+def get_conversion_pool() -> Optional[ConversionPool]:
+    """
+    Gets the pool used for the conversions in the process. The default pool is created on the first
+    use, if UNO bindings of LibreOffice are installed
+    :return: the pool or None if the conversions are made with the CLI
+    """
+    global _conversion_pool, _is_pool_configured
+    with _conversion_pool_lock:
+        if not _is_pool_configured:
+            _is_pool_configured = True
+            try:
+                import uno  # noqa: F401
+
+                _conversion_pool = ConversionPool()
+            except (ImportError, ConvertingError):
+                _conversion_pool = None
+        if _conversion_pool is None or not _conversion_pool.is_usable:
+            return None
+        return _conversion_pool
+
+
+@atexit.register
+def _close_conversion_pool():
+    if _conversion_pool is not None:
+        _conversion_pool.close()
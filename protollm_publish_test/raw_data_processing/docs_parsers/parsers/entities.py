@@ -20,3 +20,11 @@ class ParsingScheme(str, Enum):
     lines = "lines"
     chapters = "chapters"
     full = "full"
+
+
+class PDFBackend(str, Enum):
+    # pdfium if only the plain text is needed, otherwise pdfminer,
+    # pdfium keeps the text of the tables, which pdfminer drops unless the tables are extracted
+    auto = "auto"
+    pdfminer = "pdfminer"  # layout analysis with lines formatting, headings, tables and images
+    pdfium = "pdfium"  # plain text from the text layer only
@@ -0,0 +1,229 @@
+import multiprocessing
+import os
+import pickle
+import re
+import signal
+import time
+import warnings
+import zipfile
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from langchain_core.document_loaders import Blob
+from langchain_core.documents import Document
+
+from protollm.raw_data_processing.docs_parsers.parsers.base import BaseParser, PAGES_NUMBER_KEY
+from protollm.raw_data_processing.docs_parsers.parsers.entities import DocType
+from protollm.raw_data_processing.docs_parsers.utils.exceptions import ParsingLimitError
+from protollm.raw_data_processing.docs_parsers.utils.metrics import (
+    ParsingRecord,
+    get_group_resident_memory,
+    get_resident_memory,
+)
+
+# Interval in seconds between the checks of the parsing process time and memory
+MONITORING_INTERVAL = 0.2
+DOCX_PAGES_PATTERN = re.compile(rb"<Pages>(\d+)</Pages>")
+
+
+@dataclass
+class ParsingBudget:
+    """
+    Limits for a single document's parsing. The document is parsed in a separate process, which is
+    killed as soon as any limit is exceeded
+    """
+
+    # wall-clock time in seconds, the time the consumer spends on the yielded documents isn't counted
+    timeout: Optional[float] = None
+    # resident memory of the parsing process and its children, e.g. converters, in bytes
+    max_memory: Optional[int] = None
+    max_pages: Optional[int] = None
+    max_chars: Optional[int] = None  # total length of the parsed documents' content
+
+
+def get_pages_number(blob: Blob) -> Optional[int]:
+    """
+    Gets the number of the document's pages without parsing it
+    :param blob: representation of raw data from file
+    :return: number of pages or None if it is unknown
+    """
+    match BaseParser.get_blob_doc_type(blob):
+        case DocType.pdf:
+            import pypdfium2
+
+            with blob.as_bytes_io() as file_obj:
+                pdf = pypdfium2.PdfDocument(file_obj)
+                try:
+                    return len(pdf)
+                finally:
+                    pdf.close()
+        case DocType.docx:
+            # the number of pages is saved by the editor in the document's properties
+            with blob.as_bytes_io() as file_obj:
+                try:
+                    with zipfile.ZipFile(file_obj) as docx_file:
+                        properties = docx_file.read("docProps/app.xml")
+                except (KeyError, zipfile.BadZipFile):
+                    return None
+            pages = DOCX_PAGES_PATTERN.search(properties)
+            return int(pages.group(1)) if pages is not None else None
+        case _:
+            return None
+
+
+def _to_picklable(error: BaseException) -> BaseException:
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def _send_warnings(record: list, connection):
+    while record:
+        warning = record.pop(0)
+        connection.send(("warning", (warning.category, str(warning.message))))
+
+
+def _parse_in_process(parser: BaseParser, blob: Blob, budget: ParsingBudget, connection):
+    # The process and its children (pools, converters) are killed together by the process group
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    with warnings.catch_warnings(record=True) as record:
+        warnings.simplefilter("default")
+        try:
+            if budget.max_pages is not None:
+                pages_number = get_pages_number(blob)
+                if pages_number is not None:
+                    blob.metadata[PAGES_NUMBER_KEY] = pages_number
+                if pages_number is not None and pages_number > budget.max_pages:
+                    raise ParsingLimitError(
+                        f"The document has {pages_number} pages, the limit is {budget.max_pages}"
+                    )
+            for document in parser.lazy_parse(blob):
+                _send_warnings(record, connection)
+                connection.send(("document", document))
+        except BaseException as error:
+            _send_warnings(record, connection)
+            connection.send(("metadata", blob.metadata))
+            connection.send(("error", _to_picklable(error)))
+        else:
+            _send_warnings(record, connection)
+            # the blob's metadata noted by the parser, e.g. the number of pages
+            connection.send(("metadata", blob.metadata))
+            connection.send(("done", None))
+        finally:
+            connection.close()
+
+
+def _kill_process(process: multiprocessing.Process):
+    if process.is_alive():
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            process.kill()
+    process.join()
+
+
+def _get_context():
+    # forked process starts instantly and has the parser and the blob without pickling
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def lazy_parse_with_budget(
+    parser: BaseParser,
+    blob: Blob,
+    budget: Optional[ParsingBudget] = None,
+    parsing_record: Optional[ParsingRecord] = None,
+) -> Iterator[Document]:
+    """
+    Parses the document in a separate process within the budget. Documents and warnings are passed
+    from the process as they are parsed, and ParsingLimitError is raised if the budget is exceeded.
+    The memory is checked once in the monitoring interval for the whole process group of the parsing
+    process, so the processes it starts are counted too
+    :param parser: parser of the document
+    :param blob: representation of raw data from file
+    :param budget: limits for the parsing, the document is parsed in the current process if it is None
+    :param parsing_record: record of parsing the document, the peak memory of the separate process
+    is recorded in it
+    :return:
+    """
+    if budget is None:
+        yield from parser.lazy_parse(blob)
+        return
+
+    context = _get_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_parse_in_process, args=(parser, blob, budget, sender), daemon=False
+    )
+    start_time = time.monotonic()
+    process.start()
+    sender.close()
+
+    chars_number = 0
+    memory_check_time = start_time
+    try:
+        while True:
+            if receiver.poll(MONITORING_INTERVAL):
+                try:
+                    kind, payload = receiver.recv()
+                except EOFError:
+                    process.join()
+                    raise RuntimeError(
+                        f"Parsing process exited unexpectedly with code {process.exitcode}"
+                    )
+                match kind:
+                    case "document":
+                        chars_number += len(payload.page_content)
+                        if budget.max_chars is not None and chars_number > budget.max_chars:
+                            raise ParsingLimitError(
+                                f"The document has more than {budget.max_chars} characters"
+                            )
+                        yield_time = time.monotonic()
+                        yield payload
+                        # the deadline is postponed by the time the consumer holds the document
+                        start_time += time.monotonic() - yield_time
+                    case "warning":
+                        category, message = payload
+                        warnings.warn(message, category=category)
+                    case "metadata":
+                        blob.metadata.update(payload)
+                    case "error":
+                        raise payload
+                    case "done":
+                        return
+
+            if (
+                budget.timeout is not None
+                and time.monotonic() - start_time > budget.timeout
+            ):
+                raise ParsingLimitError(
+                    f"The document is not parsed in {budget.timeout} seconds"
+                )
+            if (
+                budget.max_memory is not None or parsing_record is not None
+            ) and time.monotonic() >= memory_check_time:
+                memory_check_time = time.monotonic() + MONITORING_INTERVAL
+                # the parsing process leads its own group, unless the system has no process groups
+                memory = (
+                    get_group_resident_memory(process.pid)
+                    if hasattr(os, "setpgrp")
+                    else get_resident_memory(process.pid)
+                )
+                if memory is None:
+                    continue
+                if parsing_record is not None:
+                    parsing_record.peak_memory = max(parsing_record.peak_memory or 0, memory)
+                if budget.max_memory is not None and memory > budget.max_memory:
+                    raise ParsingLimitError(
+                        f"The document parsing takes more than {budget.max_memory} bytes of memory"
+                    )
+    finally:
+        receiver.close()
+        _kill_process(process)
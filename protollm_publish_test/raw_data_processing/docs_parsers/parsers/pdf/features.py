@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from typing import Iterator, NamedTuple
+
+import numpy as np
+
+# Codes of the elements' types and the classes of their start symbols in the feature arrays
+ELEMENT_TYPES = ("text", "table", "image")
+TEXT, TABLE, IMAGE = range(len(ELEMENT_TYPES))
+START_SYMBOLS = ("", "letter", "digit", "symbol")
+
+
+class ElementFeatures(NamedTuple):
+    text: str
+    type: str
+    table_id: int
+    has_format: bool
+    font_size: int
+    font_name: str
+    is_bold: bool
+    line_spacing: float
+    left_margin: float
+    start_symbol: str
+
+
+@dataclass
+class PageFeatures:
+    """
+    Layout and formatting features of the page's elements stored as arrays, one item per element.
+    Formatting features are set only for the elements with text, has_format marks them
+    """
+
+    texts: list[str]
+    types: np.ndarray
+    table_ids: np.ndarray
+    bboxes: np.ndarray
+    has_format: np.ndarray
+    font_sizes: np.ndarray
+    font_names: np.ndarray
+    is_bold: np.ndarray
+    line_spacings: np.ndarray
+    start_symbols: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def left_margins(self) -> np.ndarray:
+        return self.bboxes[:, 0]
+
+    def elements(self) -> Iterator[ElementFeatures]:
+        """
+        Iterates over the page's elements with the features converted to python values
+        """
+        return map(
+            ElementFeatures._make,
+            zip(
+                self.texts,
+                [ELEMENT_TYPES[code] for code in self.types.tolist()],
+                self.table_ids.tolist(),
+                self.has_format.tolist(),
+                self.font_sizes.tolist(),
+                self.font_names.tolist(),
+                self.is_bold.tolist(),
+                self.line_spacings.tolist(),
+                self.left_margins.tolist(),
+                [START_SYMBOLS[code] for code in self.start_symbols.tolist()],
+            ),
+        )
+
+
+def most_common_values(values: np.ndarray, n: int = 1) -> np.ndarray:
+    """
+    Finds the most common values of the array. Values with equal counts are ordered by their first
+    occurrence, the same as collections.Counter does
+    :param values:
+    :param n: number of the values
+    :return:
+    """
+    unique_values, first_indexes, counts = np.unique(
+        values, return_index=True, return_counts=True
+    )
+    order = np.lexsort((first_indexes, -counts))
+    return unique_values[order[:n]]
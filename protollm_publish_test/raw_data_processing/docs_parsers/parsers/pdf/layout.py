@@ -0,0 +1,171 @@
+from typing import Optional, Sequence
+
+import numpy as np
+import pdfplumber
+import pypdfium2
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LAParams, LTPage, LTTextContainer, LTTextLine
+from pdfminer.pdfinterp import PDFPageInterpreter
+
+
+def check_layout(pages_layout):
+    text_lines_stat = []
+    for page_number, page in enumerate(pages_layout):
+        if page_number > 10:
+            break
+        # Get text length statistics in all text elements
+        for element in page:
+            if isinstance(element, LTTextContainer):
+                if not isinstance(
+                    element, LTTextLine
+                ):  # text element is a Box and should be unpacked to Lines
+                    for line in element:
+                        text_lines_stat.append(
+                            len(line.get_text().split(" "))
+                        )  # calculate number of words in parsed line
+                else:
+                    text_lines_stat.append(
+                        len(element.get_text().split(" "))
+                    )  # calculate number of words in parsed line
+    avg_words_number = np.mean(text_lines_stat) if text_lines_stat else 0
+    if avg_words_number < 4:
+        return -1
+    elif avg_words_number > 10:
+        return 1
+    else:
+        return 0
+
+
+class PDFLayoutEngine:
+    """
+    Lays out each page of a PDF document exactly once.
+
+    The document is opened a single time and the handle is shared between text, tables and images
+    extraction. Layout parameters are calibrated on a small sample of the first parsed pages, and only
+    these sample pages are laid out again if the calibration changes the parameters.
+    """
+
+    def __init__(
+        self,
+        stream,
+        layout_parsing_params: LAParams,
+        calibration_pages_number: int = 11,
+        calibrated: bool = False,
+        page_numbers: Optional[Sequence[int]] = None,
+    ):
+        """
+        :param page_numbers: numbers of the pages to parse, all pages if None
+        """
+        self._stream = stream
+        self._pdf = pdfplumber.open(stream)
+        self._layout_parsing_params = layout_parsing_params
+        self._page_numbers = (
+            range(len(self)) if page_numbers is None else page_numbers
+        )
+        self._calibration_pages_number = min(
+            calibration_pages_number, len(self._page_numbers)
+        )
+        # the parameters are used as is, if they have been already calibrated on the same document
+        self._calibrated_layouts: Optional[dict[int, LTPage]] = (
+            {} if calibrated else None
+        )
+        self._interpreter: Optional[PDFPageInterpreter] = None
+        self._device: Optional[PDFPageAggregator] = None
+        self._images_document: Optional[pypdfium2.PdfDocument] = None
+
+    def __enter__(self) -> "PDFLayoutEngine":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._pdf.pages)
+
+    @property
+    def pages(self) -> list[pdfplumber.page.Page]:
+        return self._pdf.pages
+
+    @property
+    def page_numbers(self) -> Sequence[int]:
+        return self._page_numbers
+
+    @property
+    def layout_parsing_params(self) -> LAParams:
+        return self._layout_parsing_params
+
+    @property
+    def calibration_pages_number(self) -> int:
+        return self._calibration_pages_number
+
+    def calibrate(self):
+        """
+        Tunes the word margin of the layout parameters on the sample pages, if it hasn't been done yet
+        """
+        if self._calibrated_layouts is not None:
+            return
+        sample_pages = self._page_numbers[: self._calibration_pages_number]
+        sample_layouts = [self._layout_page(i) for i in sample_pages]
+        check_layout_res = check_layout(sample_layouts)
+
+        word_margin = self._layout_parsing_params.word_margin
+        if check_layout_res == 1:
+            self._layout_parsing_params.word_margin = word_margin + 2
+        elif check_layout_res == -1:
+            self._layout_parsing_params.word_margin = 0.1
+
+        if self._layout_parsing_params.word_margin != word_margin:
+            self._device = self._interpreter = None
+            sample_layouts = [self._layout_page(i) for i in sample_pages]
+
+        self._calibrated_layouts = dict(zip(sample_pages, sample_layouts))
+
+    def page_layout(self, page_number: int) -> LTPage:
+        """
+        Returns the layout of the page parsed with the calibrated parameters
+        """
+        if self._calibrated_layouts is None:
+            self.calibrate()
+        layout = self._calibrated_layouts.pop(page_number, None)
+        if layout is None:
+            layout = self._layout_page(page_number)
+        return layout
+
+    def table_page(self, page_number: int, page_layout: LTPage) -> pdfplumber.page.Page:
+        """
+        Returns the page for the tables search, which takes the page's objects from the given layout
+        instead of interpreting the page again. The page should be closed after the search
+        """
+        page = self._pdf.pages[page_number]
+        # pdfplumber caches the page's layout in this attribute. The document is opened without
+        # layout parameters, so only the chars, lines, rects and curves are collected from the layout's
+        # containers, the same as from the page's own layout
+        page._layout = page_layout
+        return page
+
+    def image_page(self, page_number: int) -> pypdfium2.PdfPage:
+        """
+        Returns the page for the images rasterising, the document is opened with pypdfium2 on the first call
+        """
+        if self._images_document is None:
+            self._images_document = pypdfium2.PdfDocument(self._stream)
+        if not 0 <= page_number < len(self._images_document):
+            raise IndexError(f"The document has no page {page_number}")
+        return self._images_document[page_number]
+
+    def close(self):
+        self._calibrated_layouts = None
+        self._device = self._interpreter = None
+        if self._images_document is not None:
+            self._images_document.close()
+            self._images_document = None
+        self._pdf.close()
+
+    def _layout_page(self, page_number: int) -> LTPage:
+        if self._interpreter is None:
+            self._device = PDFPageAggregator(
+                self._pdf.rsrcmgr, laparams=self._layout_parsing_params
+            )
+            self._interpreter = PDFPageInterpreter(self._pdf.rsrcmgr, self._device)
+        self._interpreter.process_page(self._pdf.pages[page_number].page_obj)
+        return self._device.get_result()
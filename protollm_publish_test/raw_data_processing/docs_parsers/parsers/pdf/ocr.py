@@ -0,0 +1,119 @@
+import hashlib
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pytesseract
+from PIL import Image
+
+from protollm.raw_data_processing.docs_parsers.utils.exceptions import ParseImageWarning
+
+# Resolution of the rasterised images, the same as pdf2image uses by default
+OCR_RESOLUTION = 200
+OCR_CACHE_SIZE = 1024
+
+# Recognized texts by the image content hash, shared by all documents parsed in the process
+_recognized_texts: OrderedDict[str, str] = OrderedDict()
+_recognized_texts_lock = threading.Lock()
+
+
+def render_region(pdfium_page, bbox, resolution: int = OCR_RESOLUTION) -> Image.Image:
+    """
+    Rasterises only the given region of the page in memory
+    :param pdfium_page: page of the document opened with pypdfium2
+    :param bbox: bounding box of the region in the page's coordinates
+    :param resolution: resolution in dots per inch
+    :return:
+    """
+    page_left, page_bottom, page_right, page_top = pdfium_page.get_bbox()
+    x0, y0, x1, y1 = bbox
+    crop = (
+        max(x0 - page_left, 0),
+        max(y0 - page_bottom, 0),
+        max(page_right - x1, 0),
+        max(page_top - y1, 0),
+    )
+    bitmap = pdfium_page.render(scale=resolution / 72, crop=crop)
+    return bitmap.to_pil()
+
+
+def get_image_hash(image: Image.Image) -> str:
+    content_hash = hashlib.sha256(image.tobytes())
+    content_hash.update(f"{image.mode}{image.size}".encode())
+    return content_hash.hexdigest()
+
+
+def image_to_text(image: Image.Image) -> str:
+    try:
+        # Extract the text from the image
+        return pytesseract.image_to_string(image)
+    except (pytesseract.TesseractError, pytesseract.TesseractNotFoundError) as error:
+        warnings.warn(
+            f"Can not recognize text in image: {error}", category=ParseImageWarning
+        )
+        return ""
+
+
+def recognize_images(
+    layout_engine,
+    images_bboxes: list[tuple[int, tuple]],
+    n_jobs: int = 1,
+    resolution: int = OCR_RESOLUTION,
+) -> list[str]:
+    """
+    Recognizes text in the images of the document. Images are rasterised in memory one by one and
+    recognized in a pool of threads, identical ones are recognized once and the results are cached
+    by the image content hash. The images of the pages missing in the document are left without text
+    :param layout_engine: engine with the opened document
+    :param images_bboxes: page numbers and bounding boxes of the images
+    :param n_jobs: number of threads for the text recognition
+    :param resolution: resolution of the rasterised images in dots per inch
+    :return: texts of the images in the given order
+    """
+    n_jobs = max(n_jobs, 1)
+    images_texts = [""] * len(images_bboxes)
+    recognizing = {}  # image hash -> recognition future and indexes of the images
+    in_progress = set()
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        missing_pages = set()
+        for i, (page_number, bbox) in enumerate(images_bboxes):
+            if page_number in missing_pages:
+                continue
+            try:
+                image_page = layout_engine.image_page(page_number)
+            except IndexError:
+                warnings.warn(
+                    "Error in pages structure formatting", category=ParseImageWarning
+                )
+                missing_pages.add(page_number)
+                continue
+            image = render_region(image_page, bbox, resolution)
+            image_hash = get_image_hash(image)
+            with _recognized_texts_lock:
+                text = _recognized_texts.get(image_hash)
+                if text is not None:
+                    _recognized_texts.move_to_end(image_hash)
+            if text is not None:
+                images_texts[i] = text
+            elif image_hash in recognizing:
+                recognizing[image_hash][1].append(i)
+            else:
+                # Limit the number of rasterised images waiting for the recognition
+                if len(in_progress) >= 2 * n_jobs:
+                    _, in_progress = wait(in_progress, return_when=FIRST_COMPLETED)
+                future = executor.submit(image_to_text, image)
+                in_progress.add(future)
+                recognizing[image_hash] = (future, [i])
+
+    for image_hash, (future, indexes) in recognizing.items():
+        text = future.result()
+        for i in indexes:
+            images_texts[i] = text
+        with _recognized_texts_lock:
+            _recognized_texts[image_hash] = text
+            if len(_recognized_texts) > OCR_CACHE_SIZE:
+                _recognized_texts.popitem(last=False)
+
+    return images_texts
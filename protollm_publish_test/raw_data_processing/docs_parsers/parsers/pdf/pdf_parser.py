@@ -1,26 +1,45 @@
-import re
 import warnings
+from collections import deque
 from pathlib import Path
-from typing import Iterator, Union
+from typing import Callable, Iterable, Iterator, Optional, Union
 
 from langchain_core.document_loaders import Blob
 from langchain_core.documents import Document
 
 from protollm.raw_data_processing.docs_parsers.utils.exceptions import (
-    EncodingError,
     ChaptersExtractingFailedWarning,
 )
-from protollm.raw_data_processing.docs_parsers.parsers.base import BaseParser
-from protollm.raw_data_processing.docs_parsers.parsers.entities import ParsingScheme
+from protollm.raw_data_processing.docs_parsers.parsers.base import BaseParser, PAGES_NUMBER_KEY
+from protollm.raw_data_processing.docs_parsers.parsers.cache import cached_parsing
+from protollm.raw_data_processing.docs_parsers.parsers.entities import ParsingScheme, PDFBackend
+from protollm.raw_data_processing.docs_parsers.parsers.text_normalizer import dehyphenate
 from protollm.raw_data_processing.docs_parsers.parsers.utilities import CONTENTS_KEYWORDS
-from protollm.raw_data_processing.docs_parsers.utils.utilities import correct_path_encoding, is_bad_encoding
+from protollm.raw_data_processing.docs_parsers.utils.utilities import correct_path_encoding
 
 
 class PDFParser(BaseParser):
     """
     The parser provides a way to parse raw data from PDF into one or more documents.
+
+    In the incremental mode the parsed pages are stored in a temporary file instead of memory,
+    and for the lines and paragraphs parsing schemes the documents are yielded as the pages
+    are completed. The heading extraction correctness flag of the paragraphs covers the lines
+    parsed so far then.
+
+    The text is extracted with the pdfminer layout analysis, which gives the lines formatting needed
+    for the headings, tables and images. If only the plain text of the whole document is needed,
+    the much faster pdfium backend is chosen automatically, it reads the text layer directly.
+    Its text differs from the pdfminer one: the text of the tables is kept, and the lines follow
+    the order of the text layer instead of the layout. Pass the pdfminer backend to get the text
+    of the layout analysis for the full parsing scheme.
+
+    Only a part of the document can be parsed with the page range and the maximum number of pages,
+    the other pages are not laid out at all. Before the layout analysis the pages are checked for
+    the text layer, so the scans are rejected with NoTextLayerError right away.
     """
 
+    runtime_options = ("n_jobs",)
+
     def __init__(
         self,
         parsing_scheme: Union[ParsingScheme, str] = ParsingScheme.lines,
@@ -28,7 +47,17 @@ class PDFParser(BaseParser):
         extract_tables: bool = False,
         parse_formulas: bool = False,
         remove_service_info: bool = False,
+        n_jobs: int = 1,
+        incremental: bool = False,
+        backend: Union[PDFBackend, str] = PDFBackend.auto,
+        page_range: Optional[tuple[int, int]] = None,
+        max_pages: Optional[int] = None,
     ):
+        """
+        :param page_range: zero-based numbers of the first page and the page after the last one to parse,
+        all pages if None
+        :param max_pages: maximum number of the pages to parse from the start of the range
+        """
         try:
             import protollm.raw_data_processing.docs_parsers.parsers.pdf.utilities
         except ImportError as error:
@@ -37,12 +66,45 @@ class PDFParser(BaseParser):
             )
         if parsing_scheme not in ParsingScheme.__members__:
             raise ValueError("Invalid parsing scheme")
+        if backend not in PDFBackend.__members__:
+            raise ValueError("Invalid backend")
+        if page_range is not None and not 0 <= page_range[0] < page_range[1]:
+            raise ValueError("Invalid page range")
+        if max_pages is not None and max_pages < 1:
+            raise ValueError("Invalid maximum number of pages")
         self.parsing_scheme = parsing_scheme
         self.extract_images = extract_images
         self.extract_tables = extract_tables
         self.parse_formulas = parse_formulas
         self.remove_service_info = remove_service_info
+        self.n_jobs = n_jobs
+        self.incremental = incremental
+        self.page_range = tuple(page_range) if page_range is not None else None
+        self.max_pages = max_pages
+        self.backend = self._choose_backend(PDFBackend(backend))
 
+    def _choose_backend(self, backend: PDFBackend) -> PDFBackend:
+        """
+        Chooses pdfium backend for the plain text extraction, when the lines formatting is not needed
+        :param backend: requested backend
+        :return:
+        """
+        is_plain_text = self.parsing_scheme == ParsingScheme.full and not (
+            self.extract_images
+            or self.extract_tables
+            or self.parse_formulas
+            or self.remove_service_info
+        )
+        if backend is PDFBackend.auto:
+            return PDFBackend.pdfium if is_plain_text else PDFBackend.pdfminer
+        if backend is PDFBackend.pdfium and not is_plain_text:
+            raise ValueError(
+                "pdfium backend extracts only the plain text, it supports the full parsing scheme "
+                "without images, tables, formulas and service info removal"
+            )
+        return backend
+
+    @cached_parsing
     def lazy_parse(self, blob: Blob) -> Iterator[Document]:
         from protollm.raw_data_processing.docs_parsers.parsers.pdf.utilities import extract_by_lines
 
@@ -50,23 +112,43 @@ class PDFParser(BaseParser):
         source = correct_path_encoding(source) if source is not None else ""
         file_name = Path(source).name
 
+        def note_pages_number(pages_number: int):
+            blob.metadata[PAGES_NUMBER_KEY] = pages_number
+
         with blob.as_bytes_io() as pdf_file_obj:
+            if self.backend is PDFBackend.pdfium:
+                yield from self._parse_plain_text(
+                    pdf_file_obj, source, file_name, note_pages_number
+                )
+                return
+
+            if self.incremental and self.parsing_scheme in (
+                ParsingScheme.lines,
+                ParsingScheme.paragraphs,
+            ):
+                yield from self._split_to_documents(
+                    self._iter_lines_incrementally(pdf_file_obj, note_pages_number),
+                    True,
+                    source,
+                    file_name,
+                )
+                return
+
             lines, metadata = extract_by_lines(
                 pdf_file_obj,
                 parse_images=self.extract_images,
                 parse_tables=self.extract_tables,
                 parse_formulas=self.parse_formulas,
                 remove_service_info=self.remove_service_info,
+                n_jobs=self.n_jobs,
+                page_range=self.page_range,
+                max_pages=self.max_pages,
+                on_pages_number=note_pages_number,
             )
 
         if not lines:
             return
 
-        if is_bad_encoding(lines):
-            raise EncodingError(
-                "It is impossible to parse the file due to uncertainty in the text encoding"
-            )
-
         # Get info about maximum titles hierarchy level
         max_hierarchy_lvl = max([len(x["headings"]) for x in metadata])
 
@@ -76,35 +158,132 @@ class PDFParser(BaseParser):
                 is_heading_extracting_correct = False
                 break
 
-        if max_hierarchy_lvl != 0:
-            upd_lines = []
-            upd_metadata = []
-            for text, meta in zip(lines, metadata):
+        yield from self._split_to_documents(
+            self._filter_lines(zip(lines, metadata), max_hierarchy_lvl != 0),
+            is_heading_extracting_correct,
+            source,
+            file_name,
+        )
+
+    def _parse_plain_text(
+        self,
+        stream,
+        source: str,
+        file_name: str,
+        on_pages_number: Optional[Callable[[int], None]] = None,
+    ) -> Iterator[Document]:
+        """
+        Parses the document's text with pdfium backend, without the layout analysis
+        :param stream: binary input
+        :param source:
+        :param file_name:
+        :param on_pages_number: called with the number of the document's pages
+        :return:
+        """
+        from protollm.raw_data_processing.docs_parsers.parsers.pdf.text_backend import extract_text_lines
+
+        lines = extract_text_lines(stream, self.page_range, self.max_pages, on_pages_number)
+        if not lines:
+            return
+
+        # There are no headings in the plain text, so none of them is extracted incorrectly
+        yield from self._split_to_documents(
+            ((text, {}) for text in lines), True, source, file_name
+        )
+
+    def _iter_lines_incrementally(
+        self, stream, on_pages_number: Optional[Callable[[int], None]] = None
+    ) -> Iterator[tuple[str, dict]]:
+        """
+        Yields the document's lines with their meta as the pages are parsed. Lines are buffered only
+        until the first heading is found
+        :param stream: binary input
+        :param on_pages_number: called with the number of the document's pages
+        :return:
+        """
+        from protollm.raw_data_processing.docs_parsers.parsers.pdf.utilities import iter_pages_by_lines
+
+        lines_with_meta = (
+            line_with_meta
+            for page_content, page_meta in iter_pages_by_lines(
+                stream,
+                parse_images=self.extract_images,
+                parse_tables=self.extract_tables,
+                parse_formulas=self.parse_formulas,
+                remove_service_info=self.remove_service_info,
+                n_jobs=self.n_jobs,
+                incremental=True,
+                page_range=self.page_range,
+                max_pages=self.max_pages,
+                on_pages_number=on_pages_number,
+            )
+            for line_with_meta in zip(page_content, page_meta)
+        )
+
+        buffer = deque()
+        has_headings = False
+        for text, meta in lines_with_meta:
+            buffer.append((text, meta))
+            if len(meta["headings"]) > 0:
+                has_headings = True
+                break
+
+        def drain_buffer():
+            while buffer:
+                yield buffer.popleft()
+
+        # If there are no headings, all lines are already in the buffer
+        yield from self._filter_lines(drain_buffer(), has_headings)
+        yield from self._filter_lines(lines_with_meta, has_headings)
+
+    def _filter_lines(
+        self, lines_with_meta: Iterable[tuple[str, dict]], has_headings: bool
+    ) -> Iterator[tuple[str, dict]]:
+        """
+        Skips the table of contents if service info should be removed, or marks all lines
+        as the parts of the whole document if there are no headings in it
+        :param lines_with_meta: the document's lines with their meta
+        :param has_headings: whether the document has any headings
+        :return:
+        """
+        for text, meta in lines_with_meta:
+            if has_headings:
                 if self.remove_service_info:
                     if (
                         len(meta["headings"]) > 0
                         and meta["headings"][0].lower() in CONTENTS_KEYWORDS
                     ):  # len(meta['headings']) == 0 or
                         continue
-                upd_lines.append(text)
-                upd_metadata.append(meta)
-            lines = upd_lines
-            metadata = upd_metadata
-        else:
-            for i in range(len(metadata)):
-                metadata[i]["headings"].append("Документ")
+            else:
+                # the lines can share the same headings list, so it is replaced, not extended
+                meta["headings"] = [*meta["headings"], "Документ"]
+            yield text, meta
 
+    def _split_to_documents(
+        self,
+        lines_with_meta: Iterable[tuple[str, dict]],
+        is_heading_extracting_correct: bool,
+        source: str,
+        file_name: str,
+    ) -> Iterator[Document]:
+        """
+        Splits the document's lines to documents according to the parsing scheme
+        :param lines_with_meta: the document's lines with their meta
+        :param is_heading_extracting_correct: whether all headings of the document are extracted correctly
+        :param source:
+        :param file_name:
+        :return:
+        """
         match self.parsing_scheme:
             case ParsingScheme.lines:
-                for text, meta in zip(lines, metadata):
+                for text, meta in lines_with_meta:
                     yield Document(
                         page_content=text,
                         metadata={**meta, "source": source, "file_name": file_name},
                     )
             case ParsingScheme.full:
-                text = " ".join([x.strip() for x in lines])
-                pattern = r"(?<=[А-Яа-яёЁ])-\s"
-                text = re.sub(pattern, "", text)
+                text = " ".join([x.strip() for x, _ in lines_with_meta])
+                text = dehyphenate(text)
                 meta = {
                     "page": "all",
                     "source": source,
@@ -120,7 +299,7 @@ class PDFParser(BaseParser):
                     )
                 text_lst = []
                 heading = ""
-                for text, meta in zip(lines, metadata):
+                for text, meta in lines_with_meta:
                     if len(meta["headings"]) != 0:  # text is a part of some chapter
                         if (
                             meta["headings"][0] == heading
@@ -139,8 +318,7 @@ class PDFParser(BaseParser):
 
                             text_lst = [text]
                             heading = meta["headings"][0]
-                            pattern = r"(?<=[А-Яа-яёЁ])-\s"
-                            document_text = re.sub(pattern, "", document_text)
+                            document_text = dehyphenate(document_text)
                             yield Document(
                                 page_content=document_text, metadata=document_meta
                             )
@@ -149,8 +327,7 @@ class PDFParser(BaseParser):
                             heading = meta["headings"][0]
                 if len(text_lst) != 0:
                     document_text = " ".join(text_lst)
-                    pattern = r"(?<=[А-Яа-яёЁ])-\s"
-                    document_text = re.sub(pattern, "", document_text)
+                    document_text = dehyphenate(document_text)
                     document_meta = {
                         "heading": heading,
                         "source": source,
@@ -167,7 +344,11 @@ class PDFParser(BaseParser):
                     "file_name": file_name,
                     "is_heading_extracting_correct": is_heading_extracting_correct,
                 }
-                for text, meta in zip(lines, metadata):
+                for text, meta in lines_with_meta:
+                    is_heading_extracting_correct = (
+                        is_heading_extracting_correct
+                        and meta["is_heading_extracting_correct"]
+                    )
                     if len(meta["headings"]) != 0:  # text is a part of some chapter
                         if (
                             meta["paragraph"] != -1
@@ -188,8 +369,7 @@ class PDFParser(BaseParser):
                                 document_text = " ".join(text_lst)
                                 text_lst = [text]
                                 paragraph = meta["paragraph"]
-                                pattern = r"(?<=[А-Яа-яёЁ])-\s"
-                                document_text = re.sub(pattern, "", document_text)
+                                document_text = dehyphenate(document_text)
                                 yield Document(
                                     page_content=document_text, metadata=document_meta
                                 )
@@ -198,8 +378,7 @@ class PDFParser(BaseParser):
                                 paragraph = meta["paragraph"]
                 if len(text_lst) != 0:
                     document_text = " ".join(text_lst)
-                    pattern = r"(?<=[А-Яа-яёЁ])-\s"
-                    document_text = re.sub(pattern, "", document_text)
+                    document_text = dehyphenate(document_text)
                     yield Document(page_content=document_text, metadata=document_meta)
             case _:
                 raise NotImplementedError(
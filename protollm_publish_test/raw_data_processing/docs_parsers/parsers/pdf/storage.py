@@ -0,0 +1,47 @@
+import pickle
+from tempfile import TemporaryFile
+from typing import Any, Iterator
+
+
+class PagesStorage:
+    """
+    Sequential storage for the processed pages of a document.
+
+    Pages are kept in memory or, if the storage is on disk, pickled one by one into a temporary file,
+    so only the page being read or written is kept in memory.
+    """
+
+    def __init__(self, on_disk: bool = False):
+        self._on_disk = on_disk
+        self._pages: list[Any] = []
+        self._pages_number = 0
+        self._file = TemporaryFile() if on_disk else None
+
+    def __enter__(self) -> "PagesStorage":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._pages_number
+
+    def append(self, page: Any):
+        if self._on_disk:
+            pickle.dump(page, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            self._pages.append(page)
+        self._pages_number += 1
+
+    def __iter__(self) -> Iterator[Any]:
+        if not self._on_disk:
+            yield from self._pages
+            return
+        self._file.seek(0)
+        for _ in range(self._pages_number):
+            yield pickle.load(self._file)
+
+    def close(self):
+        self._pages = []
+        if self._file is not None:
+            self._file.close()
@@ -0,0 +1,74 @@
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Optional
+
+from pdfminer.layout import LTCurve, LTFigure, LTPage
+from pdfplumber.table import Table
+from tabulate import tabulate
+
+
+def has_table_candidates(layout_objects) -> bool:
+    """
+    Checks if there are any ruling lines on the page. pdfplumber builds tables from lines, rects and curves
+    edges, so there is no need to search for tables on the page without them
+    :param layout_objects: page's layout or figure
+    :return:
+    """
+    for layout_object in layout_objects:
+        if isinstance(layout_object, LTCurve):  # LTLine and LTRect are curves as well
+            return True
+        if isinstance(layout_object, LTFigure) and has_table_candidates(layout_object):
+            return True
+    return False
+
+
+def convert_table_to_html(table) -> str:
+    """
+    Converts table to string in html format
+    :param table:
+    :return:
+    """
+    processed_table = [
+        [item.replace("\n", " ") if item is not None else "" for item in row]
+        for row in table
+    ]
+
+    return tabulate(processed_table, headers="firstrow", tablefmt="html")
+
+
+class PageTablesIndex:
+    """
+    Spatial index over the bounding boxes of the page's tables.
+
+    Tables are sorted by their top border with the running maximum of the bottom borders, so a table
+    containing a text line is found by a binary search instead of scanning all tables of the page.
+    """
+
+    def __init__(self, page: LTPage, tables: list[Table]):
+        self._page_top = page.bbox[3]
+        bboxes = [table.bbox for table in tables]
+        self._order = sorted(range(len(bboxes)), key=lambda i: bboxes[i][1])
+        self._bboxes = [bboxes[i] for i in self._order]
+        self._tops = [bbox[1] for bbox in self._bboxes]
+        self._max_bottoms = list(accumulate((bbox[3] for bbox in self._bboxes), max))
+
+    def find_table(self, element) -> Optional[int]:
+        """
+        Finds the index of the first table which contains the element
+        :param element: text line from the page's layout
+        :return: index of the table in the list of the page's tables or None
+        """
+        # Convert the element's coordinates to the pdfplumber's ones (from the top of the page)
+        x0, y0up, x1, y1up = element.bbox
+        y0 = self._page_top - y1up
+        y1 = self._page_top - y0up
+
+        table_id = None
+        position = bisect_right(self._tops, y0) - 1
+        while position >= 0 and self._max_bottoms[position] >= y1:
+            tx0, ty0, tx1, ty1 = self._bboxes[position]
+            if tx0 <= x0 <= x1 <= tx1 and ty0 <= y0 <= y1 <= ty1:
+                if table_id is None or self._order[position] < table_id:
+                    table_id = self._order[position]
+            position -= 1
+        return table_id
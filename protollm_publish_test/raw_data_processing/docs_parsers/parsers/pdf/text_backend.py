@@ -0,0 +1,142 @@
+from typing import Callable, Optional, Sequence
+
+import pypdfium2
+
+from protollm.raw_data_processing.docs_parsers.parsers.text_normalizer import TextNormalizer
+from protollm.raw_data_processing.docs_parsers.utils.exceptions import NoTextLayerError
+
+
+# Number of the pages checked for the text layer first, they are spread over the parsed pages
+TEXT_LAYER_SAMPLE_SIZE = 3
+
+
+def select_pages(
+    pages_number: int,
+    page_range: Optional[tuple[int, int]] = None,
+    max_pages: Optional[int] = None,
+) -> range:
+    """
+    Gets the numbers of the pages to parse
+    :param pages_number: number of the document's pages
+    :param page_range: zero-based numbers of the first page and the page after the last one,
+    all pages if None
+    :param max_pages: maximum number of the pages to parse from the start of the range
+    :return:
+    """
+    start, stop = page_range if page_range is not None else (0, pages_number)
+    stop = min(stop, pages_number)
+    if max_pages is not None:
+        stop = min(stop, start + max_pages)
+    return range(start, max(start, stop))
+
+
+def get_pages_number(stream) -> int:
+    pdf = pypdfium2.PdfDocument(stream)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def has_text_layer(stream, page_numbers: Optional[Sequence[int]] = None) -> bool:
+    """
+    Checks if any of the pages has text without the layout analysis. A few pages spread over the document
+    are checked first, so for the documents with text the result is obtained on the first pages checked
+    and only the scans are checked entirely
+    :param stream: binary input
+    :param page_numbers: numbers of the pages to check, all pages if None
+    :return:
+    """
+    pdf = pypdfium2.PdfDocument(stream)
+    try:
+        if page_numbers is None:
+            page_numbers = range(len(pdf))
+        step = max(1, len(page_numbers) // TEXT_LAYER_SAMPLE_SIZE)
+        sample = page_numbers[::step][:TEXT_LAYER_SAMPLE_SIZE]
+        for page_number in [*sample, *(i for i in page_numbers if i not in sample)]:
+            page = pdf[page_number]
+            text_page = page.get_textpage()
+            try:
+                if text_page.count_chars() > 0:
+                    return True
+            finally:
+                text_page.close()
+                page.close()
+        return False
+    finally:
+        pdf.close()
+
+
+def sample_text_lines(stream, sample_size: int = TEXT_LAYER_SAMPLE_SIZE) -> list[str]:
+    """
+    Extracts text lines of a few pages spread over the document straight from its text layer
+    :param stream: binary input
+    :param sample_size: number of the sampled pages
+    :return: non-empty lines of the sampled pages
+    """
+    lines = []
+    pdf = pypdfium2.PdfDocument(stream)
+    try:
+        page_numbers = range(len(pdf))
+        step = max(1, len(page_numbers) // sample_size)
+        for page_number in page_numbers[::step][:sample_size]:
+            page = pdf[page_number]
+            text_page = page.get_textpage()
+            try:
+                page_text = text_page.get_text_range()
+            finally:
+                text_page.close()
+                page.close()
+            lines.extend(line.strip() for line in page_text.splitlines())
+    finally:
+        pdf.close()
+    return [line for line in lines if line]
+
+
+def extract_text_lines(
+    stream,
+    page_range: Optional[tuple[int, int]] = None,
+    max_pages: Optional[int] = None,
+    on_pages_number: Optional[Callable[[int], None]] = None,
+) -> list[str]:
+    """
+    Extracts text lines of the document straight from its text layer with pdfium. There is no layout
+    analysis, so the lines have no formatting, headings and tables info, and the order of the lines
+    is the order of the text in the document
+    :param stream: binary input
+    :param page_range: zero-based numbers of the first page and the page after the last one to parse,
+    all pages if None
+    :param max_pages: maximum number of the pages to parse from the start of the range
+    :param on_pages_number: called with the number of the document's pages
+    :return:
+    """
+    lines = []
+
+    pdf = pypdfium2.PdfDocument(stream)
+    try:
+        if on_pages_number is not None:
+            on_pages_number(len(pdf))
+        page_numbers = select_pages(len(pdf), page_range, max_pages)
+        # there is nothing to check the text layer on, if no pages are selected
+        is_text_in_doc = not page_numbers
+        for page_number in page_numbers:
+            page = pdf[page_number]
+            text_page = page.get_textpage()
+            try:
+                is_text_in_doc = is_text_in_doc or text_page.count_chars() > 0
+                page_text = text_page.get_text_range()
+            finally:
+                text_page.close()
+                page.close()
+
+            lines.extend(line.strip() for line in page_text.splitlines())
+    finally:
+        pdf.close()
+
+    if not is_text_in_doc:
+        raise NoTextLayerError("Document contains no text layer, only images")
+
+    lines = [line for line in lines if line]
+    text_normalizer = TextNormalizer(lines)
+    text_normalizer.check_encoding()
+    return [text_normalizer.normalize(line) for line in lines]
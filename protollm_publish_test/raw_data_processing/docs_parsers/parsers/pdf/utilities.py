@@ -1,30 +1,50 @@
+import io
+import math
+import os
 import re
 import warnings
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from functools import reduce
+from typing import Iterator
 
-import PyPDF2
 import numpy as np
-import pdfplumber
-import pytesseract
-from PIL import Image
-from ftfy import fix_text
-from pdf2image import convert_from_path
-from pdfminer.high_level import extract_pages
 from pdfminer.layout import LTTextContainer, LTChar, LTFigure, LTTextLine, LAParams
-from tabulate import tabulate
 
 from protollm.raw_data_processing.docs_parsers.utils.exceptions import (
     NoTextLayerError,
-    ParseImageWarning,
     TitleExtractingWarning,
-    PageNumbersExtractingWarning,
 )
 from protollm.raw_data_processing.docs_parsers.parsers.utilities import (
     HEADING_KEYWORDS,
     HEADING_STOP_LIST,
     FOOTER_KEYWORDS,
 )
+from protollm.raw_data_processing.docs_parsers.parsers.text_normalizer import (
+    ENCODING_SAMPLE_SIZE,
+    TextNormalizer,
+)
+from protollm.raw_data_processing.docs_parsers.parsers.pdf.features import (
+    ELEMENT_TYPES,
+    IMAGE,
+    START_SYMBOLS,
+    TABLE,
+    PageFeatures,
+    most_common_values,
+)
+from protollm.raw_data_processing.docs_parsers.parsers.pdf.layout import PDFLayoutEngine
+from protollm.raw_data_processing.docs_parsers.parsers.pdf.ocr import recognize_images
+from protollm.raw_data_processing.docs_parsers.parsers.pdf.storage import PagesStorage
+from protollm.raw_data_processing.docs_parsers.parsers.pdf.tables import (
+    PageTablesIndex,
+    convert_table_to_html,
+    has_table_candidates,
+)
+from protollm.raw_data_processing.docs_parsers.parsers.pdf.text_backend import (
+    get_pages_number,
+    has_text_layer,
+    select_pages,
+)
 
 listmerge = lambda s: reduce(lambda d, el: d.extend(el) or d, s, [])
 
@@ -48,120 +68,15 @@ def text_extraction(element):
     return line_text, format_per_line
 
 
-def extract_table(stream, page_num, table_num):
-    """
-    Function for extracting tables from the page
-    :param stream: binary input
-    :param page_num:
-    :param table_num:
-    :return:
-    """
-    pdf = pdfplumber.open(stream)
-    table_page = pdf.pages[page_num]
-    table = table_page.extract_tables()[table_num]
-
-    return table
-
-
-def convert_table_to_html(table) -> str:
-    """
-    Converts table to string in html format
-    :param table:
-    :return:
-    """
-    processed_table = [
-        [item.replace("\n", " ") if item is not None else "" for item in row]
-        for row in table
-    ]
-
-    return tabulate(processed_table, headers="firstrow", tablefmt="html")
-
-
-def is_element_inside_any_table(element, page, tables):
+def get_heading_info(element, heading_env, doc_info):
     """
-    Checks if the element is in any tables present in the page
-    :param element:
-    :param page:
-    :param tables:
-    :return:
+    Gets the heading level of the text line
+    :param element: features of the text line
+    :param heading_env: level of the current heading's environment
+    :param doc_info: info about the general document's formatting
+    :return: heading level or -1 if the line is not a part of any heading
     """
-    x0, y0up, x1, y1up = element.bbox
-
-    y0 = page.bbox[3] - y1up
-    y1 = page.bbox[3] - y0up
-    for table in tables:
-        tx0, ty0, tx1, ty1 = table.bbox
-        if tx0 <= x0 <= x1 <= tx1 and ty0 <= y0 <= y1 <= ty1:
-            return True
-    return False
-
-
-def find_table_for_element(element, page, tables):
-    """
-    Find the table's index for a given element
-    :param element:
-    :param page:
-    :param tables:
-    :return:
-    """
-    x0, y0up, x1, y1up = element.bbox
-    y0 = page.bbox[3] - y1up
-    y1 = page.bbox[3] - y0up
-    for i, table in enumerate(tables):
-        tx0, ty0, tx1, ty1 = table.bbox
-        if tx0 <= x0 <= x1 <= tx1 and ty0 <= y0 <= y1 <= ty1:
-            return i
-    return None
-
-
-def crop_image(element, pageObj):
-    """
-    Crops the image elements from PDFs
-    :param element:
-    :param pageObj:
-    :return:
-    """
-    [image_left, image_top, image_right, image_bottom] = [
-        element.x0,
-        element.y0,
-        element.x1,
-        element.y1,
-    ]
-
-    pageObj.mediabox.lower_left = (image_left, image_bottom)
-    pageObj.mediabox.upper_right = (image_right, image_top)
-
-    cropped_pdf_writer = PyPDF2.PdfWriter()
-    cropped_pdf_writer.add_page(pageObj)
-
-    with open("cropped_image.pdf", "wb") as cropped_pdf_file:
-        cropped_pdf_writer.write(cropped_pdf_file)
-
-
-def convert_to_images(
-    input_file,
-):
-    """
-    Converts the PDF to images
-    :param input_file:
-    :return:
-    """
-    images = convert_from_path(input_file)
-    image = images[0]
-    output_file = "PDF_image.png"
-    image.save(output_file, "PNG")
-
-
-def image_to_text(image_path):
-    # Read the image
-    img = Image.open(image_path)
-    # Extract the text from the image
-    text = pytesseract.image_to_string(img)
-    return text
-
-
-def get_heading_info(element_info, heading_env, doc_info):
-    element_text = element_info["element"].get_text().replace("\n", " ").strip()
+    element_text = element.text.replace("\n", " ").strip()
     for stop_word in HEADING_STOP_LIST:
         if stop_word in element_text.lower():
             return -1
@@ -180,10 +95,10 @@ def get_heading_info(element_info, heading_env, doc_info):
         return -1
 
     # Get meta info about the element
-    numeric_pref = get_numeric_prefix_str(element_info["element"])
-    is_bold = element_info["meta"]["format"]["font_style"] == "bold"
-    is_upper = element_info["element"].get_text().isupper()
-    line_font = element_info["meta"]["format"]["font_name"]
+    numeric_pref = get_numeric_prefix_str(element.text)
+    is_bold = element.is_bold
+    is_upper = element.text.isupper()
+    line_font = element.font_name
 
     if (
         is_bold
@@ -213,20 +128,19 @@ def get_heading_info(element_info, heading_env, doc_info):
                     return heading_env  # it is a continuation of the heading
 
     for keyword in HEADING_KEYWORDS:
-        element_text = element_info["element"].get_text().lower().strip()
+        element_text = element.text.lower().strip()
         if element_text == keyword:
             return 1  # it is a first-level heading
 
     # If the element's font size refers to heading on some level
-    element_size = element_info["meta"]["format"]["fontsize"]
+    element_size = element.font_size
     if element_size in doc_info["headings_sizes"]:
         return doc_info["headings_sizes"][element_size]
 
     return -1  # it is not a heading or a part of the heading
 
 
-def get_numeric_prefix_str(text_line):
-    line_text = text_line.get_text()
+def get_numeric_prefix_str(line_text):
     numeric_pref = re.match(
         "^([0-9]+(\.)?)+", line_text
     )  # check if the line starts with the numeric prefix
@@ -236,229 +150,230 @@ def get_numeric_prefix_str(text_line):
         return None
 
 
-def check_layout(pages_layout):
-    text_lines_stat = []
-    for page_number, page in enumerate(pages_layout):
-        if page_number > 10:
-            break
-        # Get text length statistics in all text elements
-        for element in page:
-            if isinstance(element, LTTextContainer):
-                if not isinstance(
-                    element, LTTextLine
-                ):  # text element is a Box and should be unpacked to Lines
-                    for line in element:
-                        text_lines_stat.append(
-                            len(line.get_text().split(" "))
-                        )  # calculate number of words in parsed line
-                else:
-                    text_lines_stat.append(
-                        len(element.get_text().split(" "))
-                    )  # calculate number of words in parsed line
-    avg_words_number = np.mean(text_lines_stat) if text_lines_stat else 0
-    if avg_words_number < 4:
-        return -1
-    elif avg_words_number > 10:
-        return 1
-    else:
-        return 0
-
+def get_page_layout(page, page_tables):
+    """
+    Gets all line elements from the page with the meta about the types: text, table or image
+    :param page: layout of the page
+    :param page_tables: tables found on the page, None if there are no tables
+    :return:
+    """
+    page_structure = []
+    tables_index = PageTablesIndex(page, page_tables) if page_tables else None
+
+    # Analyze all elements on the page
+    for element in page:
+        if isinstance(element, LTTextContainer):
+            text_lines_lst = []
+            if not isinstance(
+                element, LTTextLine
+            ):  # text element is a Box and should be unpacked to Lines
+                for line in element:
+                    text_lines_lst.append(line)
+            else:
+                text_lines_lst.append(element)
+
+            for line in text_lines_lst:
+                if tables_index is not None:  # if there are any tables on the page
+                    table_id_found = tables_index.find_table(line)
+                    if (
+                        table_id_found is not None
+                    ):  # text element is a part of the table
+                        page_structure.append(
+                            {
+                                "element": line,
+                                "meta": {"type": "table", "id": table_id_found},
+                            }
+                        )
+                        continue
+                # text line is not a part of the table
+                page_structure.append(
+                    {"element": line, "meta": {"type": "text", "id": -1}}
+                )
+        elif isinstance(element, LTFigure):  # element is an image
+            page_structure.append(
+                {"element": element, "meta": {"type": "image", "id": -1}}
+            )
 
-def get_document_layout(stream, layout_parsing_params, tables_by_pages):
-    # Get all line elements from the document, grouped by pages
-    pages_layout = extract_pages(stream, laparams=layout_parsing_params)
-    check_layout_res = check_layout(pages_layout)
+    return page_structure
 
-    if check_layout_res == 1:
-        layout_parsing_params.word_margin = layout_parsing_params.word_margin + 2
-    elif check_layout_res == -1:
-        layout_parsing_params.word_margin = 0.1
-    pages_layout = extract_pages(stream, laparams=layout_parsing_params)
 
-    pages_structure = []  # variable for the updated document's structure by pages
+def get_page_formatting(page_structure):
+    """
+    Gets formatting info for each element of the page. Layout objects are replaced with the arrays of
+    the elements' texts, bounding boxes and formatting features, so the result doesn't hold the page's
+    layout tree
+    :param page_structure: elements of the page with the meta about their types
+    :return:
+    """
+    texts = []
+    types = []
+    table_ids = []
+    bboxes = []
+    has_format = []
+    font_sizes = []
+    font_names = []
+    bold_flags = []
+    line_spacings = []
+    start_symbols = []
+    prev_line_bottom_border = None  # y coordinate of the previous line's bottom border
+
+    for element_info in page_structure:
+        element = element_info["element"]
+        element_type = element_info["meta"]["type"]
+        elem_font_size = 0
+        elem_font_name = ""
+        is_bold = False
+        elem_line_spacing = 0.0
+        elem_start_symbol = ""
+
+        element_text = element.get_text() if element_type != "image" else ""
+
+        # process only text elements (including ones which are parts of tables)
+        if element_text != "":
+            if prev_line_bottom_border is not None:
+                elem_line_spacing = (
+                    prev_line_bottom_border - element.y0
+                )  # space between the lines
+            else:
+                elem_line_spacing = -1  # first line on the page
 
-    for page_number, page in enumerate(pages_layout):
-        page_structure = []
+            prev_line_bottom_border = (
+                element.y1
+            )  # update previous line bottom border attribute
 
-        # Get all tables from the page
-        page_tables = tables_by_pages[page_number]
+            is_bold = True
+            no_letters = True
+            elem_font_size_counter = Counter()
+            elem_font_name_counter = Counter()
 
-        # Analyze all elements on the page
-        for element in page:
-            if isinstance(element, LTTextContainer):
-                text_lines_lst = []
-                if not isinstance(
-                    element, LTTextLine
-                ):  # text element is a Box and should be unpacked to Lines
-                    for line in element:
-                        text_lines_lst.append(line)
-                else:
-                    text_lines_lst.append(element)
-
-                for line in text_lines_lst:
-                    if page_tables is not None:  # if there are any tables on the page
-                        if is_element_inside_any_table(line, page, page_tables):
-                            table_id_found = find_table_for_element(
-                                line, page, page_tables
-                            )
-                            if (
-                                table_id_found is not None
-                            ):  # text element is a part of the table
-                                page_structure.append(
-                                    {
-                                        "element": line,
-                                        "meta": {"type": "table", "id": table_id_found},
-                                    }
-                                )
-                                continue
-                    # text line is not a part of the table
-                    page_structure.append(
-                        {"element": line, "meta": {"type": "text", "id": -1}}
+            # Analyze element characters' formatting
+            for character in element:
+                first_symbol = character.get_text()[0]
+                if first_symbol.isalpha():
+                    no_letters = False
+                    if is_bold and "Bold" not in character.fontname:
+                        is_bold = False
+                if elem_start_symbol == "":
+                    elem_start_symbol = (
+                        "letter"
+                        if first_symbol.isalpha()
+                        else ("digit" if first_symbol.isdigit() else "symbol")
                     )
-            elif isinstance(element, LTFigure):  # element is an image
-                page_structure.append(
-                    {"element": element, "meta": {"type": "image", "id": -1}}
-                )
-        pages_structure.append(page_structure)
+                if isinstance(character, LTChar):
+                    elem_font_size_counter[round(character.size)] += 1  # font size
+                    elem_font_name_counter[character.fontname] += 1  # font name
+
+            # Get info about element's main font style (plain/bold)
+            # if 'Bold' in elem_font_name_counter.most_common(1)[0][0] and len(elem_font_name_counter) == 1:
+            #     elem_font_style = 'bold'
+            is_bold = is_bold and not no_letters
+
+            # Get info about element's main font size
+            elem_font_size = elem_font_size_counter.most_common(1)[0][0]
+            elem_font_name = elem_font_name_counter.most_common(1)[0][0]
+
+        texts.append(element_text)
+        types.append(ELEMENT_TYPES.index(element_type))
+        table_ids.append(element_info["meta"]["id"])
+        bboxes.append(element.bbox)
+        has_format.append(element_text != "")
+        font_sizes.append(elem_font_size)
+        font_names.append(elem_font_name)
+        bold_flags.append(is_bold)
+        line_spacings.append(elem_line_spacing)
+        start_symbols.append(START_SYMBOLS.index(elem_start_symbol))
+
+    return PageFeatures(
+        texts=texts,
+        types=np.array(types, dtype=np.int8),
+        table_ids=np.array(table_ids, dtype=np.int32),
+        bboxes=np.array(bboxes, dtype=np.float64).reshape(-1, 4),
+        has_format=np.array(has_format, dtype=bool),
+        font_sizes=np.array(font_sizes, dtype=np.int64),
+        font_names=np.array(font_names, dtype=object),
+        is_bold=np.array(bold_flags, dtype=bool),
+        line_spacings=np.array(line_spacings, dtype=np.float64),
+        start_symbols=np.array(start_symbols, dtype=np.int8),
+    )
 
-    # check if the first page is a title page
-    # for element_info in pages_structure[0]:
-    #     element = element_info['element']
-    #     if isinstance(element, LTTextContainer):
-    #         for keyword in HEADING_STOP_LIST:
-    #             if keyword in element.get_text():
-    #                 return pages_structure[1:]  # return document without title
-    return pages_structure
 
+def init_formatting_statistics():
+    """
+    Creates empty statistics of the document's formatting, which are updated page by page
+    :return:
+    """
+    return {
+        "font_size": [],
+        "line_spacing": [],
+        "left_margin": [],
+        # for the cases, when information about the particular font is unavailable and there are only CID Fonts
+        "font_name": [],
+        # codes of the font names in the order of their first occurrence
+        "font_names_codes": {},
+    }
+
+
+def update_formatting_statistics(formatting_statistics, page_features):
+    """
+    Updates the document's formatting statistics with the formatting of the page's elements
+    :param formatting_statistics: statistics created by init_formatting_statistics
+    :param page_features: features of the page's elements
+    :return:
+    """
+    # images and elements without text have no formatting
+    has_format = page_features.has_format
+    formatting_statistics["line_spacing"].append(
+        page_features.line_spacings[has_format]
+    )
+    formatting_statistics["left_margin"].append(page_features.left_margins[has_format])
+    formatting_statistics["font_size"].append(page_features.font_sizes[has_format])
+
+    # Font names are counted by their codes, so the statistics are stored as numeric arrays as well
+    font_names_codes = formatting_statistics["font_names_codes"]
+    formatting_statistics["font_name"].append(
+        np.array(
+            [
+                font_names_codes.setdefault(font_name, len(font_names_codes))
+                for font_name in page_features.font_names[has_format]
+            ],
+            dtype=np.int64,
+        )
+    )
 
-def get_document_formatting(pages_structure):
-    # margin_inf = 1000  # maximum value of the left margin attribute
 
-    # Initialize main variables for the document formatting and layout structure
+def get_document_formatting(formatting_statistics):
+    """
+    Gets info about the general document's formatting from the formatting of all its elements
+    :param formatting_statistics: statistics collected over all pages of the document
+    :return:
+    """
+    # Initialize main variables for the document formatting
     doc_info = {}
-    doc_structure = []
-
-    # Variables for the whole document's formatting analysis
-    doc_font_size_counter = Counter()
-    doc_line_spacing_counter = Counter()
-    doc_left_margin_counter = Counter()
-    # for the cases, when information about the particular font is unavailable and there are only CID Fonts
-    doc_main_font_counter = Counter()
 
-    doc_headings_sizes = []  # list of headings' font sizes in hierarchical order
+    doc_font_sizes = np.concatenate(formatting_statistics["font_size"])
+    doc_line_spacings = np.concatenate(formatting_statistics["line_spacing"])
+    doc_left_margins = np.concatenate(formatting_statistics["left_margin"])
+    doc_font_names = np.concatenate(formatting_statistics["font_name"])
+    if len(doc_font_sizes) == 0:
+        raise IndexError("Document contains no formatted text")
 
-    for page in pages_structure:
-        page_structure = []
-        prev_line_bottom_border = (
-            None  # y coordinate of the previous line's bottom border
-        )
-
-        for element_info in page:
-            element_format_info = {}  # dict with info about text formatting
-            elem_font_size_counter = Counter()
-            elem_font_name_counter = Counter()
-
-            elem_start_symbol = ""
-            elem_font_style = "plain"
-
-            # process only text elements (including ones which are parts of tables)
-            if (
-                element_info["meta"]["type"] != "image"
-                and element_info["element"].get_text() != ""
-            ):
-                element = element_info["element"]
-                if prev_line_bottom_border is not None:
-                    elem_line_spacing = (
-                        prev_line_bottom_border - element.y0
-                    )  # space between the lines
-                else:
-                    elem_line_spacing = -1  # first line on the page
-
-                prev_line_bottom_border = (
-                    element.y1
-                )  # update previous line bottom border attribute
-
-                elem_left_margin = element.x0  # left margin of the line
-
-                is_bold = True
-                no_letters = True
-
-                # Analyze element characters' formatting
-                for character in element:
-                    if character.get_text()[0].isalpha():
-                        no_letters = False
-                        if "Bold" not in character.fontname:
-                            is_bold = False
-                    if elem_start_symbol == "":
-                        elem_start_symbol = (
-                            "letter"
-                            if character.get_text()[0].isalpha()
-                            else (
-                                "digit"
-                                if character.get_text()[0].isdigit()
-                                else "symbol"
-                            )
-                        )
-                    if isinstance(character, LTChar):
-                        elem_font_size_counter[round(character.size)] += 1  # font size
-                        elem_font_name_counter[character.fontname] += 1  # font name
-
-                # Get info about element's main font style (plain/bold)
-                # if 'Bold' in elem_font_name_counter.most_common(1)[0][0] and len(elem_font_name_counter) == 1:
-                #     elem_font_style = 'bold'
-                if is_bold and not no_letters:
-                    elem_font_style = "bold"
-
-                # Get info about element's main font size
-                elem_font_size = elem_font_size_counter.most_common(1)[0][0]
-                elem_font_name = elem_font_name_counter.most_common(1)[0][0]
-
-                # Update info about the element's formatting
-                element_format_info["fontsize"] = elem_font_size
-                element_format_info["font_style"] = elem_font_style
-                element_format_info["font_name"] = elem_font_name
-                element_format_info["left_margin"] = elem_left_margin
-                element_format_info["line_spacing"] = elem_line_spacing
-                element_format_info["start_symbol"] = elem_start_symbol
-
-                # Update document's statistics
-                doc_line_spacing_counter[
-                    elem_line_spacing
-                ] += 1  # add line spacing attribute
-                doc_left_margin_counter[
-                    elem_left_margin
-                ] += 1  # add left margin attribute
-                doc_font_size_counter[elem_font_size] += 1  # add font size attribute
-                doc_main_font_counter[
-                    elem_font_name
-                ] += 1  # add font name info attribute
-
-            element_info["meta"][
-                "format"
-            ] = element_format_info  # set format info for the element
-            page_structure.append(element_info)
-        doc_structure.append(page_structure)
-
-    doc_font_size = doc_font_size_counter.most_common(1)[0][
+    doc_font_size = most_common_values(doc_font_sizes)[0].item()  # main document's font size
+    doc_line_spacing = most_common_values(doc_line_spacings)[
         0
-    ]  # main document's font size
-    doc_line_spacing = doc_line_spacing_counter.most_common(1)[0][
-        0
-    ]  # main document's line spacing
-    doc_left_margins = [
-        x[0] for x in doc_left_margin_counter.most_common(2)
-    ]  # two most common left margins
-    doc_main_font = doc_main_font_counter.most_common(1)[0][0]
+    ].item()  # main document's line spacing
+    doc_left_margins = most_common_values(
+        doc_left_margins, 2
+    ).tolist()  # two most common left margins
+    doc_main_font_code = most_common_values(doc_font_names)[0].item()
+    doc_main_font = list(formatting_statistics["font_names_codes"])[doc_main_font_code]
 
-    for font_size in [x[0] for x in doc_font_size_counter.items()]:
-        if font_size > doc_font_size:
-            doc_headings_sizes.append(font_size)
-    doc_headings_sizes.sort(reverse=True)  # sort font sizes in the descending order
+    # Headings' font sizes in hierarchical (descending) order
+    doc_headings_sizes = np.unique(doc_font_sizes[doc_font_sizes > doc_font_size])[::-1]
 
     # Create dictionary to get heading level by heading font size
-    doc_headings_sizes_dict = {}
-    for i in range(len(doc_headings_sizes)):
-        doc_headings_sizes_dict[doc_headings_sizes[i]] = i + 1
+    doc_headings_sizes_dict = {
+        font_size: i + 1 for i, font_size in enumerate(doc_headings_sizes.tolist())
+    }
 
     # Prepare info about whole document's formatting
     doc_info["font_size"] = doc_font_size
@@ -467,7 +382,114 @@ def get_document_formatting(pages_structure):
     doc_info["left_margin"] = doc_left_margins
     doc_info["headings_sizes"] = doc_headings_sizes_dict
 
-    return doc_info, doc_structure
+    return doc_info
+
+
+def extract_page_elements(layout_engine, page_number, parse_tables=True):
+    """
+    Extracts layout and formatting features of all page's elements. The page is processed independently
+    of others, so the function can be run for different pages in parallel
+    :param layout_engine: engine with the opened document
+    :param page_number:
+    :param parse_tables:
+    :return: features of the page's elements and html content of the page's tables by their ids
+    """
+    page_layout = layout_engine.page_layout(page_number)
+
+    # Get all tables from the page using pdfplumber, if the page has any ruling lines
+    table_page = None
+    page_tables = None
+    if has_table_candidates(page_layout):
+        table_page = layout_engine.table_page(page_number, page_layout)
+        page_tables = table_page.find_tables()
+
+    page_structure = get_page_layout(page_layout, page_tables)
+    page_features = get_page_formatting(page_structure)
+
+    # Tables content is extracted from the same tables which were found on the page
+    tables_content = {}
+    if parse_tables:
+        page_tables_ids = page_features.table_ids[page_features.types == TABLE]
+        for table_id in page_tables_ids.tolist():
+            if table_id not in tables_content:
+                table = page_tables[table_id].extract()
+                tables_content[table_id] = convert_table_to_html(table)
+
+    if table_page is not None:
+        table_page.close()  # release the page's objects cached by pdfplumber
+
+    return page_features, tables_content
+
+
+def get_jobs_number(n_jobs):
+    return (os.cpu_count() or 1) if n_jobs == -1 else max(n_jobs, 1)
+
+
+_pages_worker_layout_engine = None
+
+
+def _init_pages_worker(pdf_bytes, layout_parsing_params):
+    global _pages_worker_layout_engine
+    _pages_worker_layout_engine = PDFLayoutEngine(
+        io.BytesIO(pdf_bytes), layout_parsing_params, calibrated=True
+    )
+
+
+def _extract_pages_elements_in_worker(page_numbers, parse_tables):
+    return [
+        extract_page_elements(_pages_worker_layout_engine, page_number, parse_tables)
+        for page_number in page_numbers
+    ]
+
+
+def extract_pages_elements(stream, layout_engine, parse_tables=True, n_jobs=1):
+    """
+    Extracts elements of the parsed document's pages and yields them in the pages order. With several jobs
+    the pages are processed in a pool of processes, each of them opens its own copy of the document
+    :param stream: binary input
+    :param layout_engine: engine with the opened document
+    :param parse_tables:
+    :param n_jobs: number of processes, -1 means all available CPUs
+    :return: features of the page's elements and html content of the page's tables for each page
+    """
+    page_numbers = layout_engine.page_numbers
+    n_jobs = get_jobs_number(n_jobs)
+
+    # Workers need the calibrated parameters. Sample pages are already laid out during the calibration,
+    # so they are processed in place
+    layout_engine.calibrate()
+    local_pages = (
+        page_numbers
+        if n_jobs == 1
+        else page_numbers[: layout_engine.calibration_pages_number]
+    )
+    pooled_pages = list(page_numbers[len(local_pages) :])
+
+    if not pooled_pages:
+        for page_number in local_pages:
+            yield extract_page_elements(layout_engine, page_number, parse_tables)
+        return
+
+    stream.seek(0)
+    chunk_size = max(1, math.ceil(len(pooled_pages) / (n_jobs * 4)))
+    chunks = [
+        pooled_pages[i : i + chunk_size]
+        for i in range(0, len(pooled_pages), chunk_size)
+    ]
+    with ProcessPoolExecutor(
+        max_workers=min(n_jobs, len(chunks)),
+        initializer=_init_pages_worker,
+        initargs=(stream.read(), layout_engine.layout_parsing_params),
+    ) as executor:
+        chunks_results = executor.map(
+            _extract_pages_elements_in_worker,
+            chunks,
+            [parse_tables] * len(chunks),
+        )
+        for page_number in local_pages:
+            yield extract_page_elements(layout_engine, page_number, parse_tables)
+        for chunk_results in chunks_results:
+            yield from chunk_results
 
 
 def is_heading_correct(heading_str):
@@ -483,23 +505,117 @@ def is_heading_correct(heading_str):
     return True
 
 
-def extract_by_lines(
+def is_title_page(page_content):
+    """
+    Checks if the page is a title one by the service keywords in its lines
+    :param page_content: lines of the page
+    :return:
+    """
+    for text_line in page_content:
+        for title_key in HEADING_STOP_LIST:
+            if title_key in text_line.lower():
+                return True
+    return False
+
+
+def remove_page_number(page_content, page_meta):
+    """
+    Removes the page number from the page's lines
+    :param page_content: lines of the page
+    :param page_meta: meta of the page's lines
+    :return:
+    """
+    if len(page_content) > 0:
+        only_digits = True
+        for char in page_content[0]:  # number is at the beginning of the page
+            if not char.isdigit():
+                only_digits = False
+        if only_digits:
+            return page_content[1:], page_meta[1:]
+        for char in page_content[-1]:  # number is at the end of the page
+            if not char.isdigit():
+                only_digits = False
+        if only_digits:
+            return page_content[:-1], page_meta[:-1]
+    return page_content, page_meta
+
+
+def _store_pages(layout_engine, pages, pages_storage, parse_images, n_jobs):
+    """
+    Recognizes text in the images of the pages, if needed, and puts the pages to the storage
+    :param layout_engine: engine with the opened document
+    :param pages: page numbers, features of the elements and tables content of the pages
+    :param pages_storage:
+    :param parse_images:
+    :param n_jobs: number of threads for the images text recognition
+    :return:
+    """
+    if parse_images:
+        images = [
+            (page_number, page_features, i)
+            for page_number, page_features, _ in pages
+            for i in np.flatnonzero(page_features.types == IMAGE).tolist()
+        ]
+        if images:
+            images_texts = recognize_images(
+                layout_engine,
+                [
+                    (page_number, tuple(page_features.bboxes[i].tolist()))
+                    for page_number, page_features, i in images
+                ],
+                n_jobs=n_jobs,
+            )
+            # Recognized text is saved as the image element's text
+            for (_, page_features, i), image_text in zip(images, images_texts):
+                page_features.texts[i] = image_text
+
+    for _, page_features, tables_content in pages:
+        pages_storage.append((page_features, tables_content))
+
+
+def iter_pages_by_lines(
     stream,
     parse_images=False,
     parse_tables=True,
     parse_formulas=False,
     remove_service_info=False,
-) -> tuple[list[str], list[dict]]:
+    n_jobs=1,
+    incremental=False,
+    page_range=None,
+    max_pages=None,
+    on_pages_number=None,
+) -> Iterator[tuple[list[str], list[dict]]]:
     """
-    Parses given pdf document to lines content and meta
+    Parses given pdf document to lines content and meta, page by page.
+
+    The first pass lays out the pages one by one and keeps only the text, bounding box and formatting
+    of their elements, the layout objects are dropped as soon as the page is processed. Headings are
+    detected by the whole document's formatting, so the lines are built on the second pass over the
+    stored pages, and each page is yielded when it is complete.
+    :param stream:
     :param parse_images:
     :param parse_tables:
     :param parse_formulas:
-    :param stream:
-    :return:
+    :param remove_service_info:
+    :param n_jobs: number of processes for the pages' layout and formatting extraction
+    and threads for the images text recognition, -1 means all available CPUs
+    :param incremental: store the processed pages in a temporary file instead of memory,
+    so the memory usage doesn't depend on the number of pages
+    :param page_range: zero-based numbers of the first page and the page after the last one to parse,
+    all pages if None
+    :param max_pages: maximum number of the pages to parse from the start of the range
+    :param on_pages_number: called with the number of the document's pages
+    :return: lines content and meta of each page
     """
-    document_content = []
-    document_meta = []
+    pages_number = get_pages_number(stream)
+    if on_pages_number is not None:
+        on_pages_number(pages_number)
+    page_numbers = select_pages(pages_number, page_range, max_pages)
+    if not page_numbers:
+        return
+    # Scans are detected by the text layer before any layout analysis
+    if not has_text_layer(stream, page_numbers):
+        raise NoTextLayerError("Document contains no text layer, only images")
 
     # Set up hyperparameters for the document's layout parsing by lines
     params = LAParams(
@@ -511,94 +627,150 @@ def extract_by_lines(
         detect_vertical=False,
         all_texts=True,
     )
-
-    # Tables processing
-    tables_by_pages = []
-    tables_reader = pdfplumber.open(stream)
-
-    # Extract all tables from the document using pdfplumber
-    for page in tables_reader.pages:
-        tables_by_pages.append(page.find_tables())
-
-    # Get all line elements, grouped by pages, with the meta about the types: text, table or image
-    pages_layout = get_document_layout(stream, params, tables_by_pages)
-
-    is_text_in_doc = False
-
-    for page_layout in pages_layout:
-        for element_info in page_layout:
-            if (
-                element_info["meta"]["type"] == "text"
-                or element_info["meta"]["type"] == "table"
+    ocr_jobs_number = get_jobs_number(n_jobs)
+    ocr_batch_size = 4 * ocr_jobs_number
+
+    with PagesStorage(on_disk=incremental) as pages_storage:
+        formatting_statistics = init_formatting_statistics()
+        is_text_in_doc = False
+        sample_lines = []  # the first text lines to detect the encoding damage on
+
+        # The document is opened once and shared between text, tables and images extraction
+        with PDFLayoutEngine(stream, params, page_numbers=page_numbers) as layout_engine:
+            # Pages waiting for the images text recognition, images are recognized in batches
+            # and only if the document has a text layer
+            pending_pages = []
+            pending_images_number = 0
+
+            # Get all line elements, page by page, with the meta about the types: text, table or image,
+            # and info about each element's formatting
+            for page_number, (page_features, tables_content) in zip(
+                page_numbers,
+                extract_pages_elements(
+                    stream, layout_engine, parse_tables=parse_tables, n_jobs=n_jobs
+                ),
             ):
-                is_text_in_doc = True
-                break
-        if is_text_in_doc:
-            break
+                update_formatting_statistics(formatting_statistics, page_features)
+                images_number = np.count_nonzero(page_features.types == IMAGE)
+                pending_images_number += images_number
+                is_text_in_doc = is_text_in_doc or images_number < len(page_features)
+                if len(sample_lines) < ENCODING_SAMPLE_SIZE:
+                    sample_lines.extend(
+                        element.text.replace("\n", " ").strip()
+                        for element in page_features.elements()
+                        if element.type == "text"
+                    )
 
-    if not is_text_in_doc:
-        raise NoTextLayerError("Document contains no text layer, only images")
+                pending_pages.append((page_number, page_features, tables_content))
+                if is_text_in_doc and (
+                    not parse_images
+                    or len(pending_pages) >= ocr_batch_size
+                    or pending_images_number >= ocr_batch_size
+                ):
+                    _store_pages(
+                        layout_engine,
+                        pending_pages,
+                        pages_storage,
+                        parse_images,
+                        ocr_jobs_number,
+                    )
+                    pending_pages = []
+                    pending_images_number = 0
+
+            if not is_text_in_doc:
+                raise NoTextLayerError("Document contains no text layer, only images")
+
+            _store_pages(
+                layout_engine,
+                pending_pages,
+                pages_storage,
+                parse_images,
+                ocr_jobs_number,
+            )
 
-    # Set up pdf reader for working with images
-    img_pdf_reader = PyPDF2.PdfReader(stream)
-
-    # Get info about the general document's formatting and each element's formatting
-    doc_info, doc_structure = get_document_formatting(pages_layout)
-
-    # Set up environmental variables
-    heading_env = (
-        -1
-    )  # level of the current heading's environment (-1 if not the heading's environment)
-    heading_lst = []
-    current_heading_lvl = -1  # means that the element is not the heading (basic)
-    tables_analysed = [set() for _ in range(len(doc_structure))]
-    paragraph_id = 0
-    headings_hierarchy = []
-
-    for page_number, page in enumerate(doc_structure):
-        document_content.append([])
-        document_meta.append([])
-        if parse_images:
-            try:
-                page_object = img_pdf_reader.pages[page_number]
-            except IndexError:
-                warnings.warn(
-                    "Error in pages structure formatting", category=ParseImageWarning
-                )
-                page_object = None
-
-        for element_info in page:
-            is_heading = 0
-            correct_heading = True
-            headings = []
-            paragraph = -1
-
-            element = element_info["element"]
-            element_meta = element_info["meta"]
-            element_text = ""
-
-            if element_meta["type"] == "text":
-                element_text = fix_text(element.get_text().replace("\n", " ").strip())
-                heading_lvl = get_heading_info(element_info, heading_env, doc_info)
-
-                if heading_lvl != -1:  # text line is a part of some heading
-                    if heading_lvl == heading_env:  # continuation
-                        heading_lst.append(element_text)  # continue the heading
-                    else:  # heading of another level or the new heading after other elements
-                        if len(heading_lst) != 0:
-                            # we should add info about the previous heading to the 'headings' list
-                            headings_hierarchy = headings_hierarchy[: heading_env - 1]
-                            heading_str = " ".join(heading_lst).strip()
-                            if is_heading_correct(heading_str):
-                                headings_hierarchy.append(heading_str.strip())
-                            else:
-                                correct_heading = False
-                        heading_lst = [element_text]  # starting new heading
-                        heading_env = heading_lvl
+        text_normalizer = TextNormalizer(sample_lines)
+        text_normalizer.check_encoding()
+
+        # Get info about the general document's formatting
+        doc_info = get_document_formatting(formatting_statistics)
+
+        # Set up environmental variables
+        heading_env = (
+            -1
+        )  # level of the current heading's environment (-1 if not the heading's environment)
+        heading_lst = []
+        current_heading_lvl = -1  # means that the element is not the heading (basic)
+        paragraph_id = 0
+        headings_hierarchy = []
+        is_title_checked = False
+
+        for page_features, tables_content in pages_storage:
+            page_content = []
+            page_meta = []
+            tables_analysed = set()
+            for element in page_features.elements():
+                is_heading = 0
+                correct_heading = True
+                headings = []
+                paragraph = -1
+
+                element_text = ""
+
+                if element.type == "text":
+                    element_text = text_normalizer.normalize(
+                        element.text.replace("\n", " ").strip()
+                    )
+                    heading_lvl = get_heading_info(element, heading_env, doc_info)
+
+                    if heading_lvl != -1:  # text line is a part of some heading
+                        if heading_lvl == heading_env:  # continuation
+                            heading_lst.append(element_text)  # continue the heading
+                        else:  # heading of another level or the new heading after other elements
+                            if len(heading_lst) != 0:
+                                # we should add info about the previous heading to the 'headings' list
+                                headings_hierarchy = headings_hierarchy[: heading_env - 1]
+                                heading_str = " ".join(heading_lst).strip()
+                                if is_heading_correct(heading_str):
+                                    headings_hierarchy.append(heading_str.strip())
+                                else:
+                                    correct_heading = False
+                            heading_lst = [element_text]  # starting new heading
+                            heading_env = heading_lvl
+
+                        is_heading = 1
+                    else:  # text line is not a part of any heading
+                        is_heading = 0
+                        if heading_env != -1:  # previous element contained heading
+                            paragraph_id += 1  # new paragraph
+                            if len(heading_lst) != 0:
+                                # we should add info about the previous heading to the 'headings' list
+                                headings_hierarchy = headings_hierarchy[: heading_env - 1]
+                                heading_str = " ".join(heading_lst).strip()
+                                if is_heading_correct(heading_str):
+                                    headings_hierarchy.append(heading_str)
+                                else:
+                                    correct_heading = False
+                                heading_lst = []
+                                heading_env = -1
+                        else:  # plain text and previous text line was not a heading
+                            # figuring out, should we start a new paragraph
+                            element_spacing = element.line_spacing
+                            element_margin = element.left_margin
+                            start_symbol = element.start_symbol
+
+                            # if the line spacing is bigger than average or left margin is bigger than average,
+                            # and it is not a list element (starts with letter or digit)
+                            if start_symbol != "symbol":
+                                if (
+                                    element_spacing > 1.1 * doc_info["line_spacing"]
+                                    or element_margin > doc_info["left_margin"][0]
+                                ):
+                                    paragraph_id += 1  # new paragraph
 
-                    is_heading = 1
-                else:  # text line is not a part of any heading
-                    is_heading = 0
+                        headings = headings_hierarchy
+                        paragraph = paragraph_id
+
+                else:
                     if heading_env != -1:  # previous element contained heading
                         paragraph_id += 1  # new paragraph
                         if len(heading_lst) != 0:
@@ -611,166 +783,115 @@ def extract_by_lines(
                                 correct_heading = False
                             heading_lst = []
                             heading_env = -1
-                    else:  # plain text and previous text line was not a heading
-                        # figuring out, should we start a new paragraph
-                        element_spacing = element_info["meta"]["format"]["line_spacing"]
-                        element_margin = element_info["meta"]["format"]["left_margin"]
-                        start_symbol = element_info["meta"]["format"]["start_symbol"]
-
-                        # if the line spacing is bigger than average or left margin is bigger than average,
-                        # and it is not a list element (starts with letter or digit)
-                        if start_symbol != "symbol":
-                            if (
-                                element_spacing > 1.1 * doc_info["line_spacing"]
-                                or element_margin > doc_info["left_margin"][0]
-                            ):
-                                paragraph_id += 1  # new paragraph
-
-                    headings = headings_hierarchy
-                    paragraph = paragraph_id
 
-            else:
-                if heading_env != -1:  # previous element contained heading
-                    paragraph_id += 1  # new paragraph
-                    if len(heading_lst) != 0:
-                        # we should add info about the previous heading to the 'headings' list
-                        headings_hierarchy = headings_hierarchy[: heading_env - 1]
-                        heading_str = " ".join(heading_lst).strip()
-                        if is_heading_correct(heading_str):
-                            headings_hierarchy.append(heading_str)
-                        else:
-                            correct_heading = False
-                        heading_lst = []
-                        heading_env = -1
-
-                if element_meta["type"] == "table":
-                    table_id = element_meta["id"]
-                    if table_id not in tables_analysed[page_number] and parse_tables:
-                        tables_analysed[page_number].add(table_id)
-                        table = extract_table(stream, page_number, table_id)
-
-                        # add string with table content to the document content
-                        element_text = convert_table_to_html(table)
-
-                        # prepare meta info for the table element
-                        is_heading = 0
-                        headings = headings_hierarchy
-                        paragraph = paragraph_id
-                else:  # element_meta['type'] == 'image'
-                    if parse_images:
-                        if page_object is not None:
-                            crop_image(element["element"], page_object)
-                            convert_to_images("cropped_image.pdf")
-                            image_text = image_to_text("PDF_image.png")
+                    if element.type == "table":
+                        table_id = element.table_id
+                        if table_id not in tables_analysed and parse_tables:
+                            tables_analysed.add(table_id)
 
-                            # add recognized text from image to the document content
-                            element_text = image_text
+                            # add string with table content to the document content
+                            element_text = tables_content[table_id]
 
-                        # prepare meta info for the image element
-                        is_heading = 0  # only text element can be a heading
-                        headings = headings_hierarchy
-                        # paragraph_id += 1  # image related to the new paragraph
-                        paragraph = paragraph_id
+                            # prepare meta info for the table element
+                            is_heading = 0
+                            headings = headings_hierarchy
+                            paragraph = paragraph_id
+                    else:  # element.type == 'image'
+                        if parse_images:
+                            # add recognized text from image to the document content
+                            element_text = element.text
+
+                            # prepare meta info for the image element
+                            is_heading = 0  # only text element can be a heading
+                            headings = headings_hierarchy
+                            # paragraph_id += 1  # image related to the new paragraph
+                            paragraph = paragraph_id
+
+                if element_text != "" and (is_heading != 0 or paragraph != -1):
+                    if remove_service_info:
+                        is_footer = False
+                        for footer_key in FOOTER_KEYWORDS:
+                            if footer_key in element_text.lower():
+                                is_footer = True
+                                break
+                        if is_footer:
+                            continue
+
+                    # text lines and so headings are already normalized
+                    if element.type != "text":
+                        element_text = text_normalizer.repair_encoding(element_text)
+
+                    page_content.append(element_text)
+                    page_meta.append(
+                        {
+                            "type": element.type,
+                            "is_heading": is_heading,
+                            "is_heading_extracting_correct": correct_heading,
+                            "headings": headings,
+                            "paragraph": paragraph,
+                        }
+                    )
 
-            if element_text != "" and (is_heading != 0 or paragraph != -1):
-                if remove_service_info:
-                    is_footer = False
-                    for footer_key in FOOTER_KEYWORDS:
-                        if footer_key in element_text.lower():
-                            is_footer = True
-                            break
-                    if is_footer:
+            if remove_service_info:
+                # Check if the first non-empty document's page is a title
+                if not is_title_checked and len(page_content) > 0:
+                    is_title_checked = True
+                    if is_title_page(page_content):
                         continue
 
-                try:
-                    element_text = element_text.encode("cp1252").decode("cp1251")
-                    headings = [x.encode("cp1252").decode("cp1251") for x in headings]
-                except (UnicodeDecodeError, UnicodeEncodeError):
-                    pass
-
-                document_content[-1].append(element_text)
-                document_meta[-1].append(
-                    {
-                        "type": element_meta["type"],
-                        "is_heading": is_heading,
-                        "is_heading_extracting_correct": correct_heading,
-                        "headings": headings,
-                        "paragraph": paragraph,
-                    }
-                )
+                # Remove page numbers
+                page_content, page_meta = remove_page_number(page_content, page_meta)
 
-    if remove_service_info:
-        # Check if the first document's page is a title
-        try:
-            potential_title_page = document_content[0]
-            title_num = 0
-            is_title = False
-
-            for i in range(len(document_content)):
-                page = document_content[i]
-                if len(page) > 0:
-                    potential_title_page = page
-                    title_num = i
-                    break
-            for text_line in potential_title_page:
-                for title_key in HEADING_STOP_LIST:
-                    if title_key in text_line.lower():
-                        is_title = True
-                        break
-                if is_title:
-                    break
-            if not is_title:
-                for char in potential_title_page[-1].lower():
-                    if char.isalpha() and char != "г":
-                        break
-            if is_title:
-                document_content = document_content[title_num + 1 :]
-                document_meta = document_meta[title_num + 1 :]
-        except IndexError:
+            yield page_content, page_meta
+
+        if remove_service_info and not is_title_checked:
             warnings.warn(
                 "Can not skip title-related service information due to unknown title formatting",
                 category=TitleExtractingWarning,
             )
 
-        # Remove page numbers
-        try:
-            for page_number in range(len(document_content)):
-                page = document_content[page_number]
-                if len(page) > 0:
-                    only_digits = True
-                    for char in page[0]:  # number is at the beginning of the page
-                        if not char.isdigit():
-                            only_digits = False
-                    if only_digits:
-                        document_content[page_number] = document_content[page_number][
-                            1:
-                        ]
-                        document_meta[page_number] = document_meta[page_number][1:]
-                        continue
-                    for char in page[-1]:  # number is at the end of the page
-                        if not char.isdigit():
-                            only_digits = False
-                    if only_digits:
-                        document_content[page_number] = document_content[page_number][
-                            :-1
-                        ]
-                        document_meta[page_number] = document_meta[page_number][:-1]
-                        continue
-        except IndexError:
-            warnings.warn(
-                "Can not delete page numbers due to unknown formatting",
-                category=PageNumbersExtractingWarning,
-            )
 
-        # # Remove footers
-        # try:
-        #     for page_number in range(len(document_content)):
-        #         page = document_content[page_number]
-        #         if len(page) > 0:
-        #
-        # except IndexError:
-        #     warnings.warn('Can not delete page numbers due to unknown formatting',
-        #                   category=FooterExtractingWarning)
+def extract_by_lines(
+    stream,
+    parse_images=False,
+    parse_tables=True,
+    parse_formulas=False,
+    remove_service_info=False,
+    n_jobs=1,
+    page_range=None,
+    max_pages=None,
+    on_pages_number=None,
+) -> tuple[list[str], list[dict]]:
+    """
+    Parses given pdf document to lines content and meta
+    :param parse_images:
+    :param parse_tables:
+    :param parse_formulas:
+    :param stream:
+    :param n_jobs: number of processes for the pages' layout and formatting extraction
+    and threads for the images text recognition, -1 means all available CPUs
+    :param page_range: zero-based numbers of the first page and the page after the last one to parse,
+    all pages if None
+    :param max_pages: maximum number of the pages to parse from the start of the range
+    :param on_pages_number: called with the number of the document's pages
+    :return:
+    """
+    document_content = []
+    document_meta = []
+
+    for page_content, page_meta in iter_pages_by_lines(
+        stream,
+        parse_images=parse_images,
+        parse_tables=parse_tables,
+        parse_formulas=parse_formulas,
+        remove_service_info=remove_service_info,
+        n_jobs=n_jobs,
+        page_range=page_range,
+        max_pages=max_pages,
+        on_pages_number=on_pages_number,
+    ):
+        document_content.append(page_content)
+        document_meta.append(page_meta)
 
     final_content = listmerge(document_content)
     final_meta = listmerge(document_meta)
@@ -0,0 +1,118 @@
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Sequence
+
+from langchain_core.document_loaders import Blob
+from langchain_core.documents import Document
+
+from protollm.raw_data_processing.docs_parsers.parsers.base import BaseParser, PAGES_NUMBER_KEY
+from protollm.raw_data_processing.docs_parsers.parsers.entities import DocType
+from protollm.raw_data_processing.docs_parsers.parsers.isolation import get_pages_number
+from protollm.raw_data_processing.docs_parsers.parsers.pdf.text_backend import sample_text_lines
+from protollm.raw_data_processing.docs_parsers.parsers.text_normalizer import TextNormalizer
+from protollm.raw_data_processing.docs_parsers.utils.exceptions import LowQualityError
+from protollm.raw_data_processing.docs_parsers.utils.utilities import is_bad_encoding
+from protollm.raw_data_processing.docs_parsers.utils.metrics import get_blob_size
+
+
+@lru_cache(maxsize=4096)
+def _get_script(char: str) -> str:
+    # the names of the letters start with their script, e.g. LATIN SMALL LETTER A
+    return unicodedata.name(char, "").split(" ", 1)[0]
+
+
+@dataclass
+class QualityGate:
+    """
+    Checks of a document's quality, which keep junk from being parsed and passed further.
+
+    The probe is made before the parsing on the raw file: its size, the number of its pages and,
+    for PDF, the encoding of the text sampled from a few pages of its text layer, which the parser
+    would reject only after the layout analysis. The probe raises LowQualityError if it fails,
+    the loaders log the rejection and skip the document without counting it as an error.
+    The filter is applied to the parsed documents: the short ones, the ones with mostly digits,
+    with bad encoding or in other scripts are dropped.
+    Checks, which limits are None, are not made.
+    """
+
+    # probe
+    min_file_size: Optional[int] = None  # in bytes
+    max_file_size: Optional[int] = None  # in bytes
+    min_pages: Optional[int] = None
+    max_pages: Optional[int] = None
+    probe_text_layer: bool = False  # whether the sampled text layer of PDF is checked for encoding
+    # filter
+    min_content_length: Optional[int] = None
+    max_digits_proportion: Optional[float] = None
+    check_encoding: bool = False
+    scripts: Optional[Sequence[str]] = None  # Unicode scripts, e.g. ("CYRILLIC", "LATIN")
+    min_script_proportion: float = 0.5  # proportion of the document's letters in the scripts
+
+    def probe(self, blob: Blob):
+        """
+        Checks the document before the parsing
+        :param blob: representation of raw data from file
+        :return:
+        """
+        if self.min_file_size is not None or self.max_file_size is not None:
+            file_size = get_blob_size(blob)
+            if file_size is not None:
+                if self.min_file_size is not None and file_size < self.min_file_size:
+                    raise LowQualityError(
+                        f"The file has {file_size} bytes, the minimum is {self.min_file_size}"
+                    )
+                if self.max_file_size is not None and file_size > self.max_file_size:
+                    raise LowQualityError(
+                        f"The file has {file_size} bytes, the maximum is {self.max_file_size}"
+                    )
+
+        if self.min_pages is not None or self.max_pages is not None:
+            pages_number = get_pages_number(blob)
+            if pages_number is not None:
+                blob.metadata[PAGES_NUMBER_KEY] = pages_number
+                if self.min_pages is not None and pages_number < self.min_pages:
+                    raise LowQualityError(
+                        f"The document has {pages_number} pages, the minimum is {self.min_pages}"
+                    )
+                if self.max_pages is not None and pages_number > self.max_pages:
+                    raise LowQualityError(
+                        f"The document has {pages_number} pages, the maximum is {self.max_pages}"
+                    )
+
+        if self.probe_text_layer and BaseParser.get_blob_doc_type(blob) is DocType.pdf:
+            with blob.as_bytes_io() as file_obj:
+                lines = sample_text_lines(file_obj)
+            # the encoding is checked as the parser does it, after the repair of the lines,
+            # the documents without text layer are rejected by the parser
+            if lines and TextNormalizer(lines).is_bad_encoding:
+                raise LowQualityError("The text layer of the document has bad encoding")
+
+    def filter(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """
+        Drops the parsed documents of low quality
+        :param documents: parsed documents
+        :return:
+        """
+        for document in documents:
+            if self.is_acceptable(document.page_content):
+                yield document
+
+    def is_acceptable(self, text: str) -> bool:
+        if self.min_content_length is not None and len(text) < self.min_content_length:
+            return False
+        if (
+            self.max_digits_proportion is not None
+            and text
+            and sum(c.isdigit() for c in text) / len(text) > self.max_digits_proportion
+        ):
+            return False
+        if self.check_encoding and is_bad_encoding(text.splitlines()):
+            return False
+        if self.scripts is not None:
+            letters = [c for c in text if c.isalpha()]
+            if letters:
+                in_scripts = sum(_get_script(c) in self.scripts for c in letters)
+                if in_scripts / len(letters) < self.min_script_proportion:
+                    return False
+        return True
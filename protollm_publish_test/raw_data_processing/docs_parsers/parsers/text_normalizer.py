@@ -0,0 +1,88 @@
+import re
+from itertools import islice
+from typing import Iterable
+
+from ftfy import fix_text, is_bad
+
+from protollm.raw_data_processing.docs_parsers.utils.exceptions import EncodingError
+from protollm.raw_data_processing.docs_parsers.utils.utilities import is_bad_encoding
+
+# Number of the first document's lines, which the encoding damage is detected on
+ENCODING_SAMPLE_SIZE = 1000
+
+# Text, which fix_text leaves as is, if there is no encoding damage in the document
+PLAIN_TEXT_PATTERN = re.compile(r"[\x20-\x25\x27-\x7eА-Яа-яЁё«»–—…]*")
+CYRILLIC_PATTERN = re.compile(r"[А-Яа-яЁё]")
+HYPHENATION_PATTERN = re.compile(r"(?<=[А-Яа-яёЁ])-\s")
+
+
+def dehyphenate(text: str) -> str:
+    """
+    Joins the words broken with hyphens at the ends of the lines
+    """
+    return HYPHENATION_PATTERN.sub("", text)
+
+
+def decode_cp1251_as_cp1252(text: str) -> str:
+    """
+    Repairs the text in cp1251, which was decoded as cp1252
+    """
+    # Cyrillic text can't be encoded to cp1252 and ascii one remains the same
+    if text.isascii() or CYRILLIC_PATTERN.search(text):
+        return text
+    try:
+        return text.encode("cp1252").decode("cp1251")
+    except (UnicodeDecodeError, UnicodeEncodeError):
+        return text
+
+
+class TextNormalizer:
+    """
+    Normalizes the text lines of a document.
+
+    The document's encoding damage is detected once on the sample of its lines, and the repair
+    is applied to all lines only if the sample needs it. Otherwise, only the lines with unusual
+    characters are passed to ftfy.
+    """
+
+    def __init__(self, sample_lines: Iterable[str]):
+        """
+        :param sample_lines: the first lines of the document
+        """
+        sample_lines = [
+            line for line in islice(sample_lines, ENCODING_SAMPLE_SIZE) if line
+        ]
+        self.needs_fix_text = any(is_bad(line) for line in sample_lines)
+        self.needs_cp1251_repair = False
+        for line in sample_lines:
+            line = self.fix_text(line)
+            if CYRILLIC_PATTERN.search(decode_cp1251_as_cp1252(line)) and not (
+                CYRILLIC_PATTERN.search(line)
+            ):
+                self.needs_cp1251_repair = True
+                break
+        self.is_bad_encoding = is_bad_encoding(
+            [self.normalize(line) for line in sample_lines]
+        )
+
+    def check_encoding(self):
+        """
+        Raises EncodingError if the text of the document can't be repaired
+        """
+        if self.is_bad_encoding:
+            raise EncodingError(
+                "It is impossible to parse the file due to uncertainty in the text encoding"
+            )
+
+    def fix_text(self, text: str) -> str:
+        if self.needs_fix_text or not PLAIN_TEXT_PATTERN.fullmatch(text):
+            return fix_text(text)
+        return text
+
+    def repair_encoding(self, text: str) -> str:
+        if self.needs_cp1251_repair:
+            return decode_cp1251_as_cp1252(text)
+        return text
+
+    def normalize(self, text: str) -> str:
+        return self.repair_encoding(self.fix_text(text))
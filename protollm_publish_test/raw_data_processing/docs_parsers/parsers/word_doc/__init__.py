@@ -1 +1,2 @@
 from protollm.raw_data_processing.docs_parsers.parsers.word_doc.word_doc_parser import WordDocumentParser
+from protollm.raw_data_processing.docs_parsers.parsers.word_doc.images import ImageReference
@@ -1,21 +1,32 @@
 import html
 import re
-from typing import Optional, Iterator
+import zipfile
+from collections import deque
+from itertools import chain
+from typing import Optional, Iterable, Iterator, Union
 from uuid import uuid4
 
 import docx
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.table import Table, _Cell, _Row
+from docx.oxml.simpletypes import ST_Merge
+from docx.table import Table
 from docx.text.hyperlink import Hyperlink
 from docx.text.paragraph import Paragraph
-from ftfy import fix_text
-from tabulate import tabulate
+from docx.text.run import Run
 
+from protollm.raw_data_processing.docs_parsers.parsers.text_normalizer import ENCODING_SAMPLE_SIZE
 from protollm.raw_data_processing.docs_parsers.parsers.utilities import is_bulleted_text
 from protollm.raw_data_processing.docs_parsers.parsers.word_doc.docx_parsing_config import (
     DocxParsingConfig,
 )
-from protollm.raw_data_processing.docs_parsers.parsers.word_doc.xml import process_paragraph_body
+from protollm.raw_data_processing.docs_parsers.parsers.word_doc.docx_streaming import (
+    StreamingDocumentPart,
+)
+from protollm.raw_data_processing.docs_parsers.parsers.word_doc.xml import (
+    XMLTag,
+    numbering_xpath,
+    process_paragraph_body,
+)
 
 
 def _get_list_level(split_text: list[str], level: int = -1) -> int:
@@ -42,7 +53,10 @@ def _get_urls(paragraph: Paragraph) -> dict[str, str]:
     return urls
 
 
-def _get_metadata(paragraph: Optional[Paragraph] = None) -> dict:
+def _get_metadata(
+    paragraph: Optional[Paragraph] = None,
+    parsing_config: Optional[DocxParsingConfig] = None,
+) -> dict:
     bold = False
     font_size = -1
     urls = {}
@@ -52,30 +66,43 @@ def _get_metadata(paragraph: Optional[Paragraph] = None) -> dict:
     first_line_indent = 0
 
     if paragraph is not None:
-        bold = paragraph.runs[0].bold or bold if paragraph.runs else bold
-        bold = paragraph.style.font.bold or bold
-
-        font_size = (
-            paragraph.runs[0].font.size or font_size if paragraph.runs else font_size
-        )
-
-        urls.update(_get_urls(paragraph))
-
-        split_text = re.split("[ .\xa0]", paragraph.text)
-        list_level = _get_list_level(split_text)
-
-        is_bullet_list = is_bulleted_text(paragraph.text) | (
-            "<w:numPr>" in paragraph._element.xml
-        )
-
-        is_centered = paragraph.paragraph_format.alignment is WD_ALIGN_PARAGRAPH.CENTER
-
-        paragraph_first_line_indent = paragraph.paragraph_format.first_line_indent
-        first_line_indent = (
-            paragraph_first_line_indent.emu
-            if paragraph_first_line_indent is not None
-            else first_line_indent
-        )
+        is_needed = parsing_config.is_metadata_field_needed
+        r_lst = paragraph._p.r_lst
+        first_run = Run(r_lst[0], paragraph) if r_lst else None
+
+        if is_needed("bold"):
+            bold = first_run.bold or bold if first_run is not None else bold
+            bold = parsing_config.get_paragraph_style(paragraph).font.bold or bold
+
+        if is_needed("font_size"):
+            font_size = (
+                first_run.font.size or font_size if first_run is not None else font_size
+            )
+
+        if is_needed("urls"):
+            urls.update(_get_urls(paragraph))
+
+        if is_needed("list_level") or is_needed("is_bullet_list"):
+            text = paragraph.text
+            split_text = re.split("[ .\xa0]", text)
+            list_level = _get_list_level(split_text)
+
+            is_bullet_list = is_bulleted_text(text) | numbering_xpath(
+                paragraph._element
+            )
+
+        if is_needed("is_centered"):
+            is_centered = (
+                paragraph.paragraph_format.alignment is WD_ALIGN_PARAGRAPH.CENTER
+            )
+
+        if is_needed("first_line_indent"):
+            paragraph_first_line_indent = paragraph.paragraph_format.first_line_indent
+            first_line_indent = (
+                paragraph_first_line_indent.emu
+                if paragraph_first_line_indent is not None
+                else first_line_indent
+            )
 
     return {
         "bold": bold,
@@ -97,46 +124,85 @@ def _process_paragraph(
     paragraph_text, paragraph_metadata = process_paragraph_body(
         paragraph, parsing_config=parsing_config
     )
-    paragraph_text = fix_text(paragraph_text).replace("\xa0", " ")
+    paragraph_text = parsing_config.text_normalizer.normalize(paragraph_text)
+    paragraph_text = paragraph_text.replace("\xa0", " ")
     paragraph_text = " ".join(paragraph_text.split())
 
-    metadata = _get_metadata(paragraph)
+    metadata = _get_metadata(paragraph, parsing_config)
     metadata.update(paragraph_metadata)
 
     return paragraph_text, metadata
 
 
+def _render_html(rows: list[list[str]], is_nested: bool = False) -> str:
+    if not rows:
+        return ""
+    columns_number = max(len(row) for row in rows)
+
+    def render_row(row: list[str], cell_tag: str) -> str:
+        cells = chain(row, [""] * (columns_number - len(row)))
+        return "<tr>" + "".join(f"<{cell_tag}>{cell}</{cell_tag}>" for cell in cells) + "</tr>"
+
+    parts = ["<table>"]
+    if not is_nested:
+        parts.extend(("<thead>", render_row(rows[0], "th"), "</thead>"))
+        rows = rows[1:]
+    parts.append("<tbody>")
+    parts.extend(render_row(row, "td") for row in rows)
+    parts.extend(("</tbody>", "</table>"))
+    return "\n".join(parts)
+
+
 def _convert_to_html(
     table: Table, parsing_config: DocxParsingConfig, is_nested: bool = False
 ) -> tuple[str, list[dict]]:
+    """
+    Serializes the table in a single pass over its rows. Merged cells are resolved with the layout grid
+    as python-docx does: a cell spanning several columns is repeated for each of them, and a cell
+    continuing a vertical merge takes the content of the cell above at the same grid offset. The grid
+    columns skipped before the row's first cell are empty cells. The content of each cell is processed once
+    :param table: table of the document
+    :param parsing_config:
+    :param is_nested: whether the table is in a cell of another table, nested tables have no header
+    :return: html table and meta of the cells' paragraphs
+    """
     cells_metadata = []
 
-    def iter_cell_block_items(cell: _Cell) -> Iterator[str]:
-        for block_item in cell.iter_inner_content():
-            if isinstance(block_item, Table):
+    def get_cell_text(tc) -> str:
+        texts = []
+        for element in tc.iterchildren(XMLTag.paragraph.value, XMLTag.table.value):
+            if element.tag == XMLTag.table:
                 inner_html_table, inner_cells_metadata = _convert_to_html(
-                    block_item, parsing_config, is_nested=True
+                    Table(element, table), parsing_config, is_nested=True
                 )
                 cells_metadata.extend(inner_cells_metadata)
-                yield inner_html_table
-            elif isinstance(block_item, Paragraph):
+                texts.append(inner_html_table)
+            else:
                 paragraph_text, metadata = _process_paragraph(
-                    block_item, parsing_config
+                    Paragraph(element, table), parsing_config
                 )
                 cells_metadata.append(metadata)
-                yield f"{html.escape(paragraph_text)}"
-
-    def iter_cells(row: _Row) -> Iterator[str]:
-        return ("\n".join(iter_cell_block_items(cell)) for cell in row.cells)
-
-    return (
-        tabulate(
-            [list(iter_cells(row)) for row in table.rows],
-            headers=[] if is_nested else "firstrow",
-            tablefmt="unsafehtml",
-        ),
-        cells_metadata,
-    )
+                texts.append(html.escape(paragraph_text))
+        return "\n".join(texts)
+
+    rows = []
+    texts_above = {}  # texts of the previous row's cells by their grid offsets
+    for tr in table._tbl.tr_lst:
+        grid_offset = tr.grid_before
+        row, texts = [""] * grid_offset, {}
+        for tc in tr.tc_lst:
+            if tc.vMerge == ST_Merge.CONTINUE:
+                text = texts_above.get(grid_offset, "")
+            else:
+                text = get_cell_text(tc)
+            grid_span = tc.grid_span
+            row.extend([text] * grid_span)
+            texts[grid_offset] = text
+            grid_offset += grid_span
+        rows.append(row)
+        texts_above = texts
+
+    return _render_html(rows, is_nested), cells_metadata
 
 
 def _process_table(table: Table, parsing_config: DocxParsingConfig) -> tuple[str, dict]:
@@ -151,28 +217,104 @@ def _process_table(table: Table, parsing_config: DocxParsingConfig) -> tuple[str
     return html_table, metadata  # TODO: f'{{{table_name}}}' instead of html_table
 
 
+def _iter_lines(
+    block_items: Iterable[Union[Paragraph, Table]],
+    parsing_config: DocxParsingConfig,
+    extract_tables: bool = False,
+) -> Iterator[tuple[str, dict]]:
+    for block_item in block_items:
+        if isinstance(block_item, Paragraph):
+            line, meta = _process_paragraph(block_item, parsing_config)
+        elif isinstance(block_item, Table) and extract_tables:
+            line, meta = _process_table(block_item, parsing_config)
+        else:
+            continue
+
+        if not line:
+            continue
+
+        yield line, meta
+
+
 def parse_docx_to_lines(
     stream,
     extract_tables: bool = False,
     extract_images: bool = False,
     extract_formulas: bool = False,
+    metadata_fields: Optional[Iterable[str]] = None,
+    package_path: Optional[str] = None,
 ) -> tuple[list[str], list[dict]]:
     lines, metadata = [], []
     document = docx.Document(stream)
-    parsing_config = DocxParsingConfig(document, extract_images, extract_formulas)
-    for section in document.sections:
-        for block_item in section.iter_inner_content():
-            if isinstance(block_item, Paragraph):
-                line, meta = _process_paragraph(block_item, parsing_config)
-            elif isinstance(block_item, Table) and extract_tables:
-                line, meta = _process_table(block_item, parsing_config)
-            else:
-                continue
+    parsing_config = DocxParsingConfig(
+        document.part.rels,
+        (paragraph.text for paragraph in document.paragraphs),
+        extract_images,
+        extract_formulas,
+        metadata_fields,
+        package_path,
+    )
+    parsing_config.text_normalizer.check_encoding()
+    block_items = (
+        block_item
+        for section in document.sections
+        for block_item in section.iter_inner_content()
+    )
+    for line, meta in _iter_lines(block_items, parsing_config, extract_tables):
+        lines.append(line)
+        metadata.append(meta)
 
-            if not line:
-                continue
+    return lines, metadata
 
-            lines.append(line)
-            metadata.append(meta)
 
-    return lines, metadata
+def iter_docx_lines(
+    stream,
+    extract_tables: bool = False,
+    extract_images: bool = False,
+    extract_formulas: bool = False,
+    metadata_fields: Optional[Iterable[str]] = None,
+    package_path: Optional[str] = None,
+) -> Iterator[tuple[str, dict]]:
+    """
+    Yields the lines of the document as its body is read from the archive, so only the current paragraph
+    or table and the images being extracted are kept in memory. The lines are the same as the ones
+    of parse_docx_to_lines
+    :param stream: binary input
+    :param extract_tables:
+    :param extract_images:
+    :param extract_formulas:
+    :param metadata_fields: paragraphs' formatting fields to compute, all of them if None
+    :param package_path: path to the document's file, the images are read from it on demand
+    :return: text and meta of each line
+    """
+    with zipfile.ZipFile(stream) as docx_file:
+        document_part = StreamingDocumentPart(docx_file)
+        block_items = document_part.iter_block_items()
+
+        # The encoding damage is detected on the first paragraphs, so they are read ahead
+        buffer = deque()
+        paragraphs_number = 0
+        for block_item in block_items:
+            buffer.append(block_item)
+            if isinstance(block_item, Paragraph):
+                paragraphs_number += 1
+                if paragraphs_number == ENCODING_SAMPLE_SIZE:
+                    break
+
+        parsing_config = DocxParsingConfig(
+            document_part.rels,
+            (item.text for item in buffer if isinstance(item, Paragraph)),
+            extract_images,
+            extract_formulas,
+            metadata_fields,
+            package_path,
+        )
+        parsing_config.text_normalizer.check_encoding()
+
+        def drain_buffer():
+            while buffer:
+                yield buffer.popleft()
+
+        yield from _iter_lines(
+            chain(drain_buffer(), block_items), parsing_config, extract_tables
+        )
@@ -1,5 +1,9 @@
-from docx.document import Document
+from typing import Iterable, Optional
 
+from docx.enum.style import WD_STYLE_TYPE
+
+from protollm.raw_data_processing.docs_parsers.parsers.text_normalizer import TextNormalizer
+from protollm.raw_data_processing.docs_parsers.parsers.word_doc.images import ImageReference
 from protollm.raw_data_processing.docs_parsers.parsers.word_doc.xml.utilities import (
     _get_omml2mml_transformation,
     _get_mml2tex_transformation,
@@ -9,15 +13,34 @@ from protollm.raw_data_processing.docs_parsers.parsers.word_doc.xml.utilities im
 class DocxParsingConfig:
     def __init__(
         self,
-        document: Document,
+        document_relationships: dict,
+        sample_lines: Iterable[str],
         extract_images: bool = False,
         parse_formulas: bool = False,
+        metadata_fields: Optional[Iterable[str]] = None,
+        package_path: Optional[str] = None,
     ):
-        self.__rels = document.part.rels
+        """
+        :param document_relationships: relationships of the document's main part by their ids
+        :param sample_lines: texts of the first document's paragraphs to detect the encoding damage on
+        :param metadata_fields: paragraphs' formatting fields to compute, all of them if None, the rest
+        keep their default values
+        :param package_path: path to the document's file, the images are read from it when their
+        references are used in another process
+        """
+        self.__rels = document_relationships
         self.__extract_images = extract_images
         self.__parse_formulas = parse_formulas
         self.__omml2mml = None
         self.__mml2tex = None
+        self.__text_normalizer = TextNormalizer(sample_lines)
+        self.__images_by_part = {}
+        self.__images_by_hash = {}
+        self.__metadata_fields = (
+            frozenset(metadata_fields) if metadata_fields is not None else None
+        )
+        self.__paragraph_styles = {}
+        self.__package_path = package_path
 
     @property
     def extract_images(self):
@@ -27,6 +50,30 @@ class DocxParsingConfig:
     def parse_formulas(self):
         return self.__parse_formulas
 
+    @property
+    def metadata_fields(self) -> Optional[frozenset[str]]:
+        return self.__metadata_fields
+
+    def is_metadata_field_needed(self, field: str) -> bool:
+        return self.__metadata_fields is None or field in self.__metadata_fields
+
+    def get_paragraph_style(self, paragraph):
+        """
+        Gets the paragraph's style, the styles are resolved once per document by their ids
+        :param paragraph: paragraph of the document
+        :return:
+        """
+        style_id = paragraph._p.style
+        style = self.__paragraph_styles.get(style_id)
+        if style is None:
+            style = paragraph.part.get_style(style_id, WD_STYLE_TYPE.PARAGRAPH)
+            self.__paragraph_styles[style_id] = style
+        return style
+
+    @property
+    def text_normalizer(self):
+        return self.__text_normalizer
+
     @property
     def document_relationships(self):
         return self.__rels
@@ -44,3 +91,17 @@ class DocxParsingConfig:
             self.__mml2tex = _get_mml2tex_transformation()
 
         return self.__mml2tex
+
+    def get_image_reference(self, image_part) -> ImageReference:
+        """
+        Gets the reference to the image, identical images of the document share the same one
+        :param image_part: part of the document's package with the image
+        :return:
+        """
+        part_name = str(image_part.partname)
+        reference = self.__images_by_part.get(part_name)
+        if reference is None:
+            reference = ImageReference.from_image_part(image_part, self.__package_path)
+            reference = self.__images_by_hash.setdefault(reference.content_hash, reference)
+            self.__images_by_part[part_name] = reference
+        return reference
@@ -0,0 +1,160 @@
+import posixpath
+import zipfile
+from typing import Iterator, NamedTuple, Optional, Union
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.parser import element_class_lookup, parse_xml
+from docx.parts.styles import StylesPart
+from docx.styles.style import BaseStyle
+from docx.styles.styles import Styles
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+from protollm.raw_data_processing.docs_parsers.parsers.word_doc.xml.xml_tag import (
+    _get_xml_tag_name,
+)
+
+# Size of the document's xml chunks fed to the parser
+READ_CHUNK_SIZE = 2**16
+
+PACKAGE_PART_NAME = ""  # relationships of the package itself are in _rels/.rels
+OFFICE_DOCUMENT_TYPE = "/officeDocument"
+STYLES_TYPE = "/styles"
+
+_body_tag = _get_xml_tag_name("body", "w")
+_paragraph_tag = _get_xml_tag_name("p", "w")
+_table_tag = _get_xml_tag_name("tbl", "w")
+_relationship_tag = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+
+
+class ZipPart:
+    """
+    Part of the document's package, its content is read from the archive only on access
+    """
+
+    def __init__(self, docx_file: zipfile.ZipFile, part_name: str):
+        self._docx_file = docx_file
+        self.part_name = part_name
+
+    @property
+    def blob(self) -> bytes:
+        return self._docx_file.read(self.part_name)
+
+    @property
+    def partname(self) -> str:
+        return "/" + self.part_name
+
+    @property
+    def filename(self) -> str:
+        # the same generic name as python-docx gives to the images loaded from a package
+        return "image." + posixpath.splitext(self.part_name)[1].lstrip(".")
+
+
+class Relationship(NamedTuple):
+    reltype: str
+    target_ref: str
+    is_external: bool
+    target_part: Optional[ZipPart]
+
+
+def _read_relationships(
+    docx_file: zipfile.ZipFile, source_part_name: str
+) -> dict[str, Relationship]:
+    directory, name = posixpath.split(source_part_name)
+    relationships_part_name = posixpath.join(directory, "_rels", name + ".rels")
+    try:
+        relationships_xml = etree.fromstring(docx_file.read(relationships_part_name))
+    except KeyError:
+        return {}
+
+    relationships = {}
+    for element in relationships_xml.iter(_relationship_tag):
+        target_ref = element.get("Target")
+        is_external = element.get("TargetMode") == "External"
+        target_part = None
+        if not is_external:
+            part_name = (
+                target_ref.lstrip("/")
+                if target_ref.startswith("/")
+                else posixpath.normpath(posixpath.join(directory, target_ref))
+            )
+            target_part = ZipPart(docx_file, part_name)
+        relationships[element.get("Id")] = Relationship(
+            element.get("Type"), target_ref, is_external, target_part
+        )
+    return relationships
+
+
+class StreamingDocumentPart:
+    """
+    Main part of a DOCX document, which reads the body's paragraphs and tables one by one.
+
+    Only the relationships and the styles are loaded beforehand, the body is parsed incrementally
+    straight from the archive, and the media are read only when they are accessed. The part stands
+    for python-docx DocumentPart as the parent of the paragraphs and tables, so they are processed
+    in the same way as the ones of a fully loaded document.
+    """
+
+    def __init__(self, docx_file: zipfile.ZipFile):
+        self._docx_file = docx_file
+        package_relationships = _read_relationships(docx_file, PACKAGE_PART_NAME)
+        document = next(
+            (
+                relationship.target_part
+                for relationship in package_relationships.values()
+                if relationship.reltype.endswith(OFFICE_DOCUMENT_TYPE)
+                and relationship.target_part is not None
+            ),
+            None,
+        )
+        if document is None:
+            raise ValueError("The file is not a Word document")
+        self._part_name = document.part_name
+        self.rels = _read_relationships(docx_file, self._part_name)
+
+        styles = next(
+            (
+                relationship.target_part
+                for relationship in self.rels.values()
+                if relationship.reltype.endswith(STYLES_TYPE)
+                and relationship.target_part is not None
+            ),
+            None,
+        )
+        # python-docx uses the default styles, if the document has none
+        if styles is None:
+            self.styles = StylesPart.default(None).styles
+        else:
+            self.styles = Styles(parse_xml(styles.blob))
+
+    @property
+    def part(self) -> "StreamingDocumentPart":
+        return self
+
+    def get_style(self, style_id: Optional[str], style_type: WD_STYLE_TYPE) -> BaseStyle:
+        return self.styles.get_by_id(style_id, style_type)
+
+    def iter_block_items(self) -> Iterator[Union[Paragraph, Table]]:
+        """
+        Yields the body's paragraphs and tables as soon as they are parsed. Yielded elements are
+        detached from the body, so they are freed once they are no longer referenced
+        :return:
+        """
+        parser = etree.XMLPullParser(
+            events=("end",), remove_blank_text=True, resolve_entities=False
+        )
+        parser.set_element_class_lookup(element_class_lookup)
+        with self._docx_file.open(self._part_name) as document_xml:
+            while chunk := document_xml.read(READ_CHUNK_SIZE):
+                parser.feed(chunk)
+                for _, element in parser.read_events():
+                    body = element.getparent()
+                    if body is None or body.tag != _body_tag:
+                        continue
+                    if element.tag == _paragraph_tag:
+                        yield Paragraph(element, self)
+                    elif element.tag == _table_tag:
+                        yield Table(element, self)
+                    body.remove(element)
+        parser.close()
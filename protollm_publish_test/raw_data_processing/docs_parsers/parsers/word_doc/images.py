@@ -0,0 +1,97 @@
+import hashlib
+import io
+import zipfile
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class ImageReference:
+    """
+    Image embedded in a Word document. Only the image's header is read while parsing, the image is
+    decoded on demand with `open`, so the documents' metadata stays light to keep and to pickle.
+    Identical images of a document share the same reference.
+
+    If the document is a file on disk, which outlives the parsing, the encoded image is kept only
+    in the process, which has parsed the document, it isn't pickled. Elsewhere, e.g. after the parsing
+    cache or a worker process, the image is read from the document's package by its part name.
+    Otherwise, e.g. for a temporary file, the encoded image is pickled with the reference
+    """
+
+    part_name: str  # name of the image's part in the document's package
+    image_filename: str
+    content_hash: str  # sha256 of the encoded image
+    format: Optional[str]
+    width: int
+    height: int
+    package_path: Optional[str] = None  # path to the document, which contains the image
+    _data: Optional[bytes] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_image_part(cls, image_part, package_path: Optional[str] = None) -> "ImageReference":
+        data = image_part.blob
+        # PIL reads only the header, until the image's pixels are accessed
+        with Image.open(io.BytesIO(data)) as image:
+            image_format, (width, height) = image.format, image.size
+        return cls(
+            part_name=str(image_part.partname),
+            image_filename=image_part.filename,
+            content_hash=hashlib.sha256(data).hexdigest(),
+            format=image_format,
+            width=width,
+            height=height,
+            package_path=package_path,
+            _data=data,
+        )
+
+    def __getstate__(self) -> dict:
+        if self.package_path is None:
+            return self.__dict__
+        return {**self.__dict__, "_data": None}
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+
+    def with_package(
+        self, package_path: Optional[str], package: Optional[zipfile.ZipFile] = None
+    ) -> "ImageReference":
+        """
+        Gets the reference to the same image in another copy of the document, e.g. for the cached one
+        :param package_path: path to the copy's file, if it outlives the parsing
+        :param package: the opened copy, the image is read from it if it isn't in memory and the path is None
+        :return:
+        """
+        if package_path == self.package_path:
+            return self
+        data = self._data
+        if package_path is None and data is None:
+            data = package.read(self.part_name.lstrip("/"))
+        return replace(self, package_path=package_path, _data=data)
+
+    @property
+    def data(self) -> bytes:
+        """
+        Encoded image as it is stored in the document
+        """
+        if self._data is not None:
+            return self._data
+        if self.package_path is None:
+            raise FileNotFoundError(
+                f"The document of the image {self.part_name} is not available"
+            )
+        with zipfile.ZipFile(self.package_path) as package:
+            data = package.read(self.part_name.lstrip("/"))
+        if hashlib.sha256(data).hexdigest() != self.content_hash:
+            raise ValueError(f"The image {self.part_name} has changed in {self.package_path}")
+        return data
+
+    def open(self) -> Image.Image:
+        """
+        Decodes the image
+        :return:
+        """
+        image = Image.open(io.BytesIO(self.data))
+        image.load()
+        return image
@@ -1,4 +1,5 @@
 import re
+from typing import Iterable, Iterator
 
 from protollm.raw_data_processing.docs_parsers.parsers.utilities import (
     HEADING_KEYWORDS,
@@ -24,62 +25,89 @@ def _get_heading_hierarchy_level(text: str, metadata: dict) -> int:
     return -1
 
 
-def add_headings_hierarchy(
-    lines: list[str], metadata: list[dict]
-) -> tuple[list[str], list[dict]]:
-    new_lines, new_metadata = [], []
+def iter_headings_hierarchy(
+    lines_with_meta: Iterable[tuple[str, dict]]
+) -> Iterator[tuple[str, dict]]:
     hierarchy = [""]
-    for line, line_meta in zip(lines, metadata):
+    for line, line_meta in lines_with_meta:
         hierarchy_level = _get_heading_hierarchy_level(line, line_meta)
         if hierarchy_level == -1:
-            new_meta = {**line_meta, "headings": list(hierarchy)}
-            new_lines.append(line)
-            new_metadata.append(new_meta)
+            yield line, {**line_meta, "headings": list(hierarchy)}
         else:
             if hierarchy_level < len(hierarchy):
                 hierarchy = hierarchy[:hierarchy_level]
             elif hierarchy_level > len(hierarchy):
                 hierarchy.extend([""] * (hierarchy_level - len(hierarchy)))
             hierarchy.append(line)
-    return new_lines, new_metadata
 
 
-def get_chapters(
-    lines: list[str], metadata: list[dict]
-) -> tuple[list[str], list[dict]]:
-    chapters, meta = [], []
-    cur_chapter = ""
-    for line, line_meta in zip(lines, metadata):
-        if chapters and (cur_chapter == line_meta["headings"][0]):
-            chapters[-1] = join_texts(chapters[-1], line, joiner="\n")
-            update_metadata(meta[-1], line_meta)
+def iter_chapters(
+    lines_with_meta: Iterable[tuple[str, dict]]
+) -> Iterator[tuple[str, dict]]:
+    texts, meta = [], {}
+    for line, line_meta in lines_with_meta:
+        if texts and (meta["chapter"] == line_meta["headings"][0]):
+            texts.append(line)
+            update_metadata(meta, line_meta)
             continue
+        if texts:
+            yield "\n".join(texts), meta
         cur_chapter = line_meta["headings"][0]
-        chapters.append(line)
-        meta.append({"chapter": cur_chapter, "headings": [cur_chapter]})
-        update_metadata(meta[-1], line_meta)
-    return chapters, meta
+        texts = [line]
+        meta = {"chapter": cur_chapter, "headings": [cur_chapter]}
+        update_metadata(meta, line_meta)
+    if texts:
+        yield "\n".join(texts), meta
 
 
-def get_paragraphs(
-    lines: list[str], metadata: list[dict]
-) -> tuple[list[str], list[dict]]:
-    paragraphs, meta = [], []
+def iter_paragraphs(
+    lines_with_meta: Iterable[tuple[str, dict]]
+) -> Iterator[tuple[str, dict]]:
+    texts, meta = [], {}
     cur_paragraph = ""
-    for line, line_meta in zip(lines, metadata):
+    for line, line_meta in lines_with_meta:
         if (
-            paragraphs
+            texts
             and line_meta["is_bullet_list"]
             and (cur_paragraph == line_meta["headings"][-1])
         ):
-            paragraphs[-1] = join_texts(paragraphs[-1], line, joiner=" ")
-            update_metadata(meta[-1], line_meta)
+            texts.append(line)
+            update_metadata(meta, line_meta)
             continue
+        if texts:
+            yield " ".join(texts), meta
         cur_paragraph = line_meta["headings"][-1]
-        paragraphs.append(line)
-        meta.append({"headings": line_meta["headings"]})
-        update_metadata(meta[-1], line_meta)
-    return paragraphs, meta
+        texts = [line]
+        meta = {"headings": line_meta["headings"]}
+        update_metadata(meta, line_meta)
+    if texts:
+        yield " ".join(texts), meta
+
+
+def _unzip(lines_with_meta: Iterable[tuple[str, dict]]) -> tuple[list[str], list[dict]]:
+    lines, metadata = [], []
+    for line, meta in lines_with_meta:
+        lines.append(line)
+        metadata.append(meta)
+    return lines, metadata
+
+
+def add_headings_hierarchy(
+    lines: list[str], metadata: list[dict]
+) -> tuple[list[str], list[dict]]:
+    return _unzip(iter_headings_hierarchy(zip(lines, metadata)))
+
+
+def get_chapters(
+    lines: list[str], metadata: list[dict]
+) -> tuple[list[str], list[dict]]:
+    return _unzip(iter_chapters(zip(lines, metadata)))
+
+
+def get_paragraphs(
+    lines: list[str], metadata: list[dict]
+) -> tuple[list[str], list[dict]]:
+    return _unzip(iter_paragraphs(zip(lines, metadata)))
 
 
 def update_metadata(meta: dict, line_meta: dict):
@@ -1,26 +1,47 @@
-from functools import partial
+import zipfile
 from pathlib import Path
-from typing import Iterator, Union, Optional
+from typing import Iterable, Iterator, Union, Optional
 
 from langchain_core.document_loaders import Blob
 from langchain_core.documents import Document
 
-from protollm.raw_data_processing.docs_parsers.utils.exceptions import EncodingError
 from protollm.raw_data_processing.docs_parsers.parsers.base import BaseParser
+from protollm.raw_data_processing.docs_parsers.parsers.cache import cached_parsing
 from protollm.raw_data_processing.docs_parsers.parsers.entities import ParsingScheme
 from protollm.raw_data_processing.docs_parsers.parsers.word_doc.utilities import (
-    get_paragraphs,
-    get_chapters,
-    add_headings_hierarchy,
+    iter_paragraphs,
+    iter_chapters,
+    iter_headings_hierarchy,
 )
-from protollm.raw_data_processing.docs_parsers.utils.utilities import correct_path_encoding, is_bad_encoding
+from protollm.raw_data_processing.docs_parsers.utils.utilities import correct_path_encoding
+
+# Paragraphs' formatting used by each parsing scheme, the lines keep all of it in their meta
+HEADINGS_METADATA_FIELDS = ("bold", "list_level", "is_bullet_list", "urls")
+SCHEME_METADATA_FIELDS = {
+    ParsingScheme.lines: None,
+    ParsingScheme.paragraphs: HEADINGS_METADATA_FIELDS,
+    ParsingScheme.chapters: HEADINGS_METADATA_FIELDS,
+    ParsingScheme.full: (),
+}
+# Key of the blob's metadata, which marks the blob's path as a file outliving the parsing,
+# the extracted images are read from it on demand
+PERSISTENT_PATH_KEY = "persistent_path"
 
 
 class WordDocumentParser(BaseParser):
     """
     The parser provides a way to parse raw data from Word Document into one or more documents.
+
+    In the incremental mode the document's body is read straight from the archive, and the documents
+    are yielded as the paragraphs and tables are parsed, so the memory usage doesn't depend on
+    the document's size. The result is the same as in the default mode.
+
+    DOC, ODT and RTF documents are converted to DOCX by the process-wide pool of LibreOffice instances,
+    if UNO bindings are installed, see `set_conversion_pool`.
     """
 
+    runtime_options = ("timeout", "incremental")
+
     def __init__(
         self,
         parsing_scheme: Union[ParsingScheme, str] = ParsingScheme.lines,
@@ -28,6 +49,7 @@ class WordDocumentParser(BaseParser):
         extract_tables: bool = False,
         extract_formulas: bool = False,
         timeout_for_converting: Optional[int] = None,
+        incremental: bool = False,
     ):
         try:
             import protollm.raw_data_processing.docs_parsers.parsers.word_doc.docx_parsing
@@ -44,18 +66,13 @@ class WordDocumentParser(BaseParser):
         self.extract_tables = extract_tables
         self.extract_formulas = extract_formulas
         self.timeout = timeout_for_converting
+        self.incremental = incremental
 
+    @cached_parsing
     def lazy_parse(self, blob: Blob) -> Iterator[Document]:
-        from protollm.raw_data_processing.docs_parsers.parsers.word_doc.docx_parsing import (
-            parse_docx_to_lines,
-        )
-
-        parse_docx_to_lines = partial(
-            parse_docx_to_lines,
-            extract_tables=self.extract_tables,
-            extract_images=self.extract_images,
-            extract_formulas=self.extract_formulas,
-        )
+        source = blob.source
+        source = correct_path_encoding(source) if source is not None else ""
+        file_name = Path(source).name
 
         match blob.mimetype:
             case "doc" | "odt" | "rtf":
@@ -67,24 +84,82 @@ class WordDocumentParser(BaseParser):
                     with converted_file_to_docx(
                         file_obj, timeout=self.timeout
                     ) as docx_file_obj:
-                        lines, metadata = parse_docx_to_lines(docx_file_obj)
+                        yield from self._split_to_documents(
+                            self._iter_lines(docx_file_obj), source, file_name
+                        )
             case "docx":
                 with blob.as_bytes_io() as docx_file_obj:
-                    lines, metadata = parse_docx_to_lines(docx_file_obj)
+                    yield from self._split_to_documents(
+                        self._iter_lines(docx_file_obj, self._get_package_path(blob)),
+                        source,
+                        file_name,
+                    )
             case _:
                 raise ValueError("Invalid document type")
 
-        if is_bad_encoding(lines):
-            raise EncodingError(
-                "It is impossible to parse the file due to uncertainty in the text encoding"
-            )
+    def restore_cached(self, document: Document, blob: Blob) -> Document:
+        """
+        Moves the images of the cached document to the blob's package, the cached one may not exist
+        """
+        images = document.metadata.get("images")
+        if not images or blob.mimetype != "docx":
+            return document
+        package_path = self._get_package_path(blob)
+        if package_path is not None:
+            images = {name: image.with_package(package_path) for name, image in images.items()}
+        else:
+            with blob.as_bytes_io() as file_obj, zipfile.ZipFile(file_obj) as package:
+                images = {
+                    name: image.with_package(None, package) for name, image in images.items()
+                }
+        document.metadata["images"] = images
+        return document
 
-        source = blob.source
-        source = correct_path_encoding(source) if source is not None else ""
-        file_name = Path(source).name
+    @staticmethod
+    def _get_package_path(blob: Blob) -> Optional[str]:
+        # the images are read from the file on demand, if it isn't temporary and the content isn't in memory
+        if blob.data is None and blob.path and blob.metadata.get(PERSISTENT_PATH_KEY):
+            return str(blob.path)
+        return None
+
+    def _iter_lines(
+        self, docx_file_obj, package_path: Optional[str] = None
+    ) -> Iterator[tuple[str, dict]]:
+        """
+        Parses the document's lines, all at once or as they are read in the incremental mode
+        :param docx_file_obj: binary input
+        :param package_path: path to the document's file, if it is on disk and outlives the parsing
+        :return: text and meta of each line
+        """
+        from protollm.raw_data_processing.docs_parsers.parsers.word_doc.docx_parsing import (
+            iter_docx_lines,
+            parse_docx_to_lines,
+        )
+
+        options = {
+            "extract_tables": self.extract_tables,
+            "extract_images": self.extract_images,
+            "extract_formulas": self.extract_formulas,
+            "metadata_fields": SCHEME_METADATA_FIELDS[ParsingScheme(self.parsing_scheme)],
+            "package_path": package_path,
+        }
+        if self.incremental:
+            yield from iter_docx_lines(docx_file_obj, **options)
+        else:
+            yield from zip(*parse_docx_to_lines(docx_file_obj, **options))
 
+    def _split_to_documents(
+        self, lines_with_meta: Iterable[tuple[str, dict]], source: str, file_name: str
+    ) -> Iterator[Document]:
+        """
+        Splits the document's lines to documents according to the parsing scheme
+        :param lines_with_meta: the document's lines with their meta
+        :param source:
+        :param file_name:
+        :return:
+        """
         if self.parsing_scheme == ParsingScheme.full:
-            text = " ".join(lines)
+            text = " ".join(line for line, _ in lines_with_meta)
             meta = {
                 "page": "all",
                 "headings": [],
@@ -94,21 +169,21 @@ class WordDocumentParser(BaseParser):
             yield Document(page_content=text, metadata=meta)
             return
 
-        lines, metadata = add_headings_hierarchy(lines, metadata)
+        lines_with_meta = iter_headings_hierarchy(lines_with_meta)
 
         match self.parsing_scheme:
             case ParsingScheme.lines:
-                texts = lines
+                texts_with_meta = lines_with_meta
             case ParsingScheme.paragraphs:
-                texts, metadata = get_paragraphs(lines, metadata)
+                texts_with_meta = iter_paragraphs(lines_with_meta)
             case ParsingScheme.chapters:
-                texts, metadata = get_chapters(lines, metadata)
+                texts_with_meta = iter_chapters(lines_with_meta)
             case _:
                 raise NotImplementedError(
                     f"{self.parsing_scheme} type of parsing scheme is not implemented"
                 )
 
-        for text, meta in zip(texts, metadata):
+        for text, meta in texts_with_meta:
             yield Document(
                 page_content=text,
                 metadata={**meta, "source": source, "file_name": file_name},
@@ -1,29 +1,51 @@
-import io
+import hashlib
+from collections import OrderedDict
 from uuid import uuid4
 
-from PIL import Image
 from docx.text.paragraph import Paragraph
 from lxml import etree
 
-from protollm.raw_data_processing.docs_parsers.parsers.word_doc.xml.xml_tag import XMLTag
+from protollm.raw_data_processing.docs_parsers.parsers.word_doc.xml.xml_tag import (
+    XMLTag,
+    image_embed_xpath,
+)
+
+FORMULAS_CACHE_SIZE = 4096
+
+# Converted formulas by the hash of their OMML, shared by all documents parsed in the process
+_converted_formulas: OrderedDict[str, str] = OrderedDict()
+
+
+def _get_formula_hash(xml_element: etree.Element) -> str:
+    # the exclusive canonical form doesn't depend on the namespaces declared by the document
+    return hashlib.sha256(
+        etree.tostring(xml_element, method="c14n", exclusive=True)
+    ).hexdigest()
 
 
 def _convert_to_latex(
     xml_element: etree.Element, parsing_config: 'DocxParsingConfig'
 ) -> str:
+    formula_hash = _get_formula_hash(xml_element)
+    if formula_hash in _converted_formulas:
+        _converted_formulas.move_to_end(formula_hash)
+        return _converted_formulas[formula_hash]
+
     math_ml = parsing_config.omml2mml_transformation(xml_element).getroot()
-    tex = parsing_config.mml2tex_transformation(math_ml)
-    return str(tex)
+    tex = str(parsing_config.mml2tex_transformation(math_ml))
+    _converted_formulas[formula_hash] = tex
+    if len(_converted_formulas) > FORMULAS_CACHE_SIZE:
+        _converted_formulas.popitem(last=False)
+    return tex
 
 
 def _extract_image_data(
     xml_element: etree.Element, parsing_config: 'DocxParsingConfig'
-) -> dict:
-    rid = xml_element.find(".//" + XMLTag.blip.value).get(XMLTag.embed.value)
-    image_element = parsing_config.document_relationships[rid].target_part
-    image = Image.open(io.BytesIO(image_element.blob))
+) -> 'ImageReference':
+    rid = image_embed_xpath(xml_element)[0]
+    image_part = parsing_config.document_relationships[rid].target_part
     # [Example Future Functionality] extracted_data = process_image(image)  # TODO: add image processing
-    return {"image_filename": image_element.filename, "image": image}
+    return parsing_config.get_image_reference(image_part)
 
 
 def _parse_raw_xml_element(
@@ -57,7 +79,8 @@ def _parse_raw_xml_element(
 def process_paragraph_body(
     paragraph: Paragraph, parsing_config: 'DocxParsingConfig'
 ) -> tuple[str, dict[str, dict]]:
-    xml_paragraph = etree.fromstring(paragraph._element.xml)
+    # the paragraph's element is traversed as is, without the serialization and parsing of its copy
+    xml_paragraph = paragraph._element
     texts = []
     extracted_data = {"images": {}, "formulas": {}}
     for element in xml_paragraph:
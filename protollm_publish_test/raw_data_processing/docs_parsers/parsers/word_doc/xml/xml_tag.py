@@ -1,5 +1,6 @@
 from enum import Enum
 
+from lxml import etree
 
 _namespace_mapping = {
     "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
@@ -15,6 +16,8 @@ def _get_xml_tag_name(tag: str, namespace: str) -> str:
 
 
 class XMLTag(str, Enum):
+    paragraph = _get_xml_tag_name("p", "w")
+    table = _get_xml_tag_name("tbl", "w")
     raw = _get_xml_tag_name("r", "w")
     text = _get_xml_tag_name("t", "w")
     image = _get_xml_tag_name("drawing", "w")
@@ -22,3 +25,8 @@ class XMLTag(str, Enum):
     embed = _get_xml_tag_name("embed", "r")
     math = _get_xml_tag_name("oMath", "m")
     math_paragraph = _get_xml_tag_name("oMathPara", "m")
+
+
+# Expressions are compiled once and evaluated on the elements of the parsed document
+numbering_xpath = etree.XPath("boolean(.//w:numPr)", namespaces=_namespace_mapping)
+image_embed_xpath = etree.XPath(".//a:blip/@r:embed", namespaces=_namespace_mapping)
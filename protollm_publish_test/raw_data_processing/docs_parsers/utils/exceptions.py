@@ -13,6 +13,16 @@ class NoTextLayerError(Exception):
         super().__init__(message)
 
 
+class ParsingLimitError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class LowQualityError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
 class ChaptersExtractingFailedWarning(Warning):
     def __init__(self, message):
         super().__init__(message)
@@ -1,15 +1,39 @@
 import logging
+import time
 import warnings
 from contextlib import contextmanager
 from typing import Optional, Generator
 
+from langchain_core.document_loaders import Blob
+
+from protollm.raw_data_processing.docs_parsers.parsers.base import PAGES_NUMBER_KEY
+from protollm.raw_data_processing.docs_parsers.utils.exceptions import LowQualityError
+from protollm.raw_data_processing.docs_parsers.utils.metrics import (
+    ParsingRecord,
+    get_peak_memory,
+    reset_peak_memory,
+)
+
 
 class ParsingLogger:
-    def __init__(self, silent_errors: bool = False, name: Optional[str] = None):
+    def __init__(
+        self,
+        silent_errors: bool = False,
+        name: Optional[str] = None,
+        collect_metrics: bool = False,
+    ):
+        """
+        :param silent_errors: whether the parsing errors are only logged or raised
+        :param name: name of the logger
+        :param collect_metrics: whether the structured records of the parsed files are kept,
+        see utils.metrics for their export
+        """
         name = name or __name__
         self._logger = logging.getLogger(name)
         self._logs: dict[str, list[str]] = {}
+        self._records: list[ParsingRecord] = []
         self._silent_errors = silent_errors
+        self._collect_metrics = collect_metrics
 
     @property
     def logger(self):
@@ -19,6 +43,36 @@ class ParsingLogger:
     def logs(self):
         return self._logs
 
+    @property
+    def records(self) -> list[ParsingRecord]:
+        return self._records
+
+    @property
+    def silent_errors(self) -> bool:
+        return self._silent_errors
+
+    @property
+    def collect_metrics(self) -> bool:
+        return self._collect_metrics
+
+    def get_options(self) -> dict:
+        """
+        Gets the options to create a logger of the same kind, e.g. in a worker process
+        """
+        return {
+            "silent_errors": self._silent_errors,
+            "name": self._logger.name,
+            "collect_metrics": self._collect_metrics,
+        }
+
+    def extend(self, logs: dict[str, list[str]], records: list[ParsingRecord]):
+        """
+        Adds the logs and the records of another logger, e.g. of a worker process
+        """
+        for file_name, errors in logs.items():
+            self._logs.setdefault(file_name, []).extend(errors)
+        self._records.extend(records)
+
     def info(self, msg: str, *args, **kwargs):
         self._logger.info(msg, *args, **kwargs)
 
@@ -38,20 +92,63 @@ class ParsingLogger:
         self._logger.debug(msg, *args, **kwargs)
 
     @contextmanager
-    def parsing_info_handler(self, file_name: str) -> Generator[None, None, None]:
+    def parsing_info_handler(
+        self,
+        file_name: str,
+        parser: Optional[str] = None,
+        file_size: Optional[int] = None,
+        blob: Optional[Blob] = None,
+    ) -> Generator[ParsingRecord, None, None]:
+        """
+        Logs the warnings and the errors of parsing the file. The file rejected by the quality gate
+        isn't an error, the rejection is logged as info and the rest of the block is skipped
+        :param file_name: name of the file
+        :param parser: name of the parser
+        :param file_size: size of the file in bytes
+        :param blob: the file's blob, the number of its pages is recorded, if the metrics are collected
+        and the parser or the quality gate has noted it
+        :return: record of parsing the file, the documents passed through its `track` are counted
+        and only the time spent on producing them is measured, otherwise the time of the whole block
+        """
+        parsing_record = ParsingRecord(str(file_name), parser, file_size)
+        # the peak since the process' start would belong to the previous files
+        is_peak_reset = self._collect_metrics and reset_peak_memory()
+        start = time.perf_counter()
         try:
             try:
                 with warnings.catch_warnings(record=True) as record:
                     warnings.simplefilter("default")
-                    yield
+                    yield parsing_record
             finally:
                 for warning in record:
                     warn_msg = f"{warning.message} (in {file_name})"
                     self.warning(warn_msg)
+                if self._collect_metrics:
+                    self._add_record(parsing_record, start, is_peak_reset, blob)
+        except LowQualityError as error:
+            parsing_record.rejection = str(error)
+            self.info(f"Skip low quality file: {error} (in {file_name})")
         except Exception as error:
+            parsing_record.error = type(error).__name__
             self.logs[file_name] = self.logs.get(file_name, [])
             self.logs[file_name].append(str(error))
             err_msg = f"{error} (in {file_name})"
             self.error(err_msg)
             if not self._silent_errors:
                 raise
+
+    def _add_record(
+        self,
+        parsing_record: ParsingRecord,
+        start: float,
+        is_peak_reset: bool,
+        blob: Optional[Blob],
+    ):
+        if not parsing_record._is_tracked:
+            parsing_record.duration = time.perf_counter() - start
+        # the peak of the isolated parsing is recorded by the budget's monitor
+        if parsing_record.peak_memory is None and is_peak_reset:
+            parsing_record.peak_memory = get_peak_memory()
+        if blob is not None:
+            parsing_record.page_count = blob.metadata.get(PAGES_NUMBER_KEY)
+        self._records.append(parsing_record)
@@ -0,0 +1,277 @@
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, TextIO, Union
+
+from langchain_core.document_loaders import Blob
+from langchain_core.documents import Document
+
+METRICS_PREFIX = "protollm_parsing"
+QUANTILES = (0.5, 0.95)
+
+
+def get_resident_memory(pid: Optional[int] = None) -> Optional[int]:
+    """
+    Gets the current resident memory of the process
+    :param pid: id of the process, the current process by default
+    :return: the memory in bytes or None if it is unknown (e.g. the system has no /proc)
+    """
+    try:
+        with open(f"/proc/{pid or os.getpid()}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def reset_peak_memory() -> bool:
+    """
+    Resets the peak resident memory of the current process to its current resident memory
+    :return: whether the peak is reset, it's unsupported e.g. without /proc or on Linux before 4.0
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def get_peak_memory() -> Optional[int]:
+    """
+    Gets the peak resident memory of the current process since its start or the last reset
+    :return: the memory in bytes or None if it is unknown (e.g. the system has no /proc)
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def get_group_resident_memory(pgid: int) -> Optional[int]:
+    """
+    Gets the total resident memory of the processes of the group, e.g. of a process and its children
+    :param pgid: id of the process group
+    :return: the memory in bytes or None if it is unknown (e.g. the system has no /proc)
+    """
+    try:
+        pids = [int(name) for name in os.listdir("/proc") if name.isdigit()]
+    except OSError:
+        return None
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as stat:
+                # the process name may contain spaces, the group id is the third field after it
+                if int(stat.read().rsplit(")", 1)[1].split()[2]) != pgid:
+                    continue
+        except (OSError, ValueError, IndexError):  # the process has exited
+            continue
+        total += get_resident_memory(pid) or 0
+    return total
+
+
+def get_blob_size(blob: Blob) -> Optional[int]:
+    """
+    Gets the size of the blob's content without reading it
+    :return: the size in bytes or None if the blob's file is not available
+    """
+    if blob.data is not None:
+        return len(blob.data)
+    try:
+        return os.path.getsize(blob.path)
+    except (OSError, TypeError):
+        return None
+
+
+@dataclass
+class ParsingRecord:
+    """
+    Structured record of parsing a single file
+    """
+
+    path: str
+    parser: Optional[str] = None
+    file_size: Optional[int] = None
+    # number of the document's pages, if the parser or the quality gate has read it
+    page_count: Optional[int] = None
+    duration: float = 0.0  # time in seconds spent on producing the documents
+    chunk_count: int = 0
+    error: Optional[str] = None  # class of the raised error
+    rejection: Optional[str] = None  # reason of rejecting the file by the quality gate
+    # peak resident memory of the parsing process while the file is parsed, in bytes, it's the largest
+    # memory of the process group observed by the budget's monitor, if the parsing is isolated
+    peak_memory: Optional[int] = None
+    _is_tracked: bool = field(default=False, repr=False, compare=False)
+
+    @property
+    def doc_type(self) -> str:
+        return Path(self.path).suffix.lower().lstrip(".") or "unknown"
+
+    def track(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """
+        Passes the documents through, measuring the time spent on producing them. The time
+        the consumer spends on the documents isn't included
+        :param documents: documents of the file
+        :return:
+        """
+        self._is_tracked = True
+        iterator = iter(documents)
+        while True:
+            start = time.perf_counter()
+            try:
+                document = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.duration += time.perf_counter() - start
+            self.chunk_count += 1
+            yield document
+
+    def to_dict(self) -> dict:
+        return {
+            key: value
+            for key, value in asdict(self).items()
+            if not key.startswith("_")
+        } | {"doc_type": self.doc_type}
+
+
+def write_jsonl(records: Iterable[ParsingRecord], file: Union[str, Path, TextIO]):
+    """
+    Writes the records as JSON lines
+    :param records: parsing records
+    :param file: path to the file or a text stream
+    """
+    if isinstance(file, (str, Path)):
+        with open(file, "w", encoding="utf-8") as file_obj:
+            write_jsonl(records, file_obj)
+        return
+    for record in records:
+        file.write(json.dumps(record.to_dict(), ensure_ascii=False))
+        file.write("\n")
+
+
+def _quantile(sorted_values: list[float], q: float) -> float:
+    """
+    Nearest-rank quantile of the sorted values
+    """
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _group_by_doc_type(records: Iterable[ParsingRecord]) -> dict[str, list[ParsingRecord]]:
+    groups: dict[str, list[ParsingRecord]] = {}
+    for record in records:
+        groups.setdefault(record.doc_type, []).append(record)
+    return groups
+
+
+def summarize(records: Iterable[ParsingRecord], slowest_number: int = 10) -> dict:
+    """
+    Aggregates the records by file type
+    :param records: parsing records
+    :param slowest_number: number of the slowest files in the summary
+    :return: files, errors, chunks, bytes and duration quantiles per file type and the slowest files
+    """
+    records = list(records)
+    by_doc_type = {}
+    for doc_type, group in sorted(_group_by_doc_type(records).items()):
+        durations = sorted(record.duration for record in group)
+        by_doc_type[doc_type] = {
+            "files": len(group),
+            "errors": sum(record.error is not None for record in group),
+            "chunks": sum(record.chunk_count for record in group),
+            "bytes": sum(record.file_size or 0 for record in group),
+            "duration": sum(durations),
+            **{f"duration_p{round(q * 100)}": _quantile(durations, q) for q in QUANTILES},
+        }
+    slowest = sorted(records, key=lambda record: record.duration, reverse=True)
+    return {
+        "by_doc_type": by_doc_type,
+        "slowest": [record.to_dict() for record in slowest[:slowest_number]],
+        "peak_memory": max((record.peak_memory or 0 for record in records), default=0),
+    }
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus(records: Iterable[ParsingRecord]) -> str:
+    """
+    Formats the aggregated records in the Prometheus text exposition format
+    :param records: parsing records
+    :return:
+    """
+    records = list(records)
+    groups = _group_by_doc_type(records)
+    lines = []
+
+    def add_samples(name: str, samples: Iterable[tuple[dict, float]]):
+        for labels, value in samples:
+            labels_text = ",".join(
+                f'{key}="{_escape_label(str(label))}"' for key, label in labels.items()
+            )
+            if labels_text:
+                lines.append(f"{METRICS_PREFIX}_{name}{{{labels_text}}} {value}")
+            else:
+                lines.append(f"{METRICS_PREFIX}_{name} {value}")
+
+    def add_metric(
+        name: str, metric_type: str, description: str, samples: Iterable[tuple[dict, float]]
+    ):
+        lines.append(f"# HELP {METRICS_PREFIX}_{name} {description}")
+        lines.append(f"# TYPE {METRICS_PREFIX}_{name} {metric_type}")
+        add_samples(name, samples)
+
+    add_metric("duration_seconds", "summary", "Time spent on parsing a file", [])
+    for doc_type, group in sorted(groups.items()):
+        durations = sorted(record.duration for record in group)
+        add_samples(
+            "duration_seconds",
+            (({"doc_type": doc_type, "quantile": q}, _quantile(durations, q)) for q in QUANTILES),
+        )
+        add_samples("duration_seconds_sum", [({"doc_type": doc_type}, sum(durations))])
+        add_samples("duration_seconds_count", [({"doc_type": doc_type}, len(durations))])
+
+    errors: dict[tuple[str, str], int] = {}
+    for record in records:
+        if record.error is not None:
+            key = (record.doc_type, record.error)
+            errors[key] = errors.get(key, 0) + 1
+    add_metric(
+        "errors_total",
+        "counter",
+        "Number of the files failed to parse",
+        [
+            ({"doc_type": doc_type, "error": error}, count)
+            for (doc_type, error), count in sorted(errors.items())
+        ],
+    )
+    for name, description, attribute in (
+        ("chunks_total", "Number of the produced documents", "chunk_count"),
+        ("bytes_total", "Total size of the parsed files", "file_size"),
+        ("pages_total", "Number of the pages of the parsed documents", "page_count"),
+    ):
+        add_metric(
+            name,
+            "counter",
+            description,
+            [
+                ({"doc_type": doc_type}, sum(getattr(record, attribute) or 0 for record in group))
+                for doc_type, group in sorted(groups.items())
+            ],
+        )
+    add_metric(
+        "peak_memory_bytes",
+        "gauge",
+        "Peak resident memory of the parsing processes",
+        [({}, max((record.peak_memory or 0 for record in records), default=0))],
+    )
+    return "\n".join(lines) + "\n"
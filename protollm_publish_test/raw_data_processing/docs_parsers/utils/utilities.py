@@ -29,8 +29,18 @@ def correct_path_encoding(path: Union[str, Path]) -> str:
 
 
 def fix_zip_path(path: str) -> str:
+    if path.isascii():  # ASCII is decoded the same way with any guessed encoding
+        return path
     try:
         string_bytes = path.encode("437")
+    except UnicodeEncodeError:  # the name wasn't decoded as cp437, so it is correct
+        return path
+    try:
+        # most archivers store the names in UTF-8 without setting the flag
+        return string_bytes.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+    try:
         guessed_encoding = chardet.detect(string_bytes)["encoding"] or "cp1252"
         path = string_bytes.decode(guessed_encoding, "replace")
     except:
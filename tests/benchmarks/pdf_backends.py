@@ -0,0 +1,118 @@
+"""
+Compares the speed of PDFParser backends on the full parsing scheme.
+
+Usage:
+    python -m tests.benchmarks.pdf_backends path/to/pdfs [more paths] [--repeat 3] [--json results.json]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import pypdfium2
+from langchain_core.document_loaders import Blob
+
+from protollm.raw_data_processing.docs_parsers.parsers import ParsingScheme, PDFBackend, PDFParser
+
+BACKENDS = (PDFBackend.pdfminer, PDFBackend.pdfium)
+
+
+def collect_pdfs(paths: list[str]) -> list[Path]:
+    pdfs = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            pdfs.extend(sorted(path.rglob("*.pdf")))
+        else:
+            pdfs.append(path)
+    return pdfs
+
+
+def get_pages_number(path: Path) -> int:
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def run_backend(path: Path, backend: PDFBackend, repeat: int) -> dict:
+    parser = PDFParser(ParsingScheme.full, backend=backend)
+    durations = []
+    text_length = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        documents = parser.parse(Blob.from_path(path))
+        durations.append(time.perf_counter() - start)
+        text_length = sum(len(document.page_content) for document in documents)
+    return {"duration": min(durations), "text_length": text_length}
+
+
+def run(paths: list[str], repeat: int = 1) -> dict:
+    results = {"files": [], "total": {}}
+    totals = {backend.value: 0.0 for backend in BACKENDS}
+    total_pages = 0
+    for path in collect_pdfs(paths):
+        pages_number = get_pages_number(path)
+        file_result = {"path": str(path), "pages": pages_number}
+        for backend in BACKENDS:
+            file_result[backend.value] = run_backend(path, backend, repeat)
+            totals[backend.value] += file_result[backend.value]["duration"]
+        total_pages += pages_number
+        results["files"].append(file_result)
+
+    for backend in BACKENDS:
+        duration = totals[backend.value]
+        results["total"][backend.value] = {
+            "duration": duration,
+            "pages_per_second": total_pages / duration if duration else 0.0,
+        }
+    results["total"]["pages"] = total_pages
+    results["total"]["speedup"] = (
+        totals[PDFBackend.pdfminer.value] / totals[PDFBackend.pdfium.value]
+        if totals[PDFBackend.pdfium.value]
+        else 0.0
+    )
+    return results
+
+
+def print_results(results: dict):
+    header = f"{'file':<40} {'pages':>6} {'pdfminer, s':>12} {'pdfium, s':>10} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    for file_result in results["files"]:
+        pdfminer_duration = file_result["pdfminer"]["duration"]
+        pdfium_duration = file_result["pdfium"]["duration"]
+        print(
+            f"{Path(file_result['path']).name[:40]:<40} {file_result['pages']:>6} "
+            f"{pdfminer_duration:>12.3f} {pdfium_duration:>10.3f} "
+            f"{pdfminer_duration / max(pdfium_duration, 1e-9):>8.1f}"
+        )
+    total = results["total"]
+    print("-" * len(header))
+    print(
+        f"{'total':<40} {total['pages']:>6} {total['pdfminer']['duration']:>12.3f} "
+        f"{total['pdfium']['duration']:>10.3f} {total['speedup']:>8.1f}"
+    )
+    print(
+        f"pages/sec: pdfminer {total['pdfminer']['pages_per_second']:.1f}, "
+        f"pdfium {total['pdfium']['pages_per_second']:.1f}"
+    )
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("paths", nargs="+", help="pdf files or directories with them")
+    arg_parser.add_argument("--repeat", type=int, default=1, help="best of N runs per file")
+    arg_parser.add_argument("--json", dest="json_path", help="file to save the results to")
+    args = arg_parser.parse_args(argv)
+
+    results = run(args.paths, args.repeat)
+    print_results(results)
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+"""
+Generates a deterministic corpus of synthetic PDF documents for the parsing benchmarks.
+
+The documents are written without embedded fonts and third-party packages, so the same seed
+gives byte-identical files on any machine. The text is written in cp1251, and the fonts map its codes
+to the Cyrillic glyph names. The documents with the broken encoding have the plain WinAnsi font encoding
+instead, which gives the cp1251-as-cp1252 text met in real documents.
+
+Usage:
+    python -m tests.benchmarks.pdf_corpus path/to/corpus [--seed 0] [--scale 1.0]
+"""
+import argparse
+import random
+import sys
+import zlib
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterable
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 56
+COLUMNS_GAP = 20
+TOP = PAGE_HEIGHT - MARGIN
+BOTTOM = MARGIN + 20  # space for the page number
+
+BODY_FONT_SIZE = 11
+HEADING_FONT_SIZE = 14
+TITLE_FONT_SIZE = 20
+TABLE_FONT_SIZE = 9
+TABLE_ROW_HEIGHT = 18
+PARAGRAPH_INDENT = 20
+IMAGE_SIZE = 64  # pixels of the embedded images, they are scaled on the page
+IMAGES_NUMBER = 3  # distinct images in the document
+
+# Object numbers of the document's shared objects
+CATALOG_ID, PAGES_ID, BODY_FONT_ID, BOLD_FONT_ID = 1, 2, 3, 4
+
+CYRILLIC_WORDS = (
+    "документ раздел система данные обработка значение требование результат модель анализ "
+    "параметр структура таблица порядок работа условие метод процесс объект решение задача "
+    "контроль оценка проект область уровень средство качество информация описание состав "
+    "проверка выполнение применение основной общий новый важный каждый другой технический"
+).split()
+CYRILLIC_UPPER = "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+CYRILLIC_LOWER = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+# Adobe glyph names of the letters are numbered in the alphabet order
+CYRILLIC_DIFFERENCES = b" ".join(
+    b"%d /afii%d" % (letter.encode("cp1251")[0], first_glyph + i)
+    for letters, first_glyph in ((CYRILLIC_UPPER, 10017), (CYRILLIC_LOWER, 10065))
+    for i, letter in enumerate(letters)
+)
+
+
+@dataclass(frozen=True)
+class DocumentSpec:
+    name: str
+    pages: int
+    columns: int = 1
+    tables: bool = False
+    images: bool = False
+    broken_cyrillic: bool = False
+
+
+DEFAULT_CORPUS = (
+    DocumentSpec("text_1p", 1),
+    DocumentSpec("text_10p", 10),
+    DocumentSpec("text_100p", 100),
+    DocumentSpec("columns_20p", 20, columns=2),
+    DocumentSpec("tables_20p", 20, tables=True),
+    DocumentSpec("images_10p", 10, images=True),
+    DocumentSpec("cyrillic_cp1251_20p", 20, broken_cyrillic=True),
+    DocumentSpec(
+        "mixed_50p", 50, columns=2, tables=True, images=True, broken_cyrillic=True
+    ),
+)
+
+
+class _PagesLimitReached(Exception):
+    pass
+
+
+def _escape(text: bytes) -> bytes:
+    return text.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _stream(data: bytes, dictionary: bytes = b"") -> bytes:
+    data = zlib.compress(data, 9)
+    return (
+        b"<< " + dictionary + b" /Filter /FlateDecode /Length %d >>\nstream\n" % len(data)
+        + data
+        + b"\nendstream"
+    )
+
+
+class _DocumentComposer:
+    """
+    Lays out the generated content on the pages, in one or several columns
+    """
+
+    def __init__(self, spec: DocumentSpec):
+        self._spec = spec
+        self._column_width = (
+            PAGE_WIDTH - 2 * MARGIN - COLUMNS_GAP * (spec.columns - 1)
+        ) / spec.columns
+        self.pages: list[list[bytes]] = []
+        self._new_page()
+
+    def _new_page(self):
+        if len(self.pages) == self._spec.pages:
+            raise _PagesLimitReached()
+        self._operations = []
+        self.pages.append(self._operations)
+        self._column = 0
+        self._y = TOP
+        if len(self.pages) > 1:  # the title page has no number
+            self._text(str(len(self.pages)), PAGE_WIDTH / 2, MARGIN, BODY_FONT_SIZE)
+
+    def _ensure_space(self, height: float):
+        if self._y - height >= BOTTOM:
+            return
+        if self._column + 1 < self._spec.columns:
+            self._column += 1
+            self._y = TOP
+        else:
+            self._new_page()
+
+    @property
+    def _x(self) -> float:
+        return MARGIN + self._column * (self._column_width + COLUMNS_GAP)
+
+    def _text(self, text: str, x: float, y: float, size: float, bold: bool = False):
+        font = b"/F2" if bold else b"/F1"
+        content = _escape(text.encode("cp1251", errors="replace"))
+        self._operations.append(
+            b"BT %s %g Tf %.2f %.2f Td (%s) Tj ET\n" % (font, size, x, y, content)
+        )
+
+    def _wrap(self, words: list[str], width: float, size: float) -> list[str]:
+        # the characters' width is a half of the font size
+        max_chars = max(int(width / (size * 0.5)), 1)
+        lines = [[]]
+        length = 0
+        for word in words:
+            if lines[-1] and length + 1 + len(word) > max_chars:
+                lines.append([])
+                length = 0
+            length += len(word) + (1 if lines[-1] else 0)
+            lines[-1].append(word)
+        return [" ".join(line) for line in lines]
+
+    def title(self, text: str):
+        self._y = PAGE_HEIGHT / 2
+        self._text(text, MARGIN, self._y, TITLE_FONT_SIZE, bold=True)
+        self._new_page()
+
+    def heading(self, text: str):
+        leading = HEADING_FONT_SIZE * 1.5
+        # the heading is kept with the first lines of its section
+        self._ensure_space(leading + BODY_FONT_SIZE * 4)
+        self._y -= leading
+        self._text(text, self._x, self._y, HEADING_FONT_SIZE, bold=True)
+        self._y -= BODY_FONT_SIZE * 0.5
+
+    def paragraph(self, words: list[str]):
+        leading = BODY_FONT_SIZE * 1.3
+        lines = self._wrap(words, self._column_width - PARAGRAPH_INDENT, BODY_FONT_SIZE)
+        for i, line in enumerate(lines):
+            self._ensure_space(leading)
+            self._y -= leading
+            indent = PARAGRAPH_INDENT if i == 0 else 0
+            self._text(line, self._x + indent, self._y, BODY_FONT_SIZE)
+        self._y -= leading * 0.5
+
+    def table(self, rows: list[list[str]]):
+        height = TABLE_ROW_HEIGHT * len(rows)
+        self._ensure_space(height + BODY_FONT_SIZE)
+        self._y -= BODY_FONT_SIZE
+        x, top = self._x, self._y
+        cell_width = self._column_width / len(rows[0])
+        max_chars = max(int(cell_width / (TABLE_FONT_SIZE * 0.5)) - 1, 1)
+
+        for i in range(len(rows) + 1):
+            y = top - i * TABLE_ROW_HEIGHT
+            self._operations.append(
+                b"%.2f %.2f m %.2f %.2f l S\n" % (x, y, x + self._column_width, y)
+            )
+        for j in range(len(rows[0]) + 1):
+            cell_x = x + j * cell_width
+            self._operations.append(
+                b"%.2f %.2f m %.2f %.2f l S\n" % (cell_x, top, cell_x, top - height)
+            )
+        for i, row in enumerate(rows):
+            y = top - (i + 1) * TABLE_ROW_HEIGHT + 5
+            for j, cell in enumerate(row):
+                self._text(cell[:max_chars], x + j * cell_width + 3, y, TABLE_FONT_SIZE)
+        self._y = top - height - BODY_FONT_SIZE
+
+    def image(self, image_id: int):
+        width = min(self._column_width, 160)
+        height = width * 0.6
+        self._ensure_space(height + BODY_FONT_SIZE)
+        self._y -= height + BODY_FONT_SIZE * 0.5
+        self._operations.append(
+            b"q %.2f 0 0 %.2f %.2f %.2f cm /Im%d Do Q\n"
+            % (width, height, self._x, self._y, image_id)
+        )
+        self._y -= BODY_FONT_SIZE * 0.5
+
+
+def _sentence(rng: random.Random, words: tuple[str, ...]) -> list[str]:
+    sentence = [rng.choice(words) for _ in range(rng.randint(6, 14))]
+    sentence[0] = sentence[0].capitalize()
+    sentence[-1] += "."
+    return sentence
+
+
+def _image_data(rng: random.Random) -> bytes:
+    # stripes of a random width with noise, so the images differ and aren't blank for OCR
+    stripe = rng.randint(4, 16)
+    return bytes(
+        (255 if (x // stripe + y // stripe) % 2 else 40) ^ rng.randrange(32)
+        for y in range(IMAGE_SIZE)
+        for x in range(IMAGE_SIZE)
+    )
+
+
+def _font(name: bytes, broken_cyrillic: bool) -> bytes:
+    encoding = b"/WinAnsiEncoding"
+    if not broken_cyrillic:
+        encoding = (
+            b"<< /Type /Encoding /BaseEncoding /WinAnsiEncoding /Differences [%s] >>"
+            % CYRILLIC_DIFFERENCES
+        )
+    # The font isn't one of the standard ones, whose metrics have no Cyrillic glyphs, so the widths
+    # are set explicitly. They match the average character width the lines are wrapped by
+    widths = b" ".join(b"278" if code == 32 else b"500" for code in range(32, 256))
+    return (
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /FirstChar 32 /LastChar 255 "
+        b"/Widths [%s] /Encoding %s >>" % (name, widths, encoding)
+    )
+
+
+def _compose(spec: DocumentSpec, rng: random.Random) -> _DocumentComposer:
+    composer = _DocumentComposer(spec)
+    try:
+        if spec.pages > 1:
+            composer.title(" ".join(_sentence(rng, CYRILLIC_WORDS)[:5]).rstrip("."))
+        section = 0
+        while True:
+            section += 1
+            heading = " ".join(rng.choice(CYRILLIC_WORDS) for _ in range(rng.randint(2, 5)))
+            composer.heading(f"{section}. {heading.capitalize()}")
+            for _ in range(rng.randint(2, 6)):
+                paragraph = []
+                for _ in range(rng.randint(2, 6)):
+                    paragraph.extend(_sentence(rng, CYRILLIC_WORDS))
+                composer.paragraph(paragraph)
+                if spec.tables and rng.random() < 0.3:
+                    columns = rng.randint(3, 4)
+                    composer.table(
+                        [
+                            [rng.choice(CYRILLIC_WORDS) for _ in range(columns)]
+                            for _ in range(rng.randint(3, 6))
+                        ]
+                    )
+                if spec.images and rng.random() < 0.3:
+                    composer.image(rng.randint(1, IMAGES_NUMBER))
+    except _PagesLimitReached:
+        pass
+    return composer
+
+
+def generate_pdf(spec: DocumentSpec, seed: int = 0) -> bytes:
+    """
+    Generates the document by its specification, the result depends only on the specification and the seed
+    :param spec: specification of the document
+    :param seed:
+    :return: content of the pdf file
+    """
+    rng = random.Random(f"{seed}:{spec.name}")
+    composer = _compose(spec, rng)
+
+    objects: dict[int, bytes] = {
+        BODY_FONT_ID: _font(b"PTSans-Regular", spec.broken_cyrillic),
+        BOLD_FONT_ID: _font(b"PTSans-Bold", spec.broken_cyrillic),
+    }
+    next_id = BOLD_FONT_ID + 1
+    images = b""
+    if spec.images:
+        for image_id in range(1, IMAGES_NUMBER + 1):
+            objects[next_id] = _stream(
+                _image_data(rng),
+                b"/Type /XObject /Subtype /Image /Width %d /Height %d "
+                b"/ColorSpace /DeviceGray /BitsPerComponent 8" % (IMAGE_SIZE, IMAGE_SIZE),
+            )
+            images += b"/Im%d %d 0 R " % (image_id, next_id)
+            next_id += 1
+    resources = b"<< /Font << /F1 %d 0 R /F2 %d 0 R >> /XObject << %s>> >>" % (
+        BODY_FONT_ID,
+        BOLD_FONT_ID,
+        images,
+    )
+
+    page_ids = []
+    for operations in composer.pages:
+        objects[next_id] = _stream(b"".join(operations))
+        objects[next_id + 1] = (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources %s "
+            b"/Contents %d 0 R >>" % (PAGES_ID, PAGE_WIDTH, PAGE_HEIGHT, resources, next_id)
+        )
+        page_ids.append(next_id + 1)
+        next_id += 2
+    objects[CATALOG_ID] = b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES_ID
+    objects[PAGES_ID] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % page_id for page_id in page_ids),
+        len(page_ids),
+    )
+
+    content = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for object_id in range(1, next_id):
+        offsets.append(len(content))
+        content += b"%d 0 obj\n%s\nendobj\n" % (object_id, objects[object_id])
+    xref_offset = len(content)
+    content += b"xref\n0 %d\n0000000000 65535 f \n" % next_id
+    content += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    content += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        next_id,
+        CATALOG_ID,
+        xref_offset,
+    )
+    return bytes(content)
+
+
+def scale_corpus(specs: Iterable[DocumentSpec], scale: float) -> list[DocumentSpec]:
+    return [replace(spec, pages=max(1, round(spec.pages * scale))) for spec in specs]
+
+
+def generate_corpus(
+    directory: str | Path,
+    specs: Iterable[DocumentSpec] = DEFAULT_CORPUS,
+    seed: int = 0,
+) -> list[Path]:
+    """
+    Writes the documents to the directory, the existing files with the same names are overwritten
+    :param directory:
+    :param specs: specifications of the documents
+    :param seed:
+    :return: paths of the generated files
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for spec in specs:
+        path = directory / f"{spec.name}.pdf"
+        path.write_bytes(generate_pdf(spec, seed))
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("directory", help="directory to write the documents to")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiplier of the documents' page counts"
+    )
+    args = arg_parser.parse_args(argv)
+
+    for path in generate_corpus(
+        args.directory, scale_corpus(DEFAULT_CORPUS, args.scale), args.seed
+    ):
+        print(path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
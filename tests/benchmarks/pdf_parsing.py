@@ -0,0 +1,285 @@
+"""
+Measures PDFParser throughput for every parsing scheme and options combination.
+
+Each run is made in a fresh process, so the peak memory and the process-wide caches belong to the run only.
+Time is broken down by the parsing phases: layout, formatting, tables, ocr and chunking, the rest
+is reported as other. The phases of the pages processed in a pool (n_jobs > 1) are not measured.
+
+Usage:
+    python -m tests.benchmarks.pdf_parsing [path/to/pdfs ...] [--corpus-dir dir] [--scale 1.0]
+        [--schemes lines full] [--options default tables] [--repeat 3] [--json results.json]
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from pathlib import Path
+from unittest import mock
+
+from langchain_core.document_loaders import Blob
+
+from protollm.raw_data_processing.docs_parsers.parsers import ParsingScheme, PDFParser
+from tests.benchmarks.pdf_backends import collect_pdfs, get_pages_number
+from tests.benchmarks.pdf_corpus import DEFAULT_CORPUS, generate_corpus, scale_corpus
+
+PHASES = ("layout", "formatting", "tables", "ocr", "chunking", "other")
+
+# PDFParser options of the benchmarked combinations
+OPTIONS = {
+    "default": {},
+    "tables": {"extract_tables": True},
+    "images": {"extract_images": True},
+    "service_info": {"remove_service_info": True},
+    "all": {"extract_tables": True, "extract_images": True, "remove_service_info": True},
+    "incremental": {"incremental": True},
+}
+DEFAULT_OPTIONS = ("default", "tables", "images", "all")
+
+
+class PhaseTimer:
+    """
+    Accumulates the time spent in each phase. Nested phases are subtracted from the enclosing one,
+    so the phases' durations don't overlap
+    """
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self._nested_durations = []
+
+    @contextmanager
+    def measure(self, phase: str):
+        self._nested_durations.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.durations[phase] += duration - self._nested_durations.pop()
+            if self._nested_durations:
+                self._nested_durations[-1] += duration
+
+    def wrap(self, phase: str, function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.measure(phase):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def wrap_generator(self, phase: str, function):
+        # only the generator's own steps are measured, not the consumer's code between them
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            iterator = function(*args, **kwargs)
+            while True:
+                with self.measure(phase):
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                yield item
+
+        return wrapper
+
+
+@contextmanager
+def instrument(timer: PhaseTimer):
+    """
+    Wraps the functions of each parsing phase with the timer
+    """
+    import pdfplumber.page
+    import pdfplumber.table
+
+    from protollm.raw_data_processing.docs_parsers.parsers.pdf import (
+        layout,
+        tables,
+        text_backend,
+        utilities,
+    )
+
+    phases = {
+        "layout": [
+            (layout.PDFLayoutEngine, "_layout_page"),
+            (text_backend, "extract_text_lines"),
+        ],
+        "formatting": [
+            (utilities, "get_page_layout"),
+            (utilities, "get_page_formatting"),
+            (utilities, "update_formatting_statistics"),
+            (utilities, "get_document_formatting"),
+        ],
+        "tables": [
+            (pdfplumber.page.Page, "find_tables"),
+            (pdfplumber.table.Table, "extract"),
+            (tables.PageTablesIndex, "__init__"),
+            (tables.PageTablesIndex, "find_table"),
+        ],
+        "ocr": [(utilities, "recognize_images")],
+    }
+    generator_phases = {
+        "chunking": [(PDFParser, "_filter_lines"), (PDFParser, "_split_to_documents")],
+    }
+    with ExitStack() as stack:
+        for wrap, targets in (
+            (timer.wrap, phases),
+            (timer.wrap_generator, generator_phases),
+        ):
+            for phase, functions in targets.items():
+                for owner, name in functions:
+                    stack.enter_context(
+                        mock.patch.object(owner, name, wrap(phase, getattr(owner, name)))
+                    )
+        yield
+
+
+def get_peak_memory() -> int:
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # the value is in kilobytes on Linux and in bytes on macOS
+    return peak_memory if sys.platform == "darwin" else peak_memory * 1024
+
+
+def run_case(path: str, scheme: str, options: dict, n_jobs: int) -> dict:
+    """
+    Parses the document once with the phases timing, it is supposed to be run in a fresh process
+    """
+    parser = PDFParser(scheme, n_jobs=n_jobs, **options)
+    timer = PhaseTimer()
+    blob = Blob.from_path(path)
+    result = {"documents": 0, "text_length": 0, "error": None}
+    with instrument(timer), timer.measure("other"):
+        start = time.perf_counter()
+        try:
+            for document in parser.lazy_parse(blob):
+                result["documents"] += 1
+                result["text_length"] += len(document.page_content)
+        except Exception as error:
+            result["error"] = f"{type(error).__name__}: {error}"
+        duration = time.perf_counter() - start
+    result["duration"] = duration
+    result["phases"] = {phase: timer.durations[phase] for phase in PHASES}
+    result["peak_memory"] = get_peak_memory()
+    return result
+
+
+def run_isolated(path: Path, scheme: str, options: dict, n_jobs: int, repeat: int) -> dict:
+    """
+    Runs the case in a new process for each repetition and keeps the fastest one
+    """
+    results = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results.append(
+                executor.submit(run_case, str(path), scheme, options, n_jobs).result()
+            )
+    best = min(results, key=lambda result: result["duration"])
+    best["peak_memory"] = max(result["peak_memory"] for result in results)
+    return best
+
+
+def run(
+    paths: list[str],
+    schemes: list[str],
+    options_names: list[str],
+    repeat: int = 1,
+    n_jobs: int = 1,
+) -> dict:
+    results = {"cases": [], "total": {}}
+    totals = defaultdict(lambda: {"duration": 0.0, "pages": 0, "peak_memory": 0})
+    for path in collect_pdfs(paths):
+        pages_number = get_pages_number(path)
+        for scheme in schemes:
+            for options_name in options_names:
+                case = run_isolated(path, scheme, OPTIONS[options_name], n_jobs, repeat)
+                case.update(
+                    {
+                        "path": str(path),
+                        "pages": pages_number,
+                        "scheme": scheme,
+                        "options": options_name,
+                        "pages_per_second": pages_number / case["duration"]
+                        if case["duration"]
+                        else 0.0,
+                    }
+                )
+                results["cases"].append(case)
+
+                total = totals[f"{scheme}/{options_name}"]
+                total["duration"] += case["duration"]
+                total["pages"] += pages_number
+                total["peak_memory"] = max(total["peak_memory"], case["peak_memory"])
+
+    for name, total in totals.items():
+        total["pages_per_second"] = (
+            total["pages"] / total["duration"] if total["duration"] else 0.0
+        )
+        results["total"][name] = total
+    return results
+
+
+def print_results(results: dict):
+    header = (
+        f"{'file':<28} {'scheme':<10} {'options':<12} {'pages':>5} {'pages/s':>8} "
+        f"{'RSS, MB':>8} " + " ".join(f"{phase:>10}" for phase in PHASES)
+    )
+    print(header)
+    print("-" * len(header))
+    for case in results["cases"]:
+        print(
+            f"{Path(case['path']).name[:28]:<28} {case['scheme']:<10} {case['options']:<12} "
+            f"{case['pages']:>5} {case['pages_per_second']:>8.1f} "
+            f"{case['peak_memory'] / 2 ** 20:>8.1f} "
+            + " ".join(f"{case['phases'][phase]:>10.3f}" for phase in PHASES)
+            + (f"  {case['error']}" if case["error"] else "")
+        )
+    print("-" * len(header))
+    for name, total in results["total"].items():
+        print(
+            f"{name:<40} pages/sec {total['pages_per_second']:.1f}, "
+            f"peak RSS {total['peak_memory'] / 2 ** 20:.1f} MB"
+        )
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument(
+        "paths", nargs="*", help="pdf files or directories, the synthetic corpus is used if none"
+    )
+    arg_parser.add_argument("--corpus-dir", help="directory to generate the synthetic corpus to")
+    arg_parser.add_argument("--scale", type=float, default=1.0, help="corpus page counts multiplier")
+    arg_parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic corpus")
+    arg_parser.add_argument(
+        "--schemes", nargs="+", default=list(ParsingScheme.__members__), choices=ParsingScheme.__members__
+    )
+    arg_parser.add_argument(
+        "--options", nargs="+", default=list(DEFAULT_OPTIONS), choices=OPTIONS.keys()
+    )
+    arg_parser.add_argument("--repeat", type=int, default=1, help="best of N runs per case")
+    arg_parser.add_argument("--n-jobs", type=int, default=1, help="PDFParser n_jobs")
+    arg_parser.add_argument("--json", dest="json_path", help="file to save the results to")
+    args = arg_parser.parse_args(argv)
+
+    with ExitStack() as stack:
+        paths = args.paths
+        if not paths:
+            corpus_dir = args.corpus_dir or stack.enter_context(tempfile.TemporaryDirectory())
+            generate_corpus(corpus_dir, scale_corpus(DEFAULT_CORPUS, args.scale), args.seed)
+            paths = [corpus_dir]
+        results = run(paths, args.schemes, args.options, args.repeat, args.n_jobs)
+
+    print_results(results)
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
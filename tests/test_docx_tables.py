@@ -0,0 +1,62 @@
+import io
+
+import pytest
+from langchain_core.document_loaders import Blob
+
+docx = pytest.importorskip("docx")
+# The parsers are imported as protollm, which is available only with their dependencies installed
+pytest.importorskip("protollm.raw_data_processing.docs_parsers.parsers")
+
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from protollm.raw_data_processing.docs_parsers.parsers import WordDocumentParser
+
+
+def skip_grid_columns(row, number: int):
+    """
+    Removes the first cells of the row and marks their columns as skipped with gridBefore
+    """
+    tr = row._tr
+    for tc in tr.tc_lst[:number]:
+        tr.remove(tc)
+    grid_before = OxmlElement("w:gridBefore")
+    grid_before.set(qn("w:val"), str(number))
+    tr.get_or_add_trPr().append(grid_before)
+
+
+def merge_vertically(cell, value: str):
+    v_merge = OxmlElement("w:vMerge")
+    if value:
+        v_merge.set(qn("w:val"), value)
+    cell._tc.get_or_add_tcPr().append(v_merge)
+
+
+def get_table_html(document) -> str:
+    file_obj = io.BytesIO()
+    document.save(file_obj)
+    blob = Blob.from_data(file_obj.getvalue(), path="doc.docx", mime_type="docx")
+    parser = WordDocumentParser(extract_tables=True)
+    [html_table] = [
+        table
+        for parsed in parser.lazy_parse(blob)
+        for table in parsed.metadata.get("tables", {}).values()
+    ]
+    return html_table
+
+
+def test_skipped_grid_columns_are_empty_cells():
+    document = docx.Document()
+    table = document.add_table(rows=3, cols=3)
+    # the parsers expect Russian texts, latin ones are taken for broken encoding
+    for row, texts in zip(table.rows, (("Один", "Два", "Три"), ("Четыре", "Пять", "Шесть"))):
+        for cell, text in zip(row.cells, texts):
+            cell.text = text
+    merge_vertically(table.rows[1].cells[2], "restart")
+    merge_vertically(table.rows[2].cells[2], "")
+    table.rows[2].cells[1].text = "Семь"
+    skip_grid_columns(table.rows[2], 1)
+
+    html_table = get_table_html(document)
+
+    assert "<tr><td></td><td>Семь</td><td>Шесть</td></tr>" in html_table
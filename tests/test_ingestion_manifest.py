@@ -0,0 +1,141 @@
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+# The manifest needs only the standard library, so it's loaded from its file without the loaders
+# package, which imports the parsers and their dependencies
+MANIFEST_PATH = (
+    Path(__file__).parents[1]
+    / "protollm_publish_test/raw_data_processing/docs_parsers/loaders/manifest.py"
+)
+_spec = importlib.util.spec_from_file_location("ingestion_manifest", MANIFEST_PATH)
+manifest_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(manifest_module)
+IngestionManifest = manifest_module.IngestionManifest
+
+
+@pytest.fixture
+def directory(tmp_path):
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        (directory / name).write_bytes(name.encode())
+    return directory
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    with IngestionManifest(tmp_path / "manifest.db") as manifest:
+        yield manifest
+
+
+def load(manifest, directory):
+    paths = sorted(directory.iterdir())
+    selected = list(manifest.update(directory, paths))
+    for path in selected:
+        manifest.mark_loaded(path, [f"docs/{path.name}"])
+    return [path.name for path in selected]
+
+
+def test_unchanged_files_are_not_selected(manifest, directory):
+    assert load(manifest, directory) == ["a.pdf", "b.pdf", "c.pdf"]
+    assert load(manifest, directory) == []
+    assert manifest.get_tombstones() == []
+
+
+def test_touched_file_is_not_selected(manifest, directory):
+    load(manifest, directory)
+    stat = (directory / "a.pdf").stat()
+    os.utime(directory / "a.pdf", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert load(manifest, directory) == []
+    assert manifest.get_tombstones() == []
+
+
+def test_changed_and_deleted_files_become_tombstones(manifest, directory):
+    load(manifest, directory)
+    (directory / "a.pdf").write_bytes(b"changed content")
+    (directory / "b.pdf").unlink()
+
+    assert load(manifest, directory) == ["a.pdf"]
+    assert sorted(manifest.get_tombstones()) == ["docs/a.pdf", "docs/b.pdf"]
+
+    manifest.remove_tombstones(["docs/a.pdf", "docs/b.pdf"])
+    assert manifest.get_tombstones() == []
+    assert load(manifest, directory) == []
+
+
+def test_changed_file_becomes_tombstone_before_it_is_selected(manifest, directory):
+    load(manifest, directory)
+    (directory / "b.pdf").write_bytes(b"changed content")
+
+    paths = manifest.update(directory, sorted(directory.iterdir()))
+    assert manifest.get_tombstones() == []
+    assert next(paths).name == "b.pdf"
+    assert manifest.get_tombstones() == ["docs/b.pdf"]
+
+
+def test_failed_file_documents_become_tombstones_on_next_load(manifest, directory):
+    paths = sorted(directory.iterdir())
+    for path in manifest.update(directory, paths):
+        if path.name == "a.pdf":
+            manifest.mark_failed(path, ["docs/a.pdf/part"])
+        else:
+            manifest.mark_loaded(path, [f"docs/{path.name}"])
+
+    assert manifest.get_tombstones() == []
+    assert load(manifest, directory) == ["a.pdf"]
+    assert manifest.get_tombstones() == ["docs/a.pdf/part"]
+
+
+class FailingStore:
+    def add_documents(self, documents):
+        raise RuntimeError("The store is unavailable")
+
+
+class ListStore:
+    def __init__(self):
+        self.documents = []
+
+    def add_documents(self, documents):
+        self.documents.extend(documents)
+
+
+@pytest.fixture
+def word_directory(tmp_path):
+    docx = pytest.importorskip("docx")
+    directory = tmp_path / "word_docs"
+    directory.mkdir()
+    for name in ("a.docx", "b.docx"):
+        document = docx.Document()
+        # the parsers expect Russian texts, latin ones are taken for broken encoding
+        document.add_paragraph(f"Текст документа {name}")
+        document.save(directory / name)
+    return directory
+
+
+def load_to_store(manifest, directory, store, loading_batch_size=32):
+    etl_pipeline = pytest.importorskip("protollm.rags.pipeline.etl_pipeline")
+    loaders = pytest.importorskip("protollm.raw_data_processing.docs_parsers.loaders")
+    loader = loaders.RecursiveDirectoryLoader(directory, manifest=manifest, defer_manifest=True)
+    etl_pipeline.DocsLoadPipeline(loader.lazy_load(), manifest, loader).load(
+        store, loading_batch_size, delete_documents=lambda store, sources: None
+    )
+
+
+def test_file_is_changed_until_its_documents_are_stored(manifest, word_directory):
+    with pytest.raises(RuntimeError):
+        load_to_store(manifest, word_directory, FailingStore())
+
+    paths = manifest.update(word_directory, sorted(word_directory.iterdir()))
+    assert [path.name for path in paths] == ["a.docx", "b.docx"]
+
+
+def test_file_is_unchanged_after_its_documents_are_stored(manifest, word_directory):
+    store = ListStore()
+    load_to_store(manifest, word_directory, store, loading_batch_size=1)
+
+    assert len(store.documents) == 2
+    assert list(manifest.update(word_directory, sorted(word_directory.iterdir()))) == []
@@ -0,0 +1,90 @@
+import multiprocessing
+import subprocess
+import sys
+import time
+from typing import Iterator
+
+import pytest
+from langchain_core.document_loaders import Blob
+from langchain_core.documents import Document
+
+# The parsers are imported as protollm, which is available only with their dependencies installed
+pytest.importorskip("protollm.raw_data_processing.docs_parsers.parsers")
+
+from protollm.raw_data_processing.docs_parsers.parsers import (
+    BaseParser,
+    ParsingBudget,
+    lazy_parse_with_budget,
+)
+from protollm.raw_data_processing.docs_parsers.utils.exceptions import ParsingLimitError
+from protollm.raw_data_processing.docs_parsers.utils.logger import ParsingLogger
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods() or not sys.platform.startswith("linux"),
+    reason="the budget's monitoring needs forked processes and /proc",
+)
+
+
+class LinesParser(BaseParser):
+    def lazy_parse(self, blob: Blob) -> Iterator[Document]:
+        for line in blob.as_string().splitlines():
+            yield Document(page_content=line)
+
+
+class ConvertingParser(BaseParser):
+    """
+    Starts a child process, which takes much memory, as a converter would do
+    """
+
+    def lazy_parse(self, blob: Blob) -> Iterator[Document]:
+        converter = subprocess.Popen(
+            [sys.executable, "-c", "import time; data = b'x' * 2**28; time.sleep(60)"]
+        )
+        try:
+            converter.wait()
+        finally:
+            converter.kill()
+        yield Document(page_content="converted")
+
+
+class AllocatingParser(BaseParser):
+    """
+    Takes much memory for a while and frees it before the document is yielded
+    """
+
+    def lazy_parse(self, blob: Blob) -> Iterator[Document]:
+        data = b"x" * 2**28
+        time.sleep(0.5)
+        del data
+        yield Document(page_content="parsed")
+
+
+def test_time_spent_by_consumer_is_not_counted():
+    blob = Blob.from_data(b"first\nsecond\nthird", path="doc.txt")
+    budget = ParsingBudget(timeout=0.5)
+
+    contents = []
+    for document in lazy_parse_with_budget(LinesParser(), blob, budget):
+        time.sleep(0.4)
+        contents.append(document.page_content)
+
+    assert contents == ["first", "second", "third"]
+
+
+def test_memory_of_child_processes_is_counted():
+    blob = Blob.from_data(b"content", path="doc.txt")
+    budget = ParsingBudget(timeout=30, max_memory=2**27)
+
+    with pytest.raises(ParsingLimitError, match="memory"):
+        list(lazy_parse_with_budget(ConvertingParser(), blob, budget))
+
+
+@pytest.mark.parametrize("budget", [None, ParsingBudget(timeout=30)])
+def test_peak_memory_is_recorded(budget):
+    blob = Blob.from_data(b"content", path="doc.txt")
+    logger = ParsingLogger(collect_metrics=True)
+
+    with logger.parsing_info_handler("doc.txt") as parsing_record:
+        list(lazy_parse_with_budget(AllocatingParser(), blob, budget, parsing_record))
+
+    assert logger.records[0].peak_memory >= 2**28
@@ -0,0 +1,94 @@
+from typing import Iterator
+
+import pytest
+from langchain_core.document_loaders import Blob
+from langchain_core.documents import Document
+
+# The parsers are imported as protollm, which is available only with their dependencies installed
+pytest.importorskip("protollm.raw_data_processing.docs_parsers.parsers")
+
+from protollm.raw_data_processing.docs_parsers.parsers.base import BaseParser
+from protollm.raw_data_processing.docs_parsers.parsers.cache import ParsingCache, cached_parsing
+
+
+class CountingParser(BaseParser):
+    runtime_options = ("n_jobs",)
+
+    def __init__(self, extract_tables: bool = False, n_jobs: int = 1):
+        self.extract_tables = extract_tables
+        self.n_jobs = n_jobs
+        self._calls = 0
+
+    @cached_parsing
+    def lazy_parse(self, blob: Blob) -> Iterator[Document]:
+        self._calls += 1
+        yield Document(
+            page_content=blob.as_string(),
+            metadata={"source": blob.source, "extract_tables": self.extract_tables},
+        )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParsingCache(tmp_path / "cache")
+
+
+def parse(parser, data: str, source: str = "doc.pdf") -> list[Document]:
+    blob = Blob.from_data(data.encode(), path=source, mime_type="pdf")
+    return list(parser.lazy_parse(blob))
+
+
+def test_same_content_and_options_hit_the_cache(cache):
+    parser = CountingParser()
+    parser.cache = cache
+
+    first = parse(parser, "content")
+    second = parse(parser, "content")
+
+    assert parser._calls == 1
+    assert [document.page_content for document in second] == [
+        document.page_content for document in first
+    ]
+
+
+def test_changed_options_miss_the_cache(cache):
+    parser = CountingParser(extract_tables=False)
+    parser.cache = cache
+    parse(parser, "content")
+
+    parser.extract_tables = True
+    documents = parse(parser, "content")
+
+    assert parser._calls == 2
+    assert documents[0].metadata["extract_tables"] is True
+
+
+def test_runtime_options_do_not_affect_the_cache(cache):
+    parser = CountingParser(n_jobs=1)
+    parser.cache = cache
+    parse(parser, "content")
+
+    parser.n_jobs = 4
+    parse(parser, "content")
+
+    assert parser._calls == 1
+
+
+def test_changed_content_misses_the_cache(cache):
+    parser = CountingParser()
+    parser.cache = cache
+    parse(parser, "content")
+    parse(parser, "another content")
+
+    assert parser._calls == 2
+
+
+def test_cached_documents_get_the_new_source(cache):
+    parser = CountingParser()
+    parser.cache = cache
+    parse(parser, "content", "first.pdf")
+
+    documents = parse(parser, "content", "second.pdf")
+
+    assert parser._calls == 1
+    assert documents[0].metadata["source"] == "second.pdf"
@@ -0,0 +1,80 @@
+import io
+
+import pytest
+from langchain_core.document_loaders import Blob
+
+pypdfium2 = pytest.importorskip("pypdfium2")
+# The loaders are imported as protollm, which is available only with their dependencies installed
+pytest.importorskip("protollm.raw_data_processing.docs_parsers.loaders")
+
+from protollm.raw_data_processing.docs_parsers.loaders.pdf_loader import PDFLoader
+from protollm.raw_data_processing.docs_parsers.parsers import ParsingBudget, QualityGate
+from protollm.raw_data_processing.docs_parsers.utils.exceptions import LowQualityError
+from protollm.raw_data_processing.docs_parsers.utils.logger import ParsingLogger
+
+
+@pytest.fixture
+def pdf_content() -> bytes:
+    pdf = pypdfium2.PdfDocument.new()
+    for _ in range(3):
+        pdf.new_page(200, 200)
+    file_obj = io.BytesIO()
+    pdf.save(file_obj)
+    pdf.close()
+    return file_obj.getvalue()
+
+
+def test_probe_rejects_by_pages_number(pdf_content):
+    blob = Blob.from_data(pdf_content, path="doc.pdf", mime_type="pdf")
+
+    QualityGate(min_pages=1, max_pages=3).probe(blob)
+    with pytest.raises(LowQualityError):
+        QualityGate(max_pages=2).probe(blob)
+    with pytest.raises(LowQualityError):
+        QualityGate(min_pages=4).probe(blob)
+
+
+def test_probe_rejects_by_file_size(pdf_content):
+    blob = Blob.from_data(pdf_content, path="doc.pdf", mime_type="pdf")
+
+    QualityGate(max_file_size=len(pdf_content)).probe(blob)
+    with pytest.raises(LowQualityError):
+        QualityGate(max_file_size=len(pdf_content) - 1).probe(blob)
+
+
+def test_rejected_file_is_skipped_without_error(pdf_content):
+    logger = ParsingLogger(silent_errors=False, collect_metrics=True)
+    loader = PDFLoader(
+        "doc.pdf",
+        byte_content=pdf_content,
+        parsing_logger=logger,
+        quality_gate=QualityGate(max_pages=2),
+    )
+
+    assert list(loader.lazy_load()) == []
+    assert logger.logs == {}
+    assert len(logger.records) == 1
+    assert logger.records[0].error is None
+    assert logger.records[0].rejection == "The document has 3 pages, the maximum is 2"
+
+
+@pytest.mark.parametrize("budget", [None, ParsingBudget(timeout=30)])
+def test_page_count_is_noted_by_the_parser(pdf_content, budget):
+    logger = ParsingLogger(silent_errors=True, collect_metrics=True)
+    loader = PDFLoader(
+        "doc.pdf", byte_content=pdf_content, parsing_logger=logger, parsing_budget=budget
+    )
+
+    # the pages are blank, so the parser counts them and fails on the missing text layer
+    assert list(loader.lazy_load()) == []
+    assert logger.records[0].error == "NoTextLayerError"
+    assert logger.records[0].page_count == 3
+
+
+def test_filter_drops_low_quality_texts():
+    gate = QualityGate(min_content_length=5, max_digits_proportion=0.5, scripts=("LATIN",))
+
+    assert gate.is_acceptable("Plain text")
+    assert not gate.is_acceptable("Text")
+    assert not gate.is_acceptable("12345 a")
+    assert not gate.is_acceptable("Простой текст")
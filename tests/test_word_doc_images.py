@@ -0,0 +1,81 @@
+import io
+import pickle
+import zipfile
+
+import pytest
+
+docx = pytest.importorskip("docx")
+Image = pytest.importorskip("PIL.Image")
+# The loaders are imported as protollm, which is available only with their dependencies installed
+pytest.importorskip("protollm.raw_data_processing.docs_parsers.loaders")
+
+from protollm.raw_data_processing.docs_parsers.loaders import WordDocumentLoader, ZipLoader
+from protollm.raw_data_processing.docs_parsers.parsers.cache import ParsingCache
+
+
+@pytest.fixture
+def docx_content() -> bytes:
+    image_obj = io.BytesIO()
+    Image.new("RGB", (4, 3), "red").save(image_obj, format="PNG")
+    image_obj.seek(0)
+    document = docx.Document()
+    # the parsers expect Russian texts, latin ones are taken for broken encoding
+    document.add_paragraph("Текст документа с картинкой")
+    document.add_picture(image_obj)
+    file_obj = io.BytesIO()
+    document.save(file_obj)
+    return file_obj.getvalue()
+
+
+def get_images(documents) -> list:
+    return [
+        image
+        for document in documents
+        for image in document.metadata.get("images", {}).values()
+    ]
+
+
+def test_zip_member_images_outlive_parallel_parsing(tmp_path, docx_content):
+    archive_path = tmp_path / "docs.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("first.docx", docx_content)
+        archive.writestr("second.docx", docx_content)
+    loader = ZipLoader(archive_path, word_doc_extract_images=True, n_jobs=2)
+
+    images = get_images(loader.lazy_load())
+
+    assert len(images) == 2
+    for image in images:
+        assert image.package_path is None
+        assert image.open().size == (4, 3)
+
+
+def test_file_images_are_read_from_the_file_after_pickling(tmp_path, docx_content):
+    path = tmp_path / "doc.docx"
+    path.write_bytes(docx_content)
+
+    loader = WordDocumentLoader(path, extract_images=True, quality_gate=None)
+    [image] = get_images(loader.lazy_load())
+    restored = pickle.loads(pickle.dumps(image))
+
+    assert restored.package_path == str(path)
+    assert restored.data == image.data
+
+
+def test_cached_images_are_read_from_the_new_file(tmp_path, docx_content):
+    first_path, second_path = tmp_path / "first.docx", tmp_path / "second.docx"
+    first_path.write_bytes(docx_content)
+    second_path.write_bytes(docx_content)
+    loaders = [
+        WordDocumentLoader(path, extract_images=True, quality_gate=None)
+        for path in (first_path, second_path)
+    ]
+    for loader in loaders:
+        loader.parser.cache = ParsingCache(tmp_path / "cache")
+
+    list(loaders[0].lazy_load())
+    first_path.unlink()
+    [image] = get_images(loaders[1].lazy_load())
+
+    assert image.package_path == str(second_path)
+    assert image.open().size == (4, 3)